@@ -0,0 +1,78 @@
+'''
+Created on Oct 18, 2026
+
+@author: x2012x
+
+Compares the 'files' and 'packed' TTS cache layouts: the time to insert recordings, to look them up
+(hits, misses and index only checks) and to open a populated cache. Each cache is created in a
+temporary directory, use --directory to place it on the storage under test (e.g. the SD card).
+
+    python benchmarks/bench_cache.py [--recordings N] [--size BYTES] [--directory PATH]
+'''
+import argparse
+import hashlib
+import os
+import random
+import shutil
+import tempfile
+import time
+import common
+from services.tts_cache import TTSCache
+from services.tts_packed import PackedTTSCache
+
+
+def populate(cache, recordings, size):
+    audio_content = os.urandom(size)
+    hashes = []
+    start = time.perf_counter()
+    for i in range(recordings):
+        text = f'Recording number {i} of the benchmark.'
+        text_hash = hashlib.sha256(text.encode()).hexdigest()
+        cache.store(text_hash, text, audio_content)
+        hashes.append(text_hash)
+    return hashes, (time.perf_counter() - start) / recordings * 1e6
+
+
+def wait_loaded(cache):
+    start = time.perf_counter()
+    cache.load()
+    while not cache.stats()['loaded']:
+        time.sleep(0.001)
+    return (time.perf_counter() - start) * 1e3
+
+
+def run(name, factory, directory, recordings, size):
+    path = os.path.join(directory, name)
+    cache = factory(path)
+    wait_loaded(cache)
+    hashes, insert = populate(cache, recordings, size)
+    sample = random.Random(1).choices(hashes, k=min(recordings, 5000))
+    hot = sample[:32] * (len(sample) // 32)
+    missing = [hashlib.sha256(str(i).encode()).hexdigest() for i in range(len(sample))]
+    results = {'insert (us)': insert,
+               'lookup random hit (us)': common.timeit(lambda it=iter(sample): cache.lookup(next(it)), len(sample)),
+               'lookup hot hit (us)': common.timeit(lambda it=iter(hot): cache.lookup(next(it)), len(hot)),
+               'lookup miss (us)': common.timeit(lambda it=iter(missing): cache.lookup(next(it)), len(missing)),
+               'contains (us)': common.timeit(lambda it=iter(sample): cache.contains(next(it)), len(sample))}
+    # Open the populated cache, as at startup.
+    results['load (ms)'] = wait_loaded(factory(path))
+    results['files on disk'] = sum(len(files) for _, _, files in os.walk(path))
+    return results
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='TTS cache layout benchmark')
+    parser.add_argument('--recordings', type=int, default=10000, help='Number of recordings to insert')
+    parser.add_argument('--size', type=int, default=8192, help='Size of each recording, in bytes')
+    parser.add_argument('--directory', default=None, help='Directory to create the caches in')
+    args = parser.parse_args()
+    directory = tempfile.mkdtemp(dir=args.directory)
+    try:
+        files = run('files', TTSCache, directory, args.recordings, args.size)
+        packed = run('packed', PackedTTSCache, directory, args.recordings, args.size)
+    finally:
+        shutil.rmtree(directory)
+    print(f'{args.recordings} recordings of {args.size} bytes')
+    print(f'{"":<24}{"files":>12}{"packed":>12}')
+    for metric in files:
+        print(f'{metric:<24}{files[metric]:>12.1f}{packed[metric]:>12.1f}')
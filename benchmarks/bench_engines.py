@@ -0,0 +1,84 @@
+'''
+Created on Oct 18, 2026
+
+@author: x2012x
+
+Compares requests/sec and latency of the threaded and asyncio server engines.
+
+    python benchmarks/bench_engines.py [--requests N] [--clients C] [--work SECONDS]
+'''
+import argparse
+import http.client
+import threading
+import time
+import common
+from handlers.base import BaseHandler
+from services.base import Response
+from servers.http import Conductor
+from servers.aio import AsyncConductor
+
+WORK = 0.0
+
+
+class BenchHandler(BaseHandler):
+    ''' Handler with a single action that simulates a small amount of blocking work '''
+
+    def __init__(self, conductor):
+        super().__init__(conductor, 'bench')
+
+    def ping(self):
+        if WORK:
+            time.sleep(WORK)
+        return Response()
+
+    def _handle_intent(self, intent):
+        return Response()
+
+
+def run_clients(address, requests, clients):
+    ''' Issue requests from concurrent clients, returning the elapsed time and per-request latencies '''
+    latencies = []
+    lock = threading.Lock()
+
+    def client(count):
+        samples = []
+        for _ in range(count):
+            start = time.perf_counter()
+            conn = http.client.HTTPConnection(*address)
+            conn.request('GET', '/bench/ping')
+            conn.getresponse().read()
+            conn.close()
+            samples.append(time.perf_counter() - start)
+        with lock:
+            latencies.extend(samples)
+
+    threads = [threading.Thread(target=client, args=(requests // clients,)) for _ in range(clients)]
+    start = time.perf_counter()
+    for t in threads:
+        t.start()
+    peak_threads = 0
+    while any(t.is_alive() for t in threads):
+        peak_threads = max(peak_threads, threading.active_count())
+        time.sleep(0.005)
+    return time.perf_counter() - start, latencies, peak_threads - clients
+
+
+def bench(name, server, requests, clients):
+    serving = threading.Thread(target=server.serve_forever)
+    serving.start()
+    elapsed, latencies, peak_threads = run_clients(server.server_address, requests, clients)
+    server.shutdown()
+    serving.join()
+    print(f'{name:>9}: {len(latencies) / elapsed:8.0f} req/s  p50 {common.percentile(latencies, 50) * 1000:6.2f} ms  '
+          f'p99 {common.percentile(latencies, 99) * 1000:6.2f} ms  peak server threads {peak_threads}')
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Server engine benchmark')
+    parser.add_argument('--requests', type=int, default=4000)
+    parser.add_argument('--clients', type=int, default=16)
+    parser.add_argument('--work', type=float, default=0.0, help='seconds of blocking work per request')
+    args = parser.parse_args()
+    WORK = args.work
+    bench('threaded', Conductor(('127.0.0.1', 0), (), (BenchHandler,)), args.requests, args.clients)
+    bench('asyncio', AsyncConductor(('127.0.0.1', 0), (), (BenchHandler,)), args.requests, args.clients)
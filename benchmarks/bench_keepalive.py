@@ -0,0 +1,77 @@
+'''
+Created on Oct 18, 2026
+
+@author: x2012x
+
+Measures the per-request cost of a sequential stream of intents, as posted by Rhasspy, when each intent
+is posted on a new connection and when every intent is posted on a single persistent connection, for
+both server engines.
+
+    python benchmarks/bench_keepalive.py [--requests N]
+'''
+import argparse
+import http.client
+import json
+import threading
+import time
+import common
+from handlers.base import BaseHandler
+from services.base import Response
+from servers.http import Conductor
+from servers.aio import AsyncConductor
+
+INTENT = json.dumps({'intent': {'name': 'BenchPing', 'confidence': 1.0}, 'slots': [], 'text': 'ping'})
+
+
+class BenchHandler(BaseHandler):
+    ''' Handler for a single intent that does no work '''
+
+    def __init__(self, conductor):
+        super().__init__(conductor, 'bench', {'BenchPing'})
+
+    def _handle_intent(self, intent):
+        return Response()
+
+
+def post_intents(address, requests, persistent):
+    ''' Post a sequential stream of intents, returning the latency of each '''
+    latencies = []
+    conn = http.client.HTTPConnection(*address)
+    for _ in range(requests):
+        start = time.perf_counter()
+        if not persistent:
+            conn = http.client.HTTPConnection(*address)
+        conn.request('POST', '/intent', INTENT, {'Content-Type': 'application/json'})
+        response = conn.getresponse()
+        response.read()
+        if response.status != 200:
+            raise RuntimeError(f'Unexpected status: {response.status}')
+        if not persistent:
+            conn.close()
+        latencies.append(time.perf_counter() - start)
+    conn.close()
+    return latencies
+
+
+def bench(name, server, requests):
+    serving = threading.Thread(target=server.serve_forever)
+    serving.start()
+    try:
+        results = {mode: post_intents(server.server_address, requests, mode == 'persistent')
+                   for mode in ('new', 'persistent')}
+    finally:
+        server.shutdown()
+        serving.join()
+    for mode, latencies in results.items():
+        print(f'{name:>9} {mode:>11}: mean {sum(latencies) / len(latencies) * 1e6:8.0f} us  '
+              f'p50 {common.percentile(latencies, 50) * 1e6:8.0f} us  p99 {common.percentile(latencies, 99) * 1e6:8.0f} us')
+    saved = (sum(results['new']) - sum(results['persistent'])) / requests
+    print(f'{name:>9} {"saved":>11}: {saved * 1e6:8.0f} us per request')
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Persistent connection benchmark')
+    parser.add_argument('--requests', type=int, default=2000)
+    args = parser.parse_args()
+    bench('threaded', Conductor(('127.0.0.1', 0), (), (BenchHandler,), max_requests=0), args.requests)
+    bench('asyncio', AsyncConductor(('127.0.0.1', 0), (), (BenchHandler,), max_requests=0), args.requests)
@@ -0,0 +1,132 @@
+'''
+Created on Oct 18, 2026
+
+@author: x2012x
+
+Measures the latency from queuing a PlayRequest to the start of its playback, comparing the original
+polling Player, which sleeps after each request and is restarted whenever the queue runs dry, with
+the persistent Player. Playback is simulated by a stand-in for AudioPlayer which records when each
+track is started and blocks for the length of the track, so no audio device is required.
+
+    python benchmarks/bench_player.py [--requests N] [--burst N] [--track SECONDS] [--idle SECONDS]
+
+Requests that are never played, which happens to the original Player when a request is queued while
+the Player is exiting, are reported as stranded.
+'''
+import argparse
+import time
+from collections import deque
+import common
+from services import audio
+from services.audio import AudioService, PlayRequest
+
+
+class SimulatedPlayer(object):
+    ''' Stand-in for audioplayer.AudioPlayer '''
+    duration = 0.01
+    started = {}
+
+    def __init__(self, path):
+        self.path = path
+        self.volume = 100
+
+    def play(self, loop = False, block = False):
+        SimulatedPlayer.started[self.path] = time.perf_counter()
+        if block:
+            time.sleep(self.duration)
+
+    def stop(self):
+        pass
+
+    def close(self):
+        pass
+
+    def pause(self):
+        pass
+
+    def resume(self):
+        pass
+
+
+class LegacyPlayer(audio.Player):
+    ''' The Player as it was before it was persistent '''
+    _volume = 25
+
+    def stop(self):
+        self._process_queue = False
+
+    def run(self):
+        while self._process_queue:
+            try:
+                request = self._service._queue.popleft()
+                self._play(request.primary, request.background, request.delay, request.background_volume_shift)
+            except Exception:
+                break
+            finally:
+                time.sleep(0.10)
+
+    def _play(self, primary, background = None, delay = 2.5, background_volume_shift = 20):
+        self._primary = audio.AudioPlayer(primary)
+        self._primary.volume = self._volume
+        self._primary.play(block = True)
+        self._primary.stop()
+        self._primary.close()
+        self._primary = None
+
+
+class LegacyAudioService(object):
+    ''' The AudioService as it was before its player was persistent '''
+    def __init__(self):
+        self._queue = deque()
+        self._player = None
+
+    def play(self, request):
+        self._queue.append(request)
+        if not self._player or not self._player.is_alive():
+            self._player = LegacyPlayer(self)
+            self._player.start()
+
+    def shutdown(self):
+        if self._player:
+            self._player.stop()
+
+
+def measure(service, requests, burst, idle):
+    ''' Queue bursts of requests, waiting for each burst to finish, and return the latency of each request
+    and the number of requests that were never played. '''
+    latencies = []
+    stranded = 0
+    for start in range(0, requests, burst):
+        queued = {}
+        for i in range(start, min(start + burst, requests)):
+            path = f'track-{i}.mp3'
+            queued[path] = time.perf_counter()
+            service.play(PlayRequest(path))
+        deadline = time.perf_counter() + 2 + burst * SimulatedPlayer.duration
+        while not all(p in SimulatedPlayer.started for p in queued) and time.perf_counter() < deadline:
+            time.sleep(0.001)
+        latencies.extend(SimulatedPlayer.started[p] - t for p, t in queued.items() if p in SimulatedPlayer.started)
+        stranded += sum(1 for p in queued if p not in SimulatedPlayer.started)
+        # Let the player go idle before the next burst.
+        time.sleep(idle)
+        SimulatedPlayer.started.clear()
+    service.shutdown()
+    return latencies, stranded
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Audio player latency benchmark')
+    parser.add_argument('--requests', type=int, default=40, help='Number of requests to play')
+    parser.add_argument('--burst', type=int, default=4, help='Number of requests queued at once')
+    parser.add_argument('--track', type=float, default=0.01, help='Length of each simulated track, in seconds')
+    parser.add_argument('--idle', type=float, default=0.5, help='Seconds between bursts of requests')
+    args = parser.parse_args()
+    audio.AudioPlayer = SimulatedPlayer
+    SimulatedPlayer.duration = args.track
+    print(f'{args.requests} requests in bursts of {args.burst}, {args.track * 1e3:.0f}ms tracks')
+    print(f'{"player":<12}{"mean (ms)":>12}{"p50 (ms)":>12}{"p99 (ms)":>12}{"stranded":>10}')
+    for name, service in (('legacy', LegacyAudioService()), ('persistent', AudioService(None))):
+        latencies, stranded = measure(service, args.requests, args.burst, args.idle)
+        print(f'{name:<12}{sum(latencies) / len(latencies) * 1e3:>12.2f}'
+              f'{common.percentile(latencies, 50) * 1e3:>12.2f}{common.percentile(latencies, 99) * 1e3:>12.2f}'
+              f'{stranded:>10}')
@@ -0,0 +1,65 @@
+'''
+Created on Oct 18, 2026
+
+@author: x2012x
+
+Measures the time and memory allocated to build and serialize handler responses, comparing the
+original __dict__ based Response, serialized twice per request, with the slot based Response.
+
+    python benchmarks/bench_response.py [--iterations N]
+'''
+import argparse
+import json
+import tracemalloc
+import common
+from services.base import Response
+
+
+class LegacyResponseText(object):
+    def __init__(self, text = ''):
+        self.text = text
+
+
+class LegacyResponse(object):
+    ''' The Response model used before it was slot based '''
+    def __init__(self, spoken_text = '', background_audio = None, background_volume_shift = 20):
+        self.speech = LegacyResponseText(spoken_text)
+        self.background_audio = background_audio
+        self.background_volume_shift = background_volume_shift
+
+    def toJSON(self):
+        return json.dumps(self, default=lambda o: o.__dict__)
+
+
+def legacy_request(count):
+    responses = [LegacyResponse(f'Response number {i}.', 'resources/audio/background.mp3') for i in range(count)]
+    # Serialized once for the log line and once for the body.
+    return [(r.toJSON(), r.toJSON()) for r in responses]
+
+
+def request(count):
+    responses = [Response(f'Response number {i}.', 'resources/audio/background.mp3') for i in range(count)]
+    return [r.toJSON() for r in responses]
+
+
+def allocated(fn, count):
+    ''' Return the peak bytes allocated by a call of fn '''
+    tracemalloc.start()
+    fn(count)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return peak
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Response model benchmark')
+    parser.add_argument('--iterations', type=int, default=20000)
+    args = parser.parse_args()
+    print(f'object size: legacy {LegacyResponse().__sizeof__() + LegacyResponse().__dict__.__sizeof__()} bytes  '
+          f'slots {Response().__sizeof__()} bytes')
+    for count in (1, 50):
+        iterations = max(1, args.iterations // count)
+        before = common.timeit(lambda: legacy_request(count), iterations)
+        after = common.timeit(lambda: request(count), iterations)
+        print(f'{count:>3} responses: before {before:8.2f} us {allocated(legacy_request, count):7} bytes  '
+              f'after {after:8.2f} us {allocated(request, count):7} bytes  ({before / after:4.1f}x)')
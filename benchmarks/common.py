@@ -0,0 +1,30 @@
+'''
+Created on Oct 18, 2026
+
+@author: x2012x
+
+Shared setup for the benchmark scripts. Benchmarks are run from the repository root
+(e.g. python benchmarks/bench_engines.py) and operate on the modules in 'src', which
+expect to be run from within that directory.
+'''
+import os
+import sys
+import time
+
+SRC = os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, 'src')
+sys.path.insert(0, os.path.abspath(SRC))
+os.chdir(SRC)
+
+
+def percentile(samples, pct):
+    ''' Return the pct percentile of the supplied samples '''
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+def timeit(fn, iterations):
+    ''' Return the mean time, in microseconds, of calling fn '''
+    start = time.perf_counter()
+    for _ in range(iterations):
+        fn()
+    return (time.perf_counter() - start) / iterations * 1e6
@@ -32,10 +32,10 @@ class ChromecastHandler(BaseHandler):
     def __init__(self, conductor):
         super().__init__(conductor, 'chromecast', {STOP_VIDEO, VIDEO_ACTION})
         
-    def stop(self, device, muted, force=False):
+    def stop(self, device: str, muted: bool, force: bool = False):
         return self.conductor.chromecast.stop(device, muted, force)
     
-    def action(self, device, action):
+    def action(self, device: str, action: str):
         return self.conductor.chromecast.action(device, action)
         
     def _handle_intent(self, intent):
@@ -27,7 +27,7 @@ class LightsHandler(BaseHandler):
     def __init__(self, conductor):
         super().__init__(conductor, 'lights', {CHANGE_LIGHT_STATE})
 
-    def power(self, lights, duration, power):
+    def power(self, lights: str, duration: float, power: str):
         return self.conductor.lights.power(lights, duration, power)
         
     def _handle_intent(self, intent):
@@ -11,7 +11,7 @@ from pathlib import Path
 from utils.configuration import config
 from services.base import BaseService, Response
 from errors.reasons import get_general_failure
-from services.audio import PlayRequest
+from services.audio import PlayRequest, MEDIA
 from handlers.base import BaseHandler
 from errors.exceptions import SpeakableException
 
@@ -64,7 +64,7 @@ class NewsService(BaseService):
     def latest(self):
         try:
             news_file = self._fetch_latest()
-            self.conductor.audio.play(PlayRequest(news_file))
+            self.conductor.audio.play(PlayRequest(news_file, priority=MEDIA))
         except Exception:
             raise NewsFailure(get_general_failure())            
         return Response()
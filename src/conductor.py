@@ -25,16 +25,32 @@ from services.routines import RoutinesService
 from services.state import StateService
 from services.tts import TextToSpeechService
 from servers.http import Conductor
+from servers.aio import AsyncConductor
+from utils.configuration import setting
 
 
 if __name__ == '__main__':
     parser = argparse.ArgumentParser(description='Conductor for home automation tasks')
     parser.add_argument('address', type=str, help='IP address to bind to')
     parser.add_argument('port', type=int, help='Port to listen on')
+    parser.add_argument('--engine', choices=['threaded', 'asyncio'], default=setting('Server', 'engine', default='threaded'),
+                        help='Server engine used to accept requests')
     args = parser.parse_args()
-    server = Conductor((args.address, args.port),
-                       (AudioService, CalendarService, RoutinesService, StateService, TextToSpeechService), 
-                       (AdministrationHandler, StateHandler, CalendarHandler, RoutinesHandler, AudioHandler, TextToSpeechHandler))
-    logger.info(f'Conductor listening on {args.address}:{args.port}')
+    services = (AudioService, CalendarService, RoutinesService, StateService, TextToSpeechService)
+    handlers = (AdministrationHandler, StateHandler, CalendarHandler, RoutinesHandler, AudioHandler, TextToSpeechHandler)
+    if args.engine == 'asyncio':
+        server = AsyncConductor((args.address, args.port), services, handlers,
+                                workers=setting('Server', 'workers', default=4),
+                                idle_timeout=setting('Server', 'idle_timeout', default=15),
+                                max_requests=setting('Server', 'max_requests', default=100))
+    else:
+        server = Conductor((args.address, args.port), services, handlers,
+                           workers=setting('Server', 'pool', 'workers', default=8),
+                           queue_size=setting('Server', 'pool', 'queue_size', default=16),
+                           deadline=setting('Server', 'pool', 'deadline', default=10),
+                           timeout=setting('Server', 'pool', 'timeout', default=30),
+                           idle_timeout=setting('Server', 'idle_timeout', default=15),
+                           max_requests=setting('Server', 'max_requests', default=100))
+    logger.info(f'Conductor ({args.engine}) listening on {args.address}:{args.port}')
     server.serve_forever()
     logger.info('Conductor shutdown')
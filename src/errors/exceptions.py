@@ -15,6 +15,12 @@ class UnsupportedIntent(ConductorException):
 class RegistrationExists(ConductorException):
     pass
 
+class InvalidParameter(ConductorException):
+    pass
+
+class CircuitOpen(ConductorException):
+    pass
+
 class SpeakableException(ConductorException):
     def __init__(self, phrase):
         self.phrase = phrase    
@@ -24,3 +24,7 @@ def get_general_failure():
 def get_reason(exception):
     ''' Get a random reason for the supplied exception type. '''
     return random.choice(EXCEPTION_REASONS[type(exception)])
+
+def phrases():
+    ''' Get every failure and exception reason. '''
+    return GENERAL_FAILURES + [reason for reasons in EXCEPTION_REASONS.values() for reason in reasons]
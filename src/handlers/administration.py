@@ -5,7 +5,8 @@ Created on Jan 1, 2021
 '''
 from handlers.base import BaseHandler
 import threading
-from services.base import Response
+from services.base import Response, RawResponse
+from utils.metrics import metrics
 
 
 class AdministrationHandler(BaseHandler):
@@ -18,5 +19,17 @@ class AdministrationHandler(BaseHandler):
         ''' Shutdown the conductor '''
         threading.Thread(target=self.conductor.shutdown).start()
         
+    def server_status(self):
+        ''' Report the utilization of the server's workers '''
+        return Response(data=self.conductor.server_status())
+        
+    def metrics(self):
+        ''' Report request counters and latency histograms in the Prometheus text format '''
+        return RawResponse(metrics.render(), 'text/plain; version=0.0.4; charset=utf-8')
+        
+    def prewarm_status(self):
+        ''' Report the progress of pre-warming the TTS cache '''
+        return Response(data=self.conductor.tts.prewarm_status())
+        
     def _handle_intent(self, intent):
         return Response()
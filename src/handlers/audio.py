@@ -4,6 +4,7 @@ Created on Jun 2, 2021
 @author: x2012x
 '''
 from handlers.base import BaseHandler
+from services.base import Response
 
 # Intents
 AUDIO_STOP = 'AudioStop'
@@ -16,8 +17,16 @@ class AudioHandler(BaseHandler):
         super().__init__(conductor, 'audio', {AUDIO_STOP})
         
     def stop(self):
-        ''' Request that current audio playback be stopped '''
-        return self.conductor.audio.shutdown()
+        ''' Request that current audio playback be stopped and queued audio be dropped '''
+        return self.conductor.audio.stop()
+    
+    def skip(self):
+        ''' Stop the current audio playback, continuing with the next queued audio '''
+        return Response(data={'skipped': self.conductor.audio.skip()})
+    
+    def status(self):
+        ''' Report the status of the audio service '''
+        return Response(data=self.conductor.audio.status())
     
     def _handle_intent(self, intent):
         if intent['intent']['name'] == AUDIO_STOP:
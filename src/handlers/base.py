@@ -3,12 +3,15 @@ Created on Dec 30, 2020
 
 @author: x2012x
 '''
+import asyncio
 import logging
-from urllib.parse import parse_qs
-from inspect import signature, Parameter
+import time
+from inspect import iscoroutinefunction, isawaitable
 from errors.exceptions import UnsupportedAction, SpeakableException
 from abc import abstractmethod, ABC
 from services.base import Response
+from handlers.binding import ActionPlan, infer
+from utils.metrics import metrics, REQUEST_SECONDS
 
 logger = logging.getLogger(__name__)
 
@@ -19,42 +22,122 @@ class BaseHandler(ABC):
     Handlers are responsible for processing intents and also HTTP actions.
     All handlers define their intent processing logic by implementing the _handle_intent(intent) method.
     The processing of HTTP actions is done automatically by this base class by way of mapping the requested 
-    action to a method signature on the handler. 
+    action to a method signature on the handler. Every public method defined by the implementing class is 
+    an action, the binding of each action is compiled once by compile_actions(). Query parameters are 
+    converted to the type annotated on the method's arguments (str, int, float, bool or any type that can be 
+    constructed from a string), unannotated arguments have their type inferred from the value.
+    
+    Speech in the responses of a handler is spoken before the HTTP response is returned, unless deferred 
+    speech is enabled globally (the TTS 'deferred' setting) or by the handler's deferred_speech attribute. 
+    Deferred speech is spoken in the background and failures are reported by the TTS status instead.
     
     Arguments:
         conductor (Conductor): reference to the running Conductor instance.
         base_path (str): the base URL path that this is registered to handle actions.
         intents ({str}): a set of intent names that this is registered to handle.   
     '''  
+    # Override to True or False to defer, or not, the speech of this handler's responses. 
+    # If None, the global TTS 'deferred' setting is used.
+    deferred_speech = None
+    
     def __init__(self, conductor, base_path, intents={}):
         self.conductor = conductor
         self.base_path = base_path
         self.intents = intents
+        # Route table of action name to ActionPlan, compiled when registered with the conductor.
+        self.actions = None
+
+    def compile_actions(self):
+        ''' Compile the route table of this handler's actions.
+        
+        Returns:
+            actions ({str: ActionPlan}): map of action name to its compiled binding plan.
+        '''
+        actions = {}
+        for name in dir(self):
+            # Private methods and those provided by the base class are not actions.
+            if name.startswith('_') or hasattr(BaseHandler, name):
+                continue
+            attribute = getattr(self, name)
+            if callable(attribute):
+                actions[name] = ActionPlan(name, attribute, self._convert_param)
+        self.actions = actions
+        return actions
+
+    def phrases(self):
+        ''' Phrases known to be spoken by this handler, used to pre-warm the TTS cache. '''
+        return []
 
     def _convert_param(self, param):
-        ''' Infer the parameter data type and return the converted value '''
+        ''' Infer the parameter data type and return the converted value.
+        
+        Used for action arguments without a type annotation and for variable kwargs. Arguments with 
+        an annotation are converted to the annotated type instead (e.g. name: str is never converted).
+        '''
         # Assume the param has already been converted, if not a string
         if not isinstance(param, str):
             return param
-        # Attempt integer conversion
-        try:
-            return int(param)
-        except:
-            logger.debug(f'Cannot convert {param} to int')
-        # Attempt float conversion
+        return infer(param)
+        
+    def _invoke_action(self, action, request):
+        ''' Map the request params to the action's method arguments and invoke it.
+        
+        Arguments:
+            action (str): name of the action to execute, this must map to a method on the action.
+            request: urlparse result from conductor pre-processing of the HTTP request.
+            
+        Returns:
+            response: The raw response returned by the action, or a coroutine if the action is one.
+        '''
+        if self.actions is None:
+            self.compile_actions()
+        if action not in self.actions:
+            raise UnsupportedAction(f'Unknown action: /{self.base_path}/{action}')
+        plan = self.actions[action]
+        args, kwargs = plan.bind(request.query)
+        logger.debug(f'Invoking action {action} with args {args} and kwargs {kwargs}')
+        return plan.method(*args, **kwargs)
+
+    def is_coroutine(self, action=None):
+        ''' Determine if the target of an action, or of intent processing if no action is supplied, is a coroutine.
+        
+        Arguments:
+            action (str): name of the action to examine.
+        '''
+        if not action:
+            return iscoroutinefunction(self._handle_intent)
+        if self.actions is None:
+            self.compile_actions()
+        return action in self.actions and self.actions[action].is_coroutine
+
+    def invoke_action(self, action, request):
+        ''' Process a requested action without the conductor's response processing, so the responses 
+        of several requests can be processed together.
+        
+        Arguments:
+            action (str): name of the action to execute, this must map to a method on the action.
+            request: urlparse result from conductor pre-processing of the HTTP request.
+            
+        Returns:
+            response: The raw response returned by the action.
+        '''
+        response = Response()
+        start = time.perf_counter()
         try:
-            return float(param)
-        except:
-            logger.debug(f'Cannot convert {param} to float')
-        # Attempt boolean conversion
-        TRUE = 'true'
-        FALSE = 'false'
-        param_lower = param.lower()
-        if param_lower in [TRUE, FALSE]:
-            return param_lower == TRUE
-        # No conversion possible, return unconverted
-        return param
+            result = self._invoke_action(action, request)
+            # Coroutine actions served by a threaded engine are run to completion on this thread.
+            response = asyncio.run(result) if isawaitable(result) else result
+        except SpeakableException as e:
+            response.speech.text = e.phrase
+        finally:
+            self._record(action, start)
+        return response
         
+    def _record(self, action, start):
+        ''' Record the latency of the handler's logic for an action or intent '''
+        metrics.observe(REQUEST_SECONDS, (('handler', self.base_path), ('action', action), ('stage', 'handler')),
+                        time.perf_counter() - start)
+
     def handle_action(self, action, request):
         ''' Process a requested action
         
@@ -68,34 +151,52 @@ class BaseHandler(ABC):
         Returns:
             response: The final response object returned from conductor response processing.            
         '''
-        if hasattr(self, action):
-            response = Response()
-            try:
-                # Handlers only support single value query parameters.
-                query = {k : self._convert_param(v[0]) for k, v in parse_qs(request.query).items()}
-                method = getattr(self, action)
-                uses_kwargs = False
-                # Process query params to positional method args.
-                args = []
-                for param in signature(method).parameters.values():
-                    # Track if the target method supports variable kwargs
-                    if param.kind == Parameter.VAR_KEYWORD:
-                        uses_kwargs = True
-                    else:
-                        # If an argument has a default value and it is not specified in the query parameters, use the default.
-                        args.append(param.default if param.name not in query and param.default != Parameter.empty else query.pop(param.name))
-                if uses_kwargs:
-                    logger.debug(f'Invoking action {action} with args {args} and kwargs {query}')
-                    response = method(*args, **query)
-                else:
-                    logger.debug(f'Invoking action {action} with args {args}')
-                    response = method(*args)
-            except SpeakableException as e:
-                response.speech.text = e.phrase
-            return self.conductor.process_response(response)
-        else:
-            raise UnsupportedAction(f'Unknown action: /{self.base_path}/{action}')
+        return self.conductor.process_response(self.invoke_action(action, request), self.deferred_speech)
+
+    async def handle_action_async(self, action, request, executor=None):
+        ''' Process a requested action whose method is a coroutine.
         
+        The action is awaited on the running event loop and the conductor's response processing, 
+        which may block on TTS, is run on the supplied executor.
+        
+        Arguments:
+            action (str): name of the action to execute, this must map to a coroutine on the action.
+            request: urlparse result from conductor pre-processing of the HTTP request.
+            executor (Executor): executor to run response processing on, the loop's default if None.
+            
+        Returns:
+            response: The final response object returned from conductor response processing.            
+        '''
+        response = Response()
+        start = time.perf_counter()
+        try:
+            response = await self._invoke_action(action, request)
+        except SpeakableException as e:
+            response.speech.text = e.phrase
+        finally:
+            self._record(action, start)
+        return await asyncio.get_running_loop().run_in_executor(executor, self.conductor.process_response, response, self.deferred_speech)
+        
+    def invoke_intent(self, intent):
+        ''' Process a received intent without the conductor's response processing, see invoke_action.
+        
+        Arguments:
+            intent (json): JSON intent structure extracted by the conductor from the request payload.
+            
+        Returns:
+            response: The raw response returned by _handle_intent.
+        '''
+        response = Response()
+        start = time.perf_counter()
+        try:
+            result = self._handle_intent(intent)
+            response = asyncio.run(result) if isawaitable(result) else result
+        except SpeakableException as e:
+            response.speech.text = e.phrase
+        finally:
+            self._record(intent['intent']['name'], start)
+        return response
+
     def handle_intent(self, intent):
         ''' Process a received intent
         
@@ -107,12 +208,27 @@ class BaseHandler(ABC):
         Returns:
             response: The final response object returned from conductor response processing.            
         '''        
+        return self.conductor.process_response(self.invoke_intent(intent), self.deferred_speech) 
+
+    async def handle_intent_async(self, intent, executor=None):
+        ''' Process a received intent with a coroutine _handle_intent(intent) implementation.
+        
+        Arguments:
+            intent (json): JSON intent structure extracted by the conductor from the request payload.
+            executor (Executor): executor to run response processing on, the loop's default if None.
+            
+        Returns:
+            response: The final response object returned from conductor response processing.            
+        '''
         response = Response()
+        start = time.perf_counter()
         try:
-            response = self._handle_intent(intent)
+            response = await self._handle_intent(intent)
         except SpeakableException as e:
             response.speech.text = e.phrase
-        return self.conductor.process_response(response) 
+        finally:
+            self._record(intent['intent']['name'], start)
+        return await asyncio.get_running_loop().run_in_executor(executor, self.conductor.process_response, response, self.deferred_speech)
 
     @abstractmethod
     def _handle_intent(self, intent):
@@ -0,0 +1,149 @@
+'''
+Created on Oct 18, 2026
+
+@author: x2012x
+'''
+import re
+import typing
+from inspect import signature, Parameter, iscoroutinefunction
+from urllib.parse import parse_qs
+from errors.exceptions import InvalidParameter
+
+# Query parameter values that are accepted for bool arguments.
+BOOLEANS = {'true': True, 'false': False,
+            '1': True, '0': False,
+            'yes': True, 'no': False,
+            'on': True, 'off': False}
+
+_INT = re.compile(r'[+-]?\d+')
+_FLOAT = re.compile(r'[+-]?(\d+\.\d*|\.\d+|\d+)([eE][+-]?\d+)?')
+
+
+def infer(value):
+    ''' Infer the data type of an untyped query parameter and return the converted value.
+
+    Used for arguments without a type annotation. The type is detected by matching the value's
+    format, rather than attempting each conversion, so unconvertible values don't raise.
+
+    Arguments:
+        value (str): query parameter value.
+    '''
+    if _INT.fullmatch(value):
+        return int(value)
+    if _FLOAT.fullmatch(value):
+        return float(value)
+    lower = value.lower()
+    if lower == 'true' or lower == 'false':
+        return lower == 'true'
+    return value
+
+
+def to_bool(value):
+    ''' Convert a query parameter to a bool '''
+    return BOOLEANS[value.lower()]
+
+
+def converter_for(annotation):
+    ''' Get the converter function for an argument's type annotation.
+
+    Arguments:
+        annotation: type annotation of the argument, Parameter.empty if unannotated.
+
+    Returns:
+        converter: callable taking the query parameter string, None if the string is used as-is.
+    '''
+    # Optional[X] is converted as X
+    if typing.get_origin(annotation) is typing.Union:
+        types = [a for a in typing.get_args(annotation) if a is not type(None)]
+        annotation = types[0] if len(types) == 1 else Parameter.empty
+    if annotation is Parameter.empty or annotation is typing.Any:
+        return infer
+    if annotation is str:
+        return None
+    if annotation is bool:
+        return to_bool
+    if callable(annotation):
+        # int, float and any other type that can be constructed from a string
+        return annotation
+    return infer
+
+
+class ParameterPlan(object):
+    ''' Binding details of a single action method argument.
+
+    Arguments:
+        name (str): name of the argument.
+        default: default value of the argument, Parameter.empty if it is required.
+        converter (callable): converts a query parameter string to the argument's value,
+            None if the string is used unconverted.
+    '''
+    def __init__(self, name, default, converter):
+        self.name = name
+        self.default = default
+        self.required = default is Parameter.empty
+        self.converter = converter
+
+    def convert(self, value):
+        ''' Convert the supplied query parameter string to the argument's value '''
+        if self.converter is None:
+            return value
+        try:
+            return self.converter(value)
+        except (ValueError, TypeError, KeyError):
+            raise InvalidParameter(f'Invalid value for parameter {self.name}: {value}')
+
+
+class ActionPlan(object):
+    ''' Precompiled binding of HTTP query parameters to the arguments of an action method.
+
+    The method signature and type annotations are inspected once, when the plan is compiled, so
+    binding a request only needs to apply the cached parameter plans.
+
+    Arguments:
+        name (str): name of the action.
+        method (callable): bound handler method invoked for the action.
+        converter (callable): converts query parameter strings for unannotated arguments and kwargs.
+    '''
+    def __init__(self, name, method, converter):
+        self.name = name
+        self.method = method
+        self.converter = converter
+        self.params = []
+        # Track if the target method supports variable kwargs
+        self.takes_kwargs = False
+        try:
+            hints = typing.get_type_hints(method)
+        except Exception:
+            hints = {}
+        for param in signature(method).parameters.values():
+            if param.kind == Parameter.VAR_KEYWORD:
+                self.takes_kwargs = True
+            elif param.kind != Parameter.VAR_POSITIONAL:
+                annotation = hints.get(param.name, param.annotation)
+                param_converter = converter if annotation is Parameter.empty else converter_for(annotation)
+                self.params.append(ParameterPlan(param.name, param.default, param_converter))
+        self.is_coroutine = iscoroutinefunction(method)
+
+    def bind(self, query_string):
+        ''' Bind a query string to the method's arguments.
+
+        Arguments:
+            query_string (str): query component of the requested URL.
+
+        Returns:
+            (args, kwargs): positional arguments and, if the method accepts them, variable kwargs.
+        '''
+        # Handlers only support single value query parameters.
+        query = {k : v[0] for k, v in parse_qs(query_string).items()} if query_string else {}
+        args = []
+        for param in self.params:
+            if param.name in query:
+                args.append(param.convert(query.pop(param.name)))
+            elif param.required:
+                raise InvalidParameter(f'Missing required parameter: {param.name}')
+            else:
+                # If an argument has a default value and it is not specified in the query parameters, use the default.
+                args.append(param.default)
+        if self.takes_kwargs:
+            return args, {k : self.converter(v) for k, v in query.items()}
+        return args, {}
@@ -15,7 +15,7 @@ class RoutinesHandler(BaseHandler):
     def __init__(self, conductor):
         super().__init__(conductor, 'routines', {ROUTINE_INVOKE})
         
-    def invoke(self, name):
+    def invoke(self, name: str):
         ''' Execute a routine by name 
         
         Arguments:
@@ -15,17 +15,24 @@ class TextToSpeechHandler(BaseHandler):
     def __init__(self, conductor):
         super().__init__(conductor, 'tts')
         
-    def speak(self, text_content):
+    def speak(self, text_content: str):
         ''' Handle a request to speak the supplied text_content
         
         Arguments:
             text_content (str): string to pass to the TTS service for processing.
         '''
         try:
-            self.conductor.tts.speak(text_content)
+            if self.conductor.is_deferred(self.deferred_speech):
+                self.conductor.tts.speak_later([Response(text_content)])
+            else:
+                self.conductor.tts.speak(text_content)
         except Exception as e:
             logger.error(f'Failed to speak request: {e}')
         return Response()
     
+    def status(self):
+        ''' Report the status of deferred speech, including recent failures, and the TTS cache '''
+        return Response(data=self.conductor.tts.status())
+    
     def _handle_intent(self, intent):
         return Response()
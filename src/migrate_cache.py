@@ -0,0 +1,63 @@
+'''
+Created on Oct 18, 2026
+
+@author: x2012x
+
+Migrate the TTS cache from the 'files' layout (an audio and text file per recording) to the
+'packed' layout. Run from the 'src' directory, while the Conductor is stopped, then set the
+TTS cache format to 'packed' in application.yaml.
+'''
+import argparse
+import os
+import time
+from services.tts_packed import PackedTTSCache
+
+
+def migrate(source, target, remove = False):
+    ''' Copy every recording in the source cache directory into a packed cache.
+
+    Recordings are copied in the order they were created, so the most recent recordings are
+    treated as the most recently used.
+
+    Arguments:
+        source (str): path to the 'files' cache directory.
+        target (str): path to the 'packed' cache directory.
+        remove (bool): True to remove each recording from the source once it's copied.
+
+    Returns:
+        (migrated, skipped): number of recordings copied and the number without a transcription.
+    '''
+    recordings = []
+    with os.scandir(source) as scan:
+        for item in scan:
+            if item.name.endswith('.mp3'):
+                recordings.append((item.stat().st_mtime, item.name[:-4]))
+    recordings.sort()
+    cache = PackedTTSCache(target)
+    cache.load(wait=True)
+    migrated = skipped = 0
+    for mtime, text_hash in recordings:
+        audio_file = os.path.join(source, f'{text_hash}.mp3')
+        text_file = os.path.join(source, f'{text_hash}.txt')
+        if not os.path.exists(text_file):
+            skipped += 1
+            continue
+        with open(text_file) as text, open(audio_file, 'rb') as audio:
+            cache.put(text_hash, text.read(), audio.read(), last_used=mtime)
+        migrated += 1
+        if remove:
+            os.remove(audio_file)
+            os.remove(text_file)
+    return migrated, skipped
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Migrate the TTS cache to the packed layout')
+    parser.add_argument('--source', default='resources/cache/tts_cache', help='Path to the files cache directory')
+    parser.add_argument('--target', default='resources/cache/tts_packed', help='Path to the packed cache directory')
+    parser.add_argument('--remove', action='store_true', help='Remove recordings from the source once migrated')
+    args = parser.parse_args()
+    start = time.perf_counter()
+    migrated, skipped = migrate(args.source, args.target, args.remove)
+    print(f'Migrated {migrated} recordings to {args.target} in {time.perf_counter() - start:.2f}s'
+          + (f', skipped {skipped} without a transcription' if skipped else ''))
@@ -0,0 +1,185 @@
+'''
+Created on Oct 18, 2026
+
+@author: x2012x
+'''
+import asyncio
+import json
+import logging
+import socket
+import time
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+from http import HTTPStatus
+from urllib.parse import urlparse
+from errors.exceptions import UnsupportedAction, UnsupportedIntent, InvalidParameter
+from servers.base import BaseConductor, BATCH_PATH
+
+logger = logging.getLogger(__name__)
+
+
+class AsyncConductor(BaseConductor):
+    '''
+    Conductor HTTP Server backed by an asyncio event loop.
+
+    Connections are served by a single event loop thread instead of a thread per connection. Handlers
+    whose actions (or _handle_intent) are coroutines are awaited on the loop, all other handlers are run
+    on a bounded pool of worker threads.
+
+    Arguments:
+        server_address ((str,int)): tuple representing the IP and Port to listen on.
+        services ([BaseService]): collection of class definitions all derived from BaseService.
+        handlers ([BaseHandler]): collection of class definitions all derived from BaseHandler.
+        workers (int): max number of threads used to run blocking handlers.
+        idle_timeout (float): seconds an idle persistent connection is held open.
+        max_requests (int): max number of requests served on a connection, 0 for no limit.
+    '''
+    def __init__(self, server_address, services, handlers, workers=4, idle_timeout=15, max_requests=100):
+        # Bind immediately, like the threaded engine, so the listening address is known once constructed.
+        self.socket = socket.create_server(server_address)
+        self.server_address = self.socket.getsockname()[:2]
+        self._workers = workers
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='ConductorWorker')
+        self._idle_timeout = idle_timeout
+        self._max_requests = max_requests
+        self._loop = None
+        self._stop = None
+        super().__init__(services, handlers)
+
+    def serve_forever(self):
+        ''' Serve requests until shutdown is requested '''
+        try:
+            asyncio.run(self._serve())
+        finally:
+            self._executor.shutdown(wait=False)
+            self.socket.close()
+
+    def server_status(self):
+        return dict(super().server_status(), engine='asyncio', workers=self._workers)
+
+    def shutdown(self):
+        '''Shutdown the Conductor HTTP service'''
+        # Shutdown all services before shutting down the Conductor
+        self.shutdown_services()
+        if self._loop:
+            self._loop.call_soon_threadsafe(self._stop.set)
+
+    async def _serve(self):
+        self._loop = asyncio.get_running_loop()
+        self._stop = asyncio.Event()
+        server = await asyncio.start_server(self._handle_connection, sock=self.socket)
+        async with server:
+            await self._stop.wait()
+
+    async def _handle_connection(self, reader, writer):
+        ''' Serve all requests received on a connection until it is closed, goes idle or has served the max number of requests '''
+        served = 0
+        try:
+            while True:
+                request_line = await asyncio.wait_for(reader.readline(), self._idle_timeout)
+                if not request_line.strip():
+                    break
+                method, path, version = request_line.decode('iso-8859-1').split()
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b'\r\n', b'\n', b''):
+                        break
+                    name, _, value = line.decode('iso-8859-1').partition(':')
+                    headers[name.strip().lower()] = value.strip()
+                length = int(headers.get('content-length', 0))
+                body = await reader.readexactly(length) if length else b''
+                connection = headers.get('connection', '').lower()
+                keep_alive = connection == 'keep-alive' if version == 'HTTP/1.0' else connection != 'close'
+                served += 1
+                if self._max_requests and served >= self._max_requests:
+                    keep_alive = False
+                status, payload, content_type = await self._process_request(method, path, body)
+                self._write_response(writer, status, payload, keep_alive, content_type)
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (asyncio.TimeoutError, asyncio.IncompleteReadError, ConnectionError):
+            pass
+        except ValueError:
+            # Malformed request line or headers
+            self._write_response(writer, HTTPStatus.BAD_REQUEST, b'', False)
+        finally:
+            writer.close()
+
+    def _write_response(self, writer, status, payload, keep_alive, content_type='application/json'):
+        status = HTTPStatus(status)
+        head = [f'HTTP/1.1 {status.value} {status.phrase}',
+                f'Content-Length: {len(payload)}',
+                'Connection: keep-alive' if keep_alive else 'Connection: close']
+        if payload:
+            head.append(f'Content-type: {content_type}')
+        writer.write(('\r\n'.join(head) + '\r\n\r\n').encode('iso-8859-1') + payload)
+
+    async def _dispatch_async(self, handler, action, parsed_path, intent=None):
+        ''' Process the supplied intent or action with a handler whose implementation is a coroutine '''
+        start = time.perf_counter()
+        outcome = 'error'
+        try:
+            if intent:
+                response = await handler.handle_intent_async(intent, self._executor)
+            else:
+                response = await handler.handle_action_async(action, parsed_path, self._executor)
+            outcome = 'ok'
+            return response
+        finally:
+            self.record_dispatch(handler.base_path, action or intent['intent']['name'], start, outcome)
+
+    async def _process_request(self, method, path, body):
+        ''' Process a request either by handling the posted intent or requested path
+
+        Returns:
+            (status, payload, content_type): HTTP status code, encoded response body and its media type.
+        '''
+        intent = None
+        try:
+            if method not in ('GET', 'PUT', 'POST'):
+                return HTTPStatus.NOT_IMPLEMENTED, b'', None
+            # A batch of intents and paths is processed together.
+            if method == 'POST' and urlparse(path).path == BATCH_PATH:
+                try:
+                    batch = json.loads(body)
+                except ValueError as e:
+                    logger.error(f'Invalid batch: {e}')
+                    return HTTPStatus.BAD_REQUEST, json.dumps({'error': f'Invalid batch: {e}'}).encode("utf_8"), 'application/json'
+                logger.info(f'Processing batch: {batch}')
+                response = await self._loop.run_in_executor(self._executor, self.dispatch_batch, batch)
+                return (HTTPStatus.OK, *self.encode_response(response))
+            # If the path posted to was the 'intent' path, parse the intent JSON and pass the intent along for further processing.
+            if method == 'POST' and path.endswith('intent'):
+                try:
+                    intent = json.loads(body)
+                except ValueError as e:
+                    logger.error(f'Invalid intent: {e}')
+                    return HTTPStatus.BAD_REQUEST, json.dumps({'error': f'Invalid intent: {e}'}).encode("utf_8"), 'application/json'
+                logger.info(f'Processing intent: {intent}')
+            else:
+                logger.info(f'Processing path: {path}')
+            handler, action, parsed_path = self.route(path, intent)
+            if handler.is_coroutine(action):
+                # Identical intents are coalesced as they are by dispatch.
+                if intent and self._intents:
+                    response = await self._intents.do_async(self.intent_key(intent), self._dispatch_async,
+                                                            handler, action, parsed_path, intent)
+                else:
+                    response = await self._dispatch_async(handler, action, parsed_path, intent)
+            else:
+                response = await self._loop.run_in_executor(self._executor, self.dispatch, path, intent)
+            return (HTTPStatus.OK, *self.encode_response(response))
+        except UnsupportedAction:
+            logger.error(f'Unsupported action: {path}\n{traceback.format_exc()}')
+            return HTTPStatus.BAD_REQUEST, b'', None
+        except UnsupportedIntent:
+            logger.error(f'Unsupported intent: {intent}\n{traceback.format_exc()}')
+            return HTTPStatus.BAD_REQUEST, b'', None
+        except InvalidParameter as e:
+            logger.error(f'Invalid parameter: {path} {e}')
+            return HTTPStatus.BAD_REQUEST, json.dumps({'error': str(e)}).encode("utf_8"), 'application/json'
+        except Exception:
+            logger.error(f'Error processing request: {path}\n{traceback.format_exc()}')
+            return HTTPStatus.INTERNAL_SERVER_ERROR, b'', None
@@ -0,0 +1,324 @@
+'''
+Created on Oct 18, 2026
+
+@author: x2012x
+'''
+import json
+import logging
+import time
+import traceback
+from collections.abc import Iterable
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlparse
+from errors.exceptions import UnsupportedAction, RegistrationExists,\
+    UnsupportedIntent, ConductorException, InvalidParameter
+from errors import reasons
+from errors.reasons import get_reason
+from services.base import Response, RawResponse
+from utils.configuration import setting
+from utils.metrics import metrics, REQUESTS, REQUEST_SECONDS
+from utils.singleflight import SingleFlight
+
+logger = logging.getLogger(__name__)
+
+# Path that batches of intents and actions are posted to.
+BATCH_PATH = '/batch'
+
+
+class BaseConductor(object):
+    '''
+    Base class for the Conductor server engines.
+
+    Holds the registered services and handlers and implements the request dispatch that
+    is shared by every server engine. Engines are responsible for accepting connections,
+    parsing HTTP and writing the results of dispatch back to the requestor.
+
+    Arguments:
+        services ([BaseService]): collection of class definitions all derived from BaseService.
+        handlers ([BaseHandler]): collection of class definitions all derived from BaseHandler.
+    '''
+    def __init__(self, services, handlers):
+        # Speak responses in the background, rather than before replying, unless a handler overrides it.
+        self.deferred_speech = setting('TTS', 'deferred', default=False)
+        # Keep track of registered service names
+        self.services = set()
+        # Register all services
+        for service in services:
+            self.register_service(service(self))
+        # Map of registered handlers
+        self.handlers = {}
+        for handler in handlers:
+            self.register_handler(handler(self))
+        # Tracks the last collection of responses that were processed.
+        self.last_response = None
+        # Shares the response to an intent with identical intents, such as those received from several satellites 
+        # or retried by Rhasspy, that arrive while it is processed or within the window after.
+        self._intents = None
+        if setting('Server', 'coalesce', 'enabled', default=True):
+            self._intents = SingleFlight(window=setting('Server', 'coalesce', 'window', default=1.5))
+        # Dispatches the items of a batch concurrently.
+        self.batch_max_items = setting('Server', 'batch', 'max_items', default=16)
+        self._batch_executor = ThreadPoolExecutor(max_workers=setting('Server', 'batch', 'workers', default=4),
+                                                  thread_name_prefix='ConductorBatch')
+        # Pre-warm the TTS cache with the phrases that are known to be spoken.
+        if 'tts' in self.services:
+            self.tts.prewarm(self.phrases())
+
+    def phrases(self):
+        ''' Collect the phrases known to be spoken by the registered services and handlers and the failure reasons. '''
+        phrases = reasons.phrases()
+        for service in self.services:
+            phrases.extend(getattr(self, service).phrases())
+        for handler in {id(h): h for h in self.handlers.values()}.values():
+            phrases.extend(handler.phrases())
+        return phrases
+
+    def server_status(self):
+        ''' Get the status of the server engine.
+
+        Returns:
+            status (dict): the engine name, its worker metrics and the number of intents that shared the 
+                response of an identical intent.
+        '''
+        return {'engine': None,
+                'coalesced_intents': self._intents.deduplicated if self._intents else None}
+
+    def shutdown_services(self):
+        ''' Shutdown all registered services '''
+        for service in self.services:
+            if hasattr(self, service):
+                getattr(self, service).shutdown()
+        self._batch_executor.shutdown(wait=False)
+
+    def register_service(self, service):
+        ''' Register the supplied service with the conductor
+
+        Arguments:
+            service (BaseService): an object derived from BaseService.
+        '''
+        logger.debug(f'Registering Service: {service.name}')
+        if hasattr(self, service.name):
+            raise RegistrationExists(f'Service already registered: {service.name}')
+        setattr(self, service.name, service)
+        self.services.add(service.name)
+
+    def register_handler(self, handler):
+        ''' Register the supplied handler with the conductor
+
+        Arguments:
+            handler (BaseHandler): an object derived from BaseHandler.
+        '''
+        logger.debug(f'Registering Handler Path: {handler.base_path}')
+        if handler.base_path in self.handlers:
+            raise RegistrationExists(f'Path already registered: {handler.base_path}')
+        # Compile the handler's route table once, rather than inspecting its methods on every request.
+        for action in handler.compile_actions():
+            logger.debug(f'Registering Handler Action: /{handler.base_path}/{action}')
+        self.handlers[handler.base_path] = handler
+        for intent in handler.intents:
+            logger.debug(f'Registering Handler Intent: {intent}')
+            if intent in self.handlers:
+                raise RegistrationExists(f'Intent already registered: {intent}')
+            self.handlers[intent] = handler
+
+    def route(self, path, intent=None):
+        ''' Locate the registered handler for the supplied intent or path.
+
+        Arguments:
+            path (str): requested HTTP path.
+            intent (json): JSON intent structure, if an intent was posted.
+
+        Returns:
+            (handler, action, parsed_path): the handler to delegate to, the action name and
+                urlparse result of the path. action and parsed_path are None for intents.
+        '''
+        if intent:
+            # Locate the handler registered for this intent name.
+            intent_name = intent['intent']['name']
+            if intent_name in self.handlers:
+                return self.handlers[intent_name], None, None
+            raise UnsupportedIntent(f'Unkown intent: {intent_name}')
+        # If an intent wasn't supplied, see if a handler is registered to process the path.
+        parsed_path = urlparse(path)
+        path_components = parsed_path.path.split('/')
+        if len(path_components) > 2 and path_components[1] in self.handlers:
+            handler = self.handlers[path_components[1]]
+            if path_components[2] in handler.actions:
+                return handler, path_components[2], parsed_path
+        raise UnsupportedAction(f'Unknown path: {parsed_path.path}')
+
+    def dispatch(self, path, intent=None):
+        ''' Process the supplied intent or requested path with the registered handler.
+
+        An intent identical to one being processed, or processed within the coalescing window, isn't 
+        processed again, it receives the same response, so its speech is only played once.
+
+        Arguments:
+            path (str): requested HTTP path.
+            intent (json): JSON intent structure, if an intent was posted.
+
+        Returns:
+            response: The final response object returned from conductor response processing.
+        '''
+        if intent and self._intents:
+            return self._intents.do(self.intent_key(intent), self._dispatch, path, intent)
+        return self._dispatch(path, intent)
+
+    def intent_key(self, intent):
+        ''' Identify identical intents, by their name and slots '''
+        return json.dumps([intent['intent']['name'], intent.get('slots')], sort_keys=True, default=str)
+
+    def _dispatch(self, path, intent=None):
+        handler, action, parsed_path = self.route(path, intent)
+        start = time.perf_counter()
+        outcome = 'error'
+        try:
+            response = handler.handle_intent(intent) if intent else handler.handle_action(action, parsed_path)
+            outcome = 'ok'
+            return response
+        finally:
+            self.record_dispatch(handler.base_path, action or intent['intent']['name'], start, outcome)
+
+    def record_dispatch(self, handler, action, start, outcome):
+        ''' Record the latency and outcome of dispatching a request.
+
+        Arguments:
+            handler (str): base path of the handler the request was dispatched to.
+            action (str): name of the action or intent.
+            start (float): time.perf_counter() when dispatch started.
+            outcome (str): 'ok', or 'error' if dispatch raised an exception.
+        '''
+        metrics.observe(REQUEST_SECONDS, (('handler', handler), ('action', action), ('stage', 'dispatch')),
+                        time.perf_counter() - start)
+        metrics.count(REQUESTS, (('handler', handler), ('action', action), ('outcome', outcome)))
+
+    def encode_response(self, response):
+        ''' Serialize a final response for the requestor.
+
+        Returns:
+            (payload, content_type): encoded response body and its media type.
+        '''
+        if isinstance(response, RawResponse):
+            logger.info(f'Sending {response.content_type} response')
+            return response.body.encode('utf_8'), response.content_type
+        # Serialize the response once, for both the log and the response body.
+        body = response.toJSON()
+        logger.info(f'Sending response: {body}')
+        return body.encode('utf_8'), 'application/json'
+
+    def dispatch_batch(self, items):
+        ''' Process a batch of intents and requested paths with the registered handlers.
+
+        Items for different handlers are dispatched concurrently. Items for the same handler are dispatched 
+        in the order they were supplied, since they may act on the same state. The speech of every item is 
+        processed as a single response, spoken in the order of the items.
+
+        Arguments:
+            items (list): JSON intent structures and requested paths, either a str or {'path': str}.
+
+        Returns:
+            response: The final response object, its data holds the status and data, or error, of each item.
+        '''
+        if not isinstance(items, list):
+            raise InvalidParameter('A batch must be a list of intents and paths')
+        if self.batch_max_items and len(items) > self.batch_max_items:
+            raise InvalidParameter(f'A batch is limited to {self.batch_max_items} items')
+        start = time.perf_counter()
+        results = [None] * len(items)
+        responses = [None] * len(items)
+        # Items grouped by the handler they are routed to.
+        groups = {}
+        for index, item in enumerate(items):
+            intent = item if isinstance(item, dict) and 'intent' in item else None
+            path = item.get('path') if isinstance(item, dict) else item
+            try:
+                if not intent and not isinstance(path, str):
+                    raise InvalidParameter(f'Invalid batch item: {item}')
+                handler, action, parsed_path = self.route(path, intent)
+            except ConductorException as e:
+                results[index] = {'status': 400, 'error': str(e)}
+                continue
+            groups.setdefault(id(handler), []).append((index, handler, action, parsed_path, intent))
+        futures = [self._batch_executor.submit(self._dispatch_group, group, results, responses) for group in groups.values()]
+        for future in futures:
+            future.result()
+        # Speech is deferred only if every handler in the batch defers its speech.
+        deferred = all(self.is_deferred(group[0][1].deferred_speech) for group in groups.values())
+        server_response = self.process_response([r for response in responses if response
+                                                 for r in (response if isinstance(response, Iterable) else [response])], deferred)
+        server_response.data = results
+        self.record_dispatch('batch', 'batch', start, 'ok')
+        return server_response
+
+    def _dispatch_group(self, group, results, responses):
+        ''' Dispatch the batch items routed to a handler, in order, recording the result of each '''
+        for index, handler, action, parsed_path, intent in group:
+            try:
+                response = handler.invoke_intent(intent) if intent else handler.invoke_action(action, parsed_path)
+                responses[index] = response
+                data = [r.data for r in (response if isinstance(response, Iterable) else [response])
+                        if r and r.data is not None]
+                results[index] = {'status': 200, 'data': data[0] if len(data) == 1 else data or None}
+            except ConductorException as e:
+                logger.error(f'Invalid batch item: {intent or parsed_path.geturl()} {e}')
+                results[index] = {'status': 400, 'error': str(e)}
+            except Exception:
+                logger.error(f'Error processing batch item: {intent or parsed_path.geturl()}\n{traceback.format_exc()}')
+                results[index] = {'status': 500, 'error': 'Error processing request'}
+
+    def is_deferred(self, deferred=None):
+        ''' Determine if speech should be deferred, given a handler's deferred_speech preference.
+        
+        Arguments:
+            deferred (bool): handler's preference, None to use the global setting.
+        '''
+        return self.deferred_speech if deferred is None else deferred
+
+    def process_response(self, response, deferred=None):
+        ''' Process the raw handler's response to construct a final response.
+
+        Arguments:
+            response (Response): Raw response from a handler. This could be no response, a single
+                Response instance or a collection of Response instances.
+            deferred (bool): True to speak the responses in the background and return immediately, 
+                None to use the global setting.
+
+        Returns:
+            response: The final response object used to build the a response body the requestor.
+        '''
+        # Raw responses are returned to the requestor as is.
+        if isinstance(response, RawResponse):
+            return response
+        server_response = Response()
+        # If the handler didn't supply a response, create one.
+        if not response:
+            response = Response()
+        # Ensure we have a collection of responses to process, even if only one was supplied to process.
+        responses = response if isinstance(response, Iterable) else [response]
+        response_phrase = ''
+        exception = None
+        spoken = [r for r in responses if r.speech.text]
+        # Track these responses as the last collection of responses spoken, so silent responses (e.g. status 
+        # polling) don't replace what "say again" repeats.
+        if spoken:
+            self.last_response = responses
+        # Return any details supplied by the handler to the requestor.
+        data = [r.data for r in responses if r.data is not None]
+        if data:
+            server_response.data = data[0] if len(data) == 1 else data
+        # Hand deferred speech off to the TTS service's background pipeline, failures will be reported by its status.
+        if self.is_deferred(deferred):
+            if spoken:
+                self.tts.speak_later(spoken)
+            return server_response
+        # Speak all of the responses, the TTS service synthesizes them concurrently but plays them in order.
+        if spoken:
+            for e in self.tts.speak_responses(responses):
+                # For now, we are only going to keep track of the last reported exception. This needs improved.
+                exception = e
+                response_phrase += f'{e.phrase} '
+        # If a SpeakableException was reported, return the entire string of response phrases, with a reason.
+        if exception:
+            response_phrase = f'{response_phrase} Sorry I sound odd, {get_reason(exception)}'
+        server_response.speech.text = response_phrase
+        return server_response
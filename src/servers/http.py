@@ -6,13 +6,13 @@ Created on Jun 24, 2021
 import traceback
 import json
 import logging
-from collections.abc import Iterable
+import select
+import time
 from http.server import BaseHTTPRequestHandler
 from urllib.parse import urlparse
-from errors.exceptions import UnsupportedAction, RegistrationExists,\
-    UnsupportedIntent, SpeakableException
-from errors.reasons import get_reason
-from services.base import Response
+from errors.exceptions import UnsupportedAction, UnsupportedIntent, InvalidParameter
+from servers.base import BaseConductor, BATCH_PATH
+from servers.pool import WorkerPool
 
 logger = logging.getLogger(__name__)
 
@@ -23,102 +23,89 @@ except Exception:
     from http.server import HTTPServer as ServerImpl 
 
 
-class Conductor(ServerImpl):
+class Conductor(BaseConductor, ServerImpl):
     '''
     Conductor HTTP Server
     
     The primary responsibility of the Conductor is to receive HTTP requests and delegate to the appropriate handler.
     Additionally, services should be assigned as distinct attributes to the Conductor during instantiation.
     
+    Connections are served by a fixed pool of worker threads. Once the pool's queue is full, or a connection 
+    has waited longer than the deadline for a worker, the connection is answered with a 503 so clients back off 
+    instead of piling up threads.
+    
+    Connections are persistent (HTTP/1.1), so a client can send a stream of requests without a new connection 
+    for each. A connection is closed once it has served max_requests, or has been idle for idle_timeout, or 
+    as soon as it is idle while other connections are waiting for a worker.
+    
     Arguments:
         server_address ((str,int)): tuple representing the IP and Port to listen on.
         services ([BaseService]): collection of class definitions all derived from BaseService.
         handlers ([BaseHandler]): collection of class definitions all derived from BaseHandler.
+        workers (int): number of worker threads, 0 to serve each connection on its own thread.
+        queue_size (int): max number of connections waiting for a worker.
+        deadline (float): max seconds a connection waits for a worker, 0 for no limit.
+        timeout (float): seconds a worker waits on a client to send its request, or accept the response.
+        idle_timeout (float): seconds an idle persistent connection is held open.
+        max_requests (int): max number of requests served on a connection, 0 for no limit.
     '''    
-    def __init__(self, server_address, services, handlers):
-        super().__init__(server_address, RequestHandler)
-        # Keep track of registered service names
-        self.services = set()
-        # Register all services
-        for service in services:
-            self.register_service(service(self))
-        # Map of registered handlers
-        self.handlers = {}
-        for handler in handlers:
-            self.register_handler(handler(self))
-        # Tracks the last collection of responses that were processed.
-        self.last_response = None
+    # Connections are accepted as soon as they arrive and queued, or rejected, by the pool, so a deeper listen 
+    # backlog only absorbs bursts rather than holding connections the pool can't see.
+    request_queue_size = 64
+    
+    def __init__(self, server_address, services, handlers, workers=8, queue_size=16, deadline=10.0, timeout=30.0,
+                 idle_timeout=15, max_requests=100):
+        ServerImpl.__init__(self, server_address, RequestHandler)
+        self.request_timeout = timeout
+        self.idle_timeout = idle_timeout
+        self.max_requests = max_requests
+        self._pool = WorkerPool(self._serve_connection, self._reject_connection, workers, queue_size, deadline) if workers else None
+        BaseConductor.__init__(self, services, handlers)
         
     def shutdown(self):
         '''Shutdown the Conductor HTTP service'''
         # Shutdown all services before shutting down the Conductor
-        for service in self.services:
-            if hasattr(self, service):
-                getattr(self, service).shutdown()
-        super().shutdown()
-
-    def register_service(self, service):
-        ''' Register the supplied service with the conductor
-
-        Arguments:
-            service (BaseService): an object derived from BaseService.        
-        '''
-        logger.debug(f'Registering Service: {service.name}')
-        if hasattr(self, service.name):
-            raise RegistrationExists(f'Service already registered: {service.name}')
-        setattr(self, service.name, service)
-        self.services.add(service.name)
-
-    def register_handler(self, handler):
-        ''' Register the supplied handler with the conductor
-
-        Arguments:
-            handler (BaseHandler): an object derived from BaseHandler.        
-        '''
-        logger.debug(f'Registering Handler Path: {handler.base_path}')
-        if handler.base_path in self.handlers:
-            raise RegistrationExists(f'Path already registered: {handler.base_path}')
-        self.handlers[handler.base_path] = handler
-        for intent in handler.intents:
-            logger.debug(f'Registering Handler Intent: {intent}')
-            if intent in self.handlers:
-                raise RegistrationExists(f'Intent already registered: {intent}')
-            self.handlers[intent] = handler
+        self.shutdown_services()
+        ServerImpl.shutdown(self)
+        if self._pool:
+            self._pool.shutdown()
             
-    def process_response(self, response):
-        ''' Process the raw handler's response to construct a final response.
+    def server_status(self):
+        return dict(BaseConductor.server_status(self), engine='threaded', pool=self._pool.stats() if self._pool else None)
+    
+    def is_saturated(self):
+        ''' Determine if connections are waiting for a worker '''
+        return self._pool is not None and self._pool.waiting() > 0
         
-        Arguments:
-            response (Response): Raw response from a handler. This could be no response, a single 
-                Response instance or a collection of Response instances.
-                
-        Returns:
-            response: The final response object used to build the a response body the requestor.        
-        '''
-        server_response = Response()
-        # If the handler didn't supply a response, create one.
-        if not response:
-            response = Response()
-        # Ensure we have a collection of responses to process, even if only one was supplied to process.
-        responses = response if isinstance(response, Iterable) else [response]
-        response_phrase = ''
-        exception = None
-        # Track these responses as the last collection of responses processed.
-        self.last_response = responses
-        # Process all of the responses
-        for r in responses:
-            if r.speech.text:
-                try:
-                    self.tts.speak_response(r)
-                except SpeakableException as e:
-                    # For now, we are only going to keep track of the last reported exception. This needs improved.
-                    exception = e
-                    response_phrase += f'{e.phrase} '
-        # If a SpeakableException was reported, return the entire string of response phrases, with a reason.
-        if exception:
-            response_phrase = f'{response_phrase} Sorry I sound odd, {get_reason(exception)}'
-        server_response.speech.text = response_phrase
-        return server_response
+    def process_request(self, request, client_address):
+        ''' Hand an accepted connection to the worker pool, rejecting it if the pool is saturated '''
+        if not self._pool:
+            return ServerImpl.process_request(self, request, client_address)
+        if not self._pool.submit(request, client_address):
+            logger.warning(f'Rejecting connection from {client_address[0]}, all workers are busy')
+            self._reject_connection(request, client_address)
+            
+    def _serve_connection(self, request, client_address):
+        try:
+            self.finish_request(request, client_address)
+        except Exception:
+            self.handle_error(request, client_address)
+        finally:
+            self.shutdown_request(request)
+            
+    def _reject_connection(self, request, client_address):
+        ''' Answer a connection with a 503, without reading or dispatching its request '''
+        try:
+            request.settimeout(1.0)
+            request.sendall(b'HTTP/1.1 503 Service Unavailable\r\nRetry-After: 1\r\nContent-Length: 0\r\n'
+                            b'Connection: close\r\n\r\n')
+            # Discard the request that has arrived, so closing the socket doesn't reset the connection.
+            request.setblocking(False)
+            request.recv(65536)
+        except OSError:
+            pass
+        finally:
+            self.shutdown_request(request)
             
 
 class RequestHandler(BaseHTTPRequestHandler):
@@ -126,68 +113,123 @@ class RequestHandler(BaseHTTPRequestHandler):
     The base HTTP handler used by the Conductor to process HTTP requests.
     
     This base handler will receive an HTTP request and determine which registered handler 
-    to delegate to based on the intent that was received or HTTP path called.
+    to delegate to based on the intent that was received or HTTP path called. Every response has 
+    a Content-Length, so the connection can be reused for the client's next request.
     '''
+    protocol_version = 'HTTP/1.1'
+    # The headers and body are written separately, on a persistent connection Nagle's algorithm would hold 
+    # the body until the client's delayed ACK.
+    disable_nagle_algorithm = True
+    
     def log_message(self, format, *args):
         pass
     
-    def _send_success(self):
-        self.send_response(200)
-        self.end_headers()
+    def handle(self):
+        ''' Serve requests until the connection is closed, goes idle or has served the max number of requests '''
+        self.requests = 1
+        self.connection.settimeout(self.server.request_timeout)
+        self.handle_one_request()
+        while not self.close_connection and self._await_request():
+            self.requests += 1
+            self.handle_one_request()
+            
+    def _await_request(self):
+        ''' Wait for the next request on the connection.
         
-    def _send_unknown_req(self):
-        self.send_response(400)
+        Returns:
+            ready (bool): True once the next request, or the end of the connection, has arrived. False if 
+                the connection was idle for the idle timeout, or a connection is waiting for a worker.
+        '''
+        # The client may have sent its next request along with the last one.
+        self.connection.setblocking(False)
+        try:
+            if self.rfile.peek(1):
+                return True
+        finally:
+            self.connection.settimeout(self.server.request_timeout)
+        deadline = time.monotonic() + self.server.idle_timeout
+        while not self.server.is_saturated():
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return False
+            readable, _, _ = select.select([self.connection], [], [], min(remaining, 0.1))
+            if readable:
+                return True
+        return False
+    
+    def _send(self, status, body=b'', content_type='application/json'):
+        ''' Send a response, closing the connection once it has served the max number of requests '''
+        self.send_response(status)
+        if body:
+            self.send_header('Content-type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        if self.server.max_requests and self.requests >= self.server.max_requests:
+            self.send_header('Connection', 'close')
         self.end_headers()
+        self.wfile.write(body)
         
-    def _send_server_error(self):
-        self.send_response(500)
-        self.end_headers()
+    def _read_body(self):
+        ''' Read the request body, so the connection is ready for the next request '''
+        if 'transfer-encoding' in self.headers:
+            # Chunked bodies aren't supported, the rest of the request can't be found.
+            self.close_connection = True
+            return b''
+        length = int(self.headers.get('content-length') or 0)
+        return self.rfile.read(length) if length else b''
 
     def do_POST(self):
+        body = self._read_body()
         intent = None
+        # A batch of intents and paths is processed together.
+        if urlparse(self.path).path == BATCH_PATH:
+            try:
+                batch = json.loads(body)
+            except ValueError as e:
+                logger.error(f'Invalid batch: {e}')
+                self._send(400, json.dumps({'error': f'Invalid batch: {e}'}).encode("utf_8"))
+                return
+            self._process_request(batch=batch)
+            return
         # If the path posted to was the 'intent' path, parse the intent JSON and pass the intent along for further processing.
         if self.path.endswith('intent'):
-            intent = json.loads(self.rfile.read(int(self.headers['content-length'])))
+            try:
+                intent = json.loads(body)
+            except ValueError as e:
+                logger.error(f'Invalid intent: {e}')
+                self._send(400, json.dumps({'error': f'Invalid intent: {e}'}).encode("utf_8"))
+                return
         self._process_request(intent)
 
     def do_PUT(self):        
+        self._read_body()
         self._process_request()
         
     def do_GET(self):        
         self._process_request()
             
-    def _process_request(self, intent=None):
-        ''' Process the current request either by handling the supplied intent or requested path '''
+    def _process_request(self, intent=None, batch=None):
+        ''' Process the current request either by handling the supplied intent, batch or requested path '''
         try:
-            if intent:
-                logger.info(f'Processing intent: {intent}')
-                # Locate the handler registered for this intent name and pass the intent to it for processing.
-                intent_name = intent['intent']['name']
-                if intent_name in self.server.handlers:
-                    response = self.server.handlers[intent_name].handle_intent(intent)
-                else:
-                    raise UnsupportedIntent(f'Unkown intent: {intent_name}')
-            # If an intent wasn't supplied, see if a handler is registered to process the path.
+            if batch is not None:
+                logger.info(f'Processing batch: {batch}')
+                response = self.server.dispatch_batch(batch)
             else:
-                logger.info(f'Processing path: {self.path}')
-                parsed_path = urlparse(self.path)
-                path_components = parsed_path.path.split('/')            
-                if len(path_components) > 2 and path_components[1] in self.server.handlers:
-                    response = self.server.handlers[path_components[1]].handle_action(path_components[2], parsed_path)
+                if intent:
+                    logger.info(f'Processing intent: {intent}')
                 else:
-                    raise UnsupportedAction(f'Unknown path: {parsed_path.path}')
-            logger.info(f'Sending response: {response.toJSON()}')
-            self.send_response(200)
-            self.send_header('Content-type', 'application/json')
-            self.end_headers()
-            # Respond to the requestor with the response object in JSON format.
-            self.wfile.write(response.toJSON().encode("utf_8"))
+                    logger.info(f'Processing path: {self.path}')
+                response = self.server.dispatch(self.path, intent)
+            # Respond to the requestor with the response object, in JSON format unless it's a raw response.
+            self._send(200, *self.server.encode_response(response))
         except UnsupportedAction:
             logger.error(f'Unsupported action: {self.path}\n{traceback.format_exc()}')
-            self._send_unknown_req()
+            self._send(400)
         except UnsupportedIntent:
             logger.error(f'Unsupported intent: {intent}\n{traceback.format_exc()}')
-            self._send_unknown_req()
+            self._send(400)
+        except InvalidParameter as e:
+            logger.error(f'Invalid parameter: {self.path} {e}')
+            self._send(400, json.dumps({'error': str(e)}).encode("utf_8"))
         except Exception:
             logger.error(f'Error processing request: {self.path}\n{traceback.format_exc()}')
-            self._send_server_error()
+            self._send(500)
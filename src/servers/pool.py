@@ -0,0 +1,120 @@
+'''
+Created on Oct 18, 2026
+
+@author: x2012x
+'''
+import logging
+import queue
+import threading
+import time
+from collections import deque
+
+logger = logging.getLogger(__name__)
+
+
+class WorkerPool(object):
+    ''' Fixed number of worker threads serving connections from a bounded queue.
+
+    Connections that arrive while the queue is full are rejected immediately, rather than starting
+    another thread, and connections that wait in the queue longer than the deadline are rejected
+    when a worker takes them, since their client has likely given up.
+
+    Arguments:
+        handle (callable): serves a connection, called as handle(request, client_address) on a worker.
+        reject (callable): rejects a connection, called as reject(request, client_address).
+        workers (int): number of worker threads.
+        queue_size (int): max number of connections waiting for a worker.
+        deadline (float): max seconds a connection waits for a worker, 0 for no limit.
+    '''
+    def __init__(self, handle, reject, workers = 8, queue_size = 16, deadline = 10.0):
+        self._handle = handle
+        self._reject = reject
+        self.workers = workers
+        self.deadline = deadline
+        self._queue = queue.Queue(queue_size)
+        self._lock = threading.Lock()
+        self.busy = 0
+        self.max_queued = 0
+        self.completed = 0
+        self.rejected = 0
+        self.expired = 0
+        # Recent waits, in seconds, from accepting a connection to a worker taking it.
+        self._waits = deque(maxlen=100)
+        self._threads = [threading.Thread(target=self._run, name=f'ConductorWorker-{i}', daemon=True)
+                         for i in range(workers)]
+        for thread in self._threads:
+            thread.start()
+
+    def submit(self, request, client_address):
+        ''' Queue a connection for a worker.
+
+        Returns:
+            queued (bool): False if the queue is full, the connection must be rejected by the caller.
+        '''
+        try:
+            self._queue.put_nowait((time.monotonic(), request, client_address))
+        except queue.Full:
+            with self._lock:
+                self.rejected += 1
+            return False
+        with self._lock:
+            self.max_queued = max(self.max_queued, self._queue.qsize())
+        return True
+
+    def waiting(self):
+        ''' Get the number of connections waiting for a worker '''
+        return self._queue.qsize()
+
+    def shutdown(self):
+        ''' Stop the workers once the queued connections have been served '''
+        for _ in self._threads:
+            self._queue.put(None)
+
+    def _run(self):
+        while True:
+            item = self._queue.get()
+            if item is None:
+                break
+            queued_at, request, client_address = item
+            wait = time.monotonic() - queued_at
+            with self._lock:
+                self._waits.append(wait)
+                expired = self.deadline and wait > self.deadline
+                if expired:
+                    self.expired += 1
+                else:
+                    self.busy += 1
+            if expired:
+                logger.warning(f'Rejecting connection from {client_address[0]} after waiting {wait:.1f}s for a worker')
+                self._reject(request, client_address)
+                continue
+            try:
+                self._handle(request, client_address)
+            except Exception as e:
+                logger.error(f'Failed to serve connection from {client_address[0]}: {e}')
+            finally:
+                with self._lock:
+                    self.busy -= 1
+                    self.completed += 1
+
+    def stats(self):
+        ''' Get the pool metrics.
+
+        Returns:
+            stats (dict): number of workers, busy workers and their utilization, queued connections, the
+                max number queued, connections completed, rejected because the queue was full and expired
+                after the deadline, and the mean and max recent wait, in milliseconds, for a worker.
+        '''
+        with self._lock:
+            waits = list(self._waits)
+            return {'workers': self.workers,
+                    'busy': self.busy,
+                    'utilization': round(self.busy / self.workers, 2) if self.workers else None,
+                    'queued': self._queue.qsize(),
+                    'queue_size': self._queue.maxsize,
+                    'max_queued': self.max_queued,
+                    'completed': self.completed,
+                    'rejected': self.rejected,
+                    'expired': self.expired,
+                    'wait_ms': {'mean': round(sum(waits) / len(waits) * 1e3, 1) if waits else None,
+                                'max': round(max(waits) * 1e3, 1) if waits else None}}
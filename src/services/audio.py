@@ -4,14 +4,24 @@ Created on Apr 3, 2021
 @author: x2012x
 '''
 import logging
+import math
 import time
 import threading
+from abc import ABC, abstractmethod
 from collections import deque
 from services.base import BaseService
+from services.play_queue import PlayQueue, ALERT, REPLY, MEDIA, PRIORITY_NAMES, DROP_OLDEST
+from utils.configuration import setting
 from audioplayer import AudioPlayer
 
 logger = logging.getLogger(__name__)
 
+# Curves used to fade out a track, mapping the progress of the fade (0 to 1) to the fraction of the 
+# track's starting volume.
+FADE_CURVES = {'linear': lambda progress: 1 - progress,
+               'exponential': lambda progress: (1 - progress) ** 3,
+               'equal_power': lambda progress: math.cos(progress * math.pi / 2)}
+
 class PlayRequest(object):
     ''' Defines parameters for an audio playback request
     
@@ -23,94 +33,562 @@ class PlayRequest(object):
             track before starting the primary track.
         background_volume_shift (int): amount of volume decrease that should be used for the 
             background track        
+        fade_delay (float): amount of time, in seconds, the background track continues after the 
+            primary track finishes before it is faded out. Defaults to the Audio fade delay setting.
+        fade_duration (float): length of the background track's fade out, in seconds. Defaults to 
+            the Audio fade duration setting.
+        fade_curve (str): shape of the fade out, one of FADE_CURVES. Defaults to the Audio fade 
+            curve setting.
+        priority (int): ALERT, REPLY or MEDIA. Requests are played in priority order and a request 
+            preempts the playback of less important requests.
+        zones ([str]): names of the zones to play the request in, None to play it in every zone.
     '''
-    def __init__(self, primary, background = None, delay = 2.5, background_volume_shift = 20):
+    def __init__(self, primary, background = None, delay = 2.5, background_volume_shift = 20,
+                 fade_delay = None, fade_duration = None, fade_curve = None, priority = REPLY, zones = None):
         self.primary = primary
         self.background = background
         self.delay = delay
         self.background_volume_shift = background_volume_shift
+        self.fade_delay = setting('Audio', 'fade', 'delay', default=2.5) if fade_delay is None else fade_delay
+        self.fade_duration = setting('Audio', 'fade', 'duration', default=1.0) if fade_duration is None else fade_duration
+        self.fade_curve = setting('Audio', 'fade', 'curve', default='linear') if fade_curve is None else fade_curve
+        if self.fade_curve not in FADE_CURVES:
+            raise ValueError(f'Unknown fade curve: {self.fade_curve}')
+        if priority not in (ALERT, REPLY, MEDIA):
+            raise ValueError(f'Unknown priority: {priority}')
+        self.priority = priority
+        self.zones = zones
+        # Time the request was queued, set by the PlayQueue.
+        self.queued_at = None
+        
+
+class Playback(object):
+    ''' Playback of a request's tracks, which can be paused, resumed and stopped by the Player. 
+    Engines implement _pause, _resume and _stop.
+    
+    Arguments:
+        condition (threading.Condition): condition notified once the primary track has finished.
+    '''
+    def __init__(self, condition):
+        self._condition = condition
+        # True once the primary track has finished, guarded by the condition.
+        self.finished = False
+        # True if playback was stopped before the primary track finished.
+        self.stopped = False
+        self.started = time.monotonic()
+        self.ended = None
+        self._paused_at = None
+        # Total time, in seconds, playback has been paused.
+        self.paused = 0.0
+        
+    def _finish(self):
+        with self._condition:
+            if not self.finished:
+                self.finished = True
+                self.ended = time.monotonic()
+            self._condition.notify_all()
+            
+    def pause(self):
+        self._paused_at = time.monotonic()
+        self._pause()
+    
+    def resume(self):
+        if self._paused_at is not None:
+            self.paused += time.monotonic() - self._paused_at
+            self._paused_at = None
+        self._resume()
+    
+    def stop(self):
+        self.stopped = not self.finished
+        self._stop()
+        self._finish()
+        
+    def is_paused(self):
+        return self._paused_at is not None
+        
+    def position(self):
+        ''' Get the playback position, in seconds '''
+        return (self.ended or self._paused_at or time.monotonic()) - self.started - self.paused
+    
+    def duration(self):
+        ''' Get the length of the playback, in seconds, None if it isn't known '''
+        return None
+            
+    def _pause(self):
+        pass
+    
+    def _resume(self):
+        pass
+    
+    def _stop(self):
+        pass
+        
+        
+class TrackPlayback(Playback):
+    ''' Playback of a primary track by audioplayer. audioplayer can only report the end of a track by 
+    blocking until it is finished, so the track is played on a helper thread. 
+    
+    Arguments:
+        condition (threading.Condition): condition notified once the primary track has finished.
+        primary (AudioPlayer): primary track.
+        background (AudioPlayer): background track, already playing, or None.
+    '''
+    def __init__(self, condition, primary, background):
+        super().__init__(condition)
+        self.primary = primary
+        self.background = background
+        threading.Thread(target=self._run, name='AudioPlayback', daemon=True).start()
+        
+    def _run(self):
+        try:
+            self.primary.play(block = True)
+        except Exception as e:
+            logger.error(f'Failed to play primary track: {e}')
+        finally:
+            self._finish()
+            
+    def _pause(self):
+        for track in (self.primary, self.background):
+            if track:
+                track.pause()
+                
+    def _resume(self):
+        for track in (self.primary, self.background):
+            if track:
+                track.resume()
+                
+    def _stop(self):
+        # The helper thread may remain blocked on the stopped track, so playback is finished by stop.
+        self.primary.stop()
+        
+        
+class ZonePlayback(Playback):
+    ''' Playback of a request in several zones at once. Each zone's sink is prepared on its own thread, 
+    then the threads wait for each other so playback starts in every zone at the same time. Playback 
+    finishes once it has ended in every zone.
+    
+    Arguments:
+        condition (threading.Condition): condition notified once playback has ended in every zone.
+        sinks ([Sink]): sinks of the zones to play the request in.
+        request (PlayRequest): request to play.
+        sync_timeout (float): max seconds a zone waits for the other zones to be prepared before it starts.
+    '''
+    def __init__(self, condition, sinks, request, sync_timeout = 5.0):
+        super().__init__(condition)
+        # Playback in each zone, once started, guarded by the lock.
+        self.playbacks = {}
+        self._lock = threading.Lock()
+        self._remaining = len(sinks)
+        self._barrier = threading.Barrier(len(sinks), timeout=sync_timeout)
+        for sink in sinks:
+            threading.Thread(target=self._run, args=(sink, request), name=f'AudioZone-{sink.name}', daemon=True).start()
+            
+    def _run(self, sink, request):
+        prepared = failed = None
+        try:
+            prepared = sink.prepare(request)
+        except Exception as e:
+            failed = e
+        try:
+            self._barrier.wait()
+        except threading.BrokenBarrierError:
+            logger.warning(f'Starting zone {sink.name} without waiting for the other zones')
+        try:
+            if failed:
+                raise failed
+            condition = threading.Condition()
+            playback = sink.start(condition, request, prepared)
+            with self._lock:
+                self.playbacks[sink.name] = playback
+                if self.stopped:
+                    playback.stop()
+                elif self.is_paused():
+                    playback.pause()
+            with condition:
+                while not playback.finished:
+                    condition.wait()
+            sink.finish(playback, request)
+        except Exception as e:
+            logger.error(f'Failed to play {request.primary} in zone {sink.name}: {e}')
+        finally:
+            with self._lock:
+                self._remaining -= 1
+            self._finish()
+            
+    def _finish(self):
+        with self._lock:
+            if self._remaining:
+                return
+        super()._finish()
+        
+    def duration(self):
+        with self._lock:
+            durations = [d for d in (p.duration() for p in self.playbacks.values()) if d is not None]
+        return max(durations) if durations else None
+            
+    def _pause(self):
+        with self._lock:
+            for playback in self.playbacks.values():
+                playback.pause()
+                
+    def _resume(self):
+        with self._lock:
+            for playback in self.playbacks.values():
+                playback.resume()
+                
+    def _stop(self):
+        with self._lock:
+            for playback in self.playbacks.values():
+                playback.stop()
+                
+                
+class Sink(ABC):
+    ''' Output of a zone that PlayRequests are played in. Slow work, such as loading tracks or connecting, 
+    is done by prepare, so playback can start in several zones at once.
+    
+    Arguments:
+        name (str): name of the zone.
+    '''
+    def __init__(self, name):
+        self.name = name
+        
+    def prepare(self, request):
+        ''' Prepare to play a request.
+        
+        Returns:
+            prepared (object): passed to start.
+        '''
+        return None
+    
+    @abstractmethod
+    def start(self, condition, request, prepared):
+        ''' Start playing a prepared request.
+        
+        Arguments:
+            condition (threading.Condition): condition notified once the primary track has finished.
+            request (PlayRequest): request to play.
+            prepared (object): value returned by prepare.
+            
+        Returns:
+            playback (Playback): playback of the request.
+        '''
+        pass
+    
+    def finish(self, playback, request):
+        ''' Release the request's outputs once its primary track has finished, or been stopped. '''
+        pass
+    
+    def close(self):
+        ''' Release the sink once the Player stops. '''
+        pass
+    
+    
+class LocalSink(Sink):
+    ''' Plays requests on the local output device, with audioplayer or, if supplied, the mixer.
+    
+    Arguments:
+        name (str): name of the zone.
+        mixer (Mixer): mixer used to play the primary and background tracks as a single stream, None to 
+            play them with separate audioplayer instances.
+        volume (int): volume of the primary track, from 0 to 100.
+    '''
+    def __init__(self, name, mixer = None, volume = 25):
+        super().__init__(name)
+        self._mixer = mixer
+        self._volume = volume
+        # Fades out background tracks, while the next request is played. Started with the first fade.
+        self._fades = None
+        self._lock = threading.Lock()
+        
+    def prepare(self, request):
+        if self._mixer:
+            return self._mixer.mix(request.primary, request.background, request.delay, self._volume,
+                                   request.background_volume_shift, request.fade_delay, request.fade_duration,
+                                   request.fade_curve)
+        primary = AudioPlayer(request.primary)
+        primary.volume = self._volume
+        background = None
+        if request.background:
+            background = AudioPlayer(request.background)
+            background.volume = self._volume - request.background_volume_shift
+        return primary, background
+        
+    def start(self, condition, request, prepared):
+        ''' Start playing a request. If it has a background track, the background track is started first 
+        and the primary track is started after the request's delay. '''
+        if self._mixer:
+            logger.debug(f'Playing mixed tracks: {request.primary}, {request.background}')
+            mixed, primary_end = prepared
+            return self._mixer.start(condition, request.primary, mixed, primary_end)
+        primary, background = prepared
+        if background:
+            logger.debug(f'Playing background track: {request.background}')
+            background.play(loop = True)
+            time.sleep(request.delay)
+        logger.debug(f'Playing primary track: {request.primary}')
+        return TrackPlayback(condition, primary, background)
+    
+    def finish(self, playback, request):
+        ''' Stop the primary track. The background track is handed to the fade scheduler, so the next 
+        request can start while it fades out. A stopped request's background track is faded out immediately. '''
+        if not isinstance(playback, TrackPlayback):
+            return
+        logger.debug('Stopping primary track')
+        playback.primary.stop()
+        playback.primary.close()
+        if playback.background:
+            delay = 0 if playback.stopped else request.fade_delay
+            logger.debug(f'Fading out background track in {delay}s')
+            with self._lock:
+                if not self._fades:
+                    self._fades = FadeScheduler()
+                    self._fades.start()
+                self._fades.fade_out(playback.background, delay, request.fade_duration, request.fade_curve)
+                
+    def close(self):
+        ''' Stop the fade scheduler, immediately stopping any background tracks being faded out '''
+        with self._lock:
+            fades, self._fades = self._fades, None
+        if fades:
+            fades.stop()
+        
+
+class PlayItem(object):
+    ''' Playback state and timing of a request played by the Player.
+    
+    Arguments:
+        request (PlayRequest): request being played.
+    '''
+    __slots__ = ('request', 'playback', 'skip', 'outcome')
+    
+    def __init__(self, request):
+        self.request = request
+        self.playback = None
+        # Set if the request is skipped before its playback has started.
+        self.skip = False
+        # 'played', 'skipped' or 'failed' once the request is finished.
+        self.outcome = None
+        
+    def as_dict(self):
+        ''' Get the state and timing of the request, times are in seconds '''
+        request, playback = self.request, self.playback
+        details = {'primary': request.primary,
+                   'background': request.background,
+                   'priority': PRIORITY_NAMES[request.priority]}
+        if self.outcome:
+            details['outcome'] = self.outcome
+        elif playback is None:
+            details['state'] = 'starting'
+        else:
+            details['state'] = 'paused' if playback.is_paused() else 'playing'
+        details['zones'] = request.zones
+        if playback:
+            details.update(wait=round(playback.started - request.queued_at, 3),
+                           position=round(playback.position(), 3),
+                           duration=playback.duration(),
+                           paused=round(playback.paused, 3))
+        return details
+
+
+class Fade(object):
+    ''' A track being faded out by the FadeScheduler '''
+    __slots__ = ('track', 'volume', 'start', 'duration', 'curve')
+    
+    def __init__(self, track, start, duration, curve):
+        self.track = track
+        self.volume = track.volume
+        self.start = start
+        self.duration = duration
+        self.curve = FADE_CURVES[curve]
+        
+
+class FadeScheduler(threading.Thread):
+    ''' Fades out tracks in the background, so the Player can start the next request while the 
+    previous request's background track fades out. Tracks are stopped and closed once faded out.
+    
+    Arguments:
+        interval (float): seconds between each volume step of a fade.
+    '''
+    def __init__(self, interval = 0.05):
+        super().__init__(name='AudioFader', daemon=True)
+        self._interval = interval
+        self._fades = []
+        self._condition = threading.Condition()
+        self._running = True
+        
+    def fade_out(self, track, delay, duration, curve):
+        ''' Fade out a playing track.
+        
+        Arguments:
+            track (AudioPlayer): track to fade out.
+            delay (float): seconds to wait before starting the fade.
+            duration (float): length of the fade, in seconds.
+            curve (str): shape of the fade, one of FADE_CURVES.
+        '''
+        with self._condition:
+            self._fades.append(Fade(track, time.monotonic() + delay, duration, curve))
+            self._condition.notify()
+            
+    def stop(self):
+        ''' Stop the scheduler, immediately stopping any tracks being faded out '''
+        with self._condition:
+            self._running = False
+            self._condition.notify()
+            
+    def run(self):
+        while True:
+            with self._condition:
+                while self._running and not self._fades:
+                    self._condition.wait()
+                if not self._running:
+                    finished, self._fades = self._fades, []
+                    break
+                now = time.monotonic()
+                fades = list(self._fades)
+            finished = []
+            for fade in fades:
+                progress = (now - fade.start) / fade.duration if fade.duration > 0 else 1
+                if progress >= 1:
+                    finished.append(fade)
+                elif progress >= 0:
+                    fade.track.volume = fade.volume * fade.curve(progress)
+            for fade in finished:
+                self._close(fade.track)
+            with self._condition:
+                for fade in finished:
+                    self._fades.remove(fade)
+                if self._fades:
+                    # Sleep until the next volume step, or the start of the next fade if none are in progress.
+                    timeout = max(self._interval, min(f.start for f in self._fades) - time.monotonic())
+                    self._condition.wait(timeout)
+        for fade in finished:
+            self._close(fade.track)
+        logger.debug('Fade scheduler stopped')
+        
+    def _close(self, track):
+        logger.debug('Stopping background track')
+        try:
+            track.stop()
+            track.close()
+        except Exception as e:
+            logger.error(f'Failed to stop background track: {e}')
         
         
 class Player(threading.Thread):
     ''' Player thread which processes PlayRequests contained on the AudioService's queue 
     
+    The player runs for the life of the service, waiting on the service's condition while the 
+    queue is empty, so a new request is started as soon as it is queued. Each request is played in 
+    its zones, starting in every zone at once. If a more important request is queued during playback, 
+    the current request is paused until the more important requests have been played. The requests being played, the current request followed by any paused requests, are 
+    tracked as PlayItems for status reporting.
+    
     Arguments:
         service (AudioService): reference to the audio service containing a _queue 
-            of PlayRequests to process
+            of PlayRequests to process and the _condition used to signal changes to it
     '''
     def __init__(self, service):
-        super().__init__()
+        super().__init__(name='AudioPlayer', daemon=True)
         self._service = service
         self._process_queue = True        
-        self._primary = None
-        self._background = None
-        self._volume = 25
+        # Pause playback for more important requests.
+        self._preempt = setting('Audio', 'queue', 'preempt', default=True)
+        # PlayItems being played, the current item last, guarded by the service's condition.
+        self.active = []
         
     def stop(self):
-        ''' NOTE: Until state can be obtained from audioplayer, or a different lib 
-            is used, stopping the Player will only stop processing the queue. The 
-            current request track will still be finished.'''
+        ''' Stop processing the queue and stop the playback of the current and any paused requests '''
         logger.debug('Stop processing player queue')
-        self._process_queue = False
+        with self._service._condition:
+            self._process_queue = False
+            self._service._condition.notify_all()
+        self.skip(all_items=True)
+        
+    def skip(self, all_items = False):
+        ''' Stop the playback of the current request, or of all requests being played.
+        
+        Returns:
+            skipped ([PlayItem]): items that were skipped.
+        '''
+        with self._service._condition:
+            items = list(self.active) if all_items else self.active[-1:]
+            for item in items:
+                item.skip = True
+        for item in items:
+            if item.playback:
+                item.playback.stop()
+        return items
         
     def run(self):
-        while self._process_queue:
-            try:
-                request = self._service._queue.popleft()
-                self._play(request.primary, request.background, request.delay, request.background_volume_shift)
-            except Exception:
-                break
-            finally:
-                time.sleep(0.10)
+        condition = self._service._condition
+        queue = self._service._queue
+        while True:
+            with condition:
+                while self._process_queue and not queue:
+                    condition.wait()
+                if not self._process_queue:
+                    break
+                request = queue.pop()
+            self._process(request)
+        for sink in self._service.sinks.values():
+            sink.close()
         logger.debug('Player stopped')
-    
-    def _play(self, primary, background = None, delay = 2.5, background_volume_shift = 20):
-        ''' Play a primary track, with optional background track. If a background track 
-        is supplied, it will be started first and the primary track will be started after 
-        the delay period has expired.
         
-        Arguments:
-            primary (str): path to the audio file to use as the primary track
-            background (str): path the audio file to use as the background track. Background 
-                tracks are played in a loop until the primary track finishes.
-            delay (int): amount of time, in seconds, to wait after starting the background 
-                track before starting the primary track.
-            background_volume_shift (int): amount of volume decrease that should be used for the 
-                background track                    
-        '''
-        self._primary = AudioPlayer(primary)
-        self._primary.volume = self._volume
-        if background:
-            logger.debug(f'Playing background track: {background}')
-            self._background = AudioPlayer(background)
-            self._background.volume = self._volume - background_volume_shift
-            self._background.play(loop = True)
-            time.sleep(delay)
-        logger.debug(f'Playing primary track: {primary}')            
-        self._primary.play(block = True)
-        self._stop_playback()
-        
-    def _stop_playback(self, delay = 2.5):
-        ''' Stop the current play request.
+    def _process(self, request):
+        item = PlayItem(request)
+        with self._service._condition:
+            self.active.append(item)
+        try:
+            self._play(request)
+            item.outcome = 'skipped' if item.skip else 'played'
+        except Exception as e:
+            item.outcome = 'failed'
+            logger.error(f'Failed to play {request.primary}: {e}')
+        with self._service._condition:
+            self.active.remove(item)
+            self._service.history.append(item)
+            
+    def _wait(self, playback, priority):
+        ''' Wait for playback to finish, pausing it to play any more important requests that are queued. '''
+        condition = self._service._condition
+        queue = self._service._queue
+        item = self.active[-1]
+        with condition:
+            item.playback = playback
+        if item.skip:
+            playback.stop()
+        preempts = lambda: self._preempt and self._process_queue and queue.preempts(priority)
+        while True:
+            with condition:
+                while not playback.finished and not preempts():
+                    condition.wait()
+                if playback.finished:
+                    return
+                queue.preempted(priority)
+            logger.info(f'Pausing {PRIORITY_NAMES[priority]} playback for a more important request')
+            playback.pause()
+            while True:
+                with condition:
+                    if not preempts():
+                        break
+                    request = queue.pop()
+                self._process(request)
+            playback.resume()
+    
+    def _play(self, request):
+        ''' Play a request in each of its zones and wait for it to finish.
         
         Arguments:
-            delay (int): amount of time in seconds to wait before stopping the background track
+            request (PlayRequest): request to play, with its zones resolved by the AudioService.
         '''
-        if self._primary:
-            logger.debug('Stopping primary track')
-            self._primary.stop()
-            self._primary.close()
-        if self._background:
-            time.sleep(delay)
-            logger.debug('Stopping background track')
-            # Fade out the background volume
-            while self._background.volume > 0:
-                self._background.volume -= 0.5
-                time.sleep(0.10)
-            self._background.stop()
-            self._background.close()
-        self._primary = None
-        self._background = None    
+        sinks = [self._service.sinks[zone] for zone in request.zones]
+        if len(sinks) > 1:
+            self._wait(ZonePlayback(self._service._condition, sinks, request), request.priority)
+            return
+        sink = sinks[0]
+        playback = sink.start(self._service._condition, request, sink.prepare(request))
+        self._wait(playback, request.priority)
+        sink.finish(playback, request)
         
         
 class AudioService(BaseService):
@@ -121,25 +599,125 @@ class AudioService(BaseService):
     ''' 
     def __init__(self, conductor):
         super().__init__(conductor, 'audio')
-        self._queue = deque()
+        self._queue = PlayQueue(max_size=setting('Audio', 'queue', 'max_size', default=32),
+                                overflow=setting('Audio', 'queue', 'overflow', default=DROP_OLDEST),
+                                coalesce=setting('Audio', 'queue', 'coalesce', default=True))
+        # Signals the player when requests are queued or it should stop.
+        self._condition = threading.Condition()
         self._player = None
+        # PlayItems of the most recently finished requests.
+        self.history = deque(maxlen=setting('Audio', 'history', default=20))
+        # Optionally mix the primary and background tracks in process, rather than playing each separately.
+        self._mixer = None
+        if setting('Audio', 'engine', default='audioplayer') == 'mixer':
+            from services.mixer import Mixer
+            self._mixer = Mixer(sample_rate=setting('Audio', 'mixer', 'sample_rate', default=44100),
+                                channels=setting('Audio', 'mixer', 'channels', default=2),
+                                output=setting('Audio', 'mixer', 'output', default=None),
+                                cache_bytes=setting('Audio', 'mixer', 'pcm_cache', 'max_bytes', default=67108864),
+                                cache_directory=setting('Audio', 'mixer', 'pcm_cache', 'directory', default=None))
+        # Map of zone name to the Sink requests are played in.
+        zones = setting('Audio', 'zones', default=None) or {'local': {'sink': 'local'}}
+        self.sinks = {name: self._create_sink(name, dict(options or {})) for name, options in zones.items()}
+        
+    def _create_sink(self, name, options):
+        kind = options.pop('sink', 'local')
+        if kind == 'local':
+            return LocalSink(name, self._mixer, **options)
+        # Only required when other sinks are used.
+        from services.sinks import SINKS
+        if kind not in SINKS:
+            raise ValueError(f'Unknown sink for zone {name}: {kind}')
+        return SINKS[kind](name, **options)
         
     def _shutdown(self):
         ''' Clear the play queue and stop the player. '''
-        self._queue.clear()
-        if self._player and self._player.is_alive():
-            self._player.stop()
+        with self._condition:
+            self._queue.clear()
+            player, self._player = self._player, None
+        if player:
+            player.stop()
+            
+    def status(self):
+        ''' Get the status of the audio service.
+        
+        Returns:
+            status (dict): the playback engine, the current request, any requests it paused, the queued 
+                requests and recently finished requests, with their timing in seconds, the play queue 
+                metrics and, if the mixer is used, the decoded audio cache counters.
+        '''
+        now = time.monotonic()
+        with self._condition:
+            active = [item.as_dict() for item in self._player.active] if self._player else []
+            queued = [{'primary': request.primary,
+                       'background': request.background,
+                       'priority': PRIORITY_NAMES[request.priority],
+                       'zones': request.zones,
+                       'waiting': round(now - request.queued_at, 3)} for request in self._queue.requests()]
+            history = [item.as_dict() for item in self.history]
+            queue = self._queue.stats()
+        return {'engine': 'mixer' if self._mixer else 'audioplayer',
+                'zones': {name: type(sink).__name__ for name, sink in self.sinks.items()},
+                'state': 'playing' if active else 'idle',
+                'current': active[-1] if active else None,
+                'paused': active[-2::-1],
+                'queued': queued,
+                'history': history,
+                'queue': queue,
+                'pcm_cache': self._mixer.cache.stats() if self._mixer else None}
+    
+    def files(self):
+        ''' Get the paths of the primary tracks of the queued requests and the requests being played '''
+        with self._condition:
+            requests = self._queue.requests() + ([item.request for item in self._player.active] if self._player else [])
+        return {request.primary for request in requests}
+    
+    def skip(self):
+        ''' Stop playing the current request, continuing with any request it paused or the next queued request.
+        
+        Returns:
+            skipped (str): path to the primary track of the skipped request, None if nothing was playing.
+        '''
+        player = self._player
+        skipped = player.skip() if player else []
+        return skipped[0].request.primary if skipped else None
+            
+    def stop(self):
+        ''' Clear the play queue and stop playing the current request and any requests it paused. '''
+        with self._condition:
+            self._queue.clear()
+            player = self._player
+        if player:
+            player.skip(all_items=True)
         
     def play(self, request):
         ''' Play the supplied request
         
-        Adds the supplied request to the play queue and starts the 
-        player, if it's not already running.
+        Adds the supplied request to the play queue and wakes the 
+        player, starting it if this is the first request.
         
         Arguments:
             request (PlayRequest): request to play
+            
+        Returns:
+            queued (bool): False if the queue dropped the request, merged it with a duplicate request, or 
+                none of its zones exist.
         '''
-        self._queue.append(request)
-        if not self._player or not self._player.is_alive():
-            self._player = Player(self)
-            self._player.start()
+        if request.zones is None:
+            request.zones = list(self.sinks)
+        else:
+            unknown = [zone for zone in request.zones if zone not in self.sinks]
+            if unknown:
+                logger.warning(f'Ignoring unknown zones: {unknown}')
+                request.zones = [zone for zone in request.zones if zone in self.sinks]
+            if not request.zones:
+                return False
+        with self._condition:
+            if not self._queue.push(request):
+                logger.info(f'Play request not queued: {request.primary}')
+                return False
+            if not self._player:
+                self._player = Player(self)
+                self._player.start()
+            self._condition.notify_all()
+        return True
@@ -5,6 +5,7 @@ Created on Apr 17, 2021
 '''
 import json
 import logging
+from json.encoder import encode_basestring_ascii
 
 logger = logging.getLogger(__name__)
 
@@ -27,11 +28,51 @@ class BaseService(object):
         ''' Implementing class's shutdown logic '''
         pass    
 
+    def phrases(self):
+        ''' Phrases known to be spoken by this service, used to pre-warm the TTS cache. '''
+        return []
+
+
+def _encode(value):
+    ''' Encode a single response attribute as JSON '''
+    if value is None:
+        return 'null'
+    if value.__class__ is str:
+        return encode_basestring_ascii(value)
+    if value.__class__ is int:
+        return int.__repr__(value)
+    return json.dumps(value, default=lambda o: o.__dict__)
+
+
+class RawResponse(object):
+    ''' Response whose body is returned to the requestor as is, rather than as JSON (e.g. metrics in a 
+    text format). Nothing is spoken.
+    
+    Arguments:
+        body (str): body of the HTTP response.
+        content_type (str): media type of the body.
+    '''
+    __slots__ = ('body', 'content_type')
+    
+    def __init__(self, body, content_type = 'text/plain; charset=utf-8'):
+        self.body = body
+        self.content_type = content_type
+
 
 class ResponseText(object):
-    ''' Stores service response text, which is an attribute of the overall service response '''
-    def __init__(self, text = ''):
+    ''' Stores service response text, which is an attribute of the overall service response 
+    
+    Arguments:
+        text (str): text that should be spoken.
+        fragments ([str]): optional fragments the text is composed of. If supplied, the TTS service can 
+            speak the text by joining the recordings of each fragment, which are more likely to be cached 
+            than the text as a whole. Fragments are not included in the JSON representation.
+    '''
+    __slots__ = ('text', 'fragments')
+
+    def __init__(self, text = '', fragments = None):
         self.text = text
+        self.fragments = fragments
 
 
 class Response(object):
@@ -45,12 +86,38 @@ class Response(object):
             until the primary track finishes.
         background_volume_shift (int): amount of volume decrease that should be used for the 
             background track
+        data: optional JSON serializable details returned to the requestor (e.g. status reports). 
+            Only included in the JSON representation when supplied.
+        spoken_fragments ([str]): optional fragments that spoken_text is composed of, see ResponseText.
     '''
-    def __init__(self, spoken_text = '', background_audio = None, background_volume_shift = 20):
-        self.speech = ResponseText(spoken_text)
+    __slots__ = ('speech', 'background_audio', 'background_volume_shift', 'data')
+
+    def __init__(self, spoken_text = '', background_audio = None, background_volume_shift = 20, data = None, 
+                 spoken_fragments = None):
+        self.speech = ResponseText(spoken_text, spoken_fragments)
         self.background_audio = background_audio
         self.background_volume_shift = background_volume_shift
+        self.data = data
+
+    def _as_dict(self):
+        ''' Returns the attributes of this response, including those of any subclass '''
+        attributes = {'speech': {'text': self.speech.text},
+                      'background_audio': self.background_audio,
+                      'background_volume_shift': self.background_volume_shift}
+        if self.data is not None:
+            attributes['data'] = self.data
+        attributes.update(getattr(self, '__dict__', {}))
+        return attributes
         
     def toJSON(self):
-        ''' Returns a JSON representation '''
-        return json.dumps(self, default=lambda o: o.__dict__)
+        ''' Returns a JSON representation 
+        
+        The representation is built directly from the response attributes. Callers should serialize 
+        a response once and reuse the result rather than calling this for each use.
+        '''
+        if self.__class__ is not Response or self.speech.__class__ is not ResponseText:
+            return json.dumps(self._as_dict(), default=lambda o: o.__dict__)
+        data = '' if self.data is None else f', "data": {_encode(self.data)}'
+        return (f'{{"speech": {{"text": {_encode(self.speech.text)}}}, '
+                f'"background_audio": {_encode(self.background_audio)}, '
+                f'"background_volume_shift": {_encode(self.background_volume_shift)}{data}}}')
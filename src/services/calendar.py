@@ -6,7 +6,7 @@ Created on May 22, 2021
 from services.base import BaseService, Response
 from errors.exceptions import CalendarFailure
 from errors.reasons import get_general_failure
-from datetime import datetime
+from datetime import datetime, timedelta
 
 
 class CalendarService(BaseService):
@@ -20,24 +20,47 @@ class CalendarService(BaseService):
         self._time_format = '%I %M %p'
         self._day_format = '%A %B %d'
         
+    def _response(self, format):
+        ''' Build a response for the current date and/or time.
+        
+        The response is composed of a fragment per word so the TTS service can speak it from 
+        cached recordings of each word, rather than synthesizing a new phrase every minute.
+        
+        Arguments:
+            format (str): strftime format of the response text.
+        '''
+        text = datetime.now().strftime(format)
+        return Response(text, spoken_fragments=text.split(' '))
+        
+    def phrases(self):
+        ''' Every fragment that the date and time responses are composed of '''
+        format = f'It\'s {self._time_format} on {self._day_format}'
+        start = datetime(2024, 1, 1)
+        fragments = set()
+        # Every time of day and every day of a leap year.
+        for minute in range(24 * 60):
+            fragments.update((start + timedelta(minutes=minute)).strftime(format).split(' '))
+        for day in range(366):
+            fragments.update((start + timedelta(days=day)).strftime(format).split(' '))
+        return sorted(fragments)
+        
     def current(self):
         ''' Get the current date and time '''
         try:
-            return Response(datetime.now().strftime(f'It\'s {self._time_format} on {self._day_format}'))
+            return self._response(f'It\'s {self._time_format} on {self._day_format}')
         except Exception:
             raise CalendarFailure(get_general_failure())
     
     def current_time(self):
         ''' Get the current time '''
         try:
-            return Response(datetime.now().strftime(f'It\'s {self._time_format}'))
+            return self._response(f'It\'s {self._time_format}')
         except Exception:
             raise CalendarFailure(get_general_failure())
     
     def current_day(self):
         ''' Get the current date '''
         try:
-            return Response(datetime.now().strftime(f'It\'s {self._day_format}'))
+            return self._response(f'It\'s {self._day_format}')
         except Exception:
             raise CalendarFailure(get_general_failure())
-    
\ No newline at end of file
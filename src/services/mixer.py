@@ -0,0 +1,202 @@
+'''
+Created on Oct 18, 2026
+
+@author: x2012x
+'''
+import array
+import logging
+import os
+import threading
+import wave
+from services.audio import Playback
+from services.pcm_cache import PCMCache
+
+logger = logging.getLogger(__name__)
+
+
+class Mixer(object):
+    ''' Mixes a primary track and an optional background track into a single PCM stream.
+
+    Both tracks are decoded to PCM and kept in a PCMCache, so frequently played tracks (background
+    tracks and common phrases) aren't decoded every time they're played. The background track is
+    looped under the primary track, and the background volume shift and fade out are applied as gain
+    envelopes over the whole stream, so the timing of the mix doesn't depend on sleeping between
+    volume changes. The mixed stream is played on
+    the default output device or, in test mode, written to a WAV file in the output directory.
+
+    Requires the optional numpy and miniaudio libraries.
+
+    Arguments:
+        sample_rate (int): sample rate of the mixed stream.
+        channels (int): number of channels in the mixed stream.
+        output (str): directory to write mixed WAV files to instead of playing them, None to play them.
+        cache_bytes (int): max total size of the decoded tracks kept in memory.
+        cache_directory (str): directory to keep decoded tracks in as raw PCM files, None to only keep them 
+            in memory.
+    '''
+    def __init__(self, sample_rate = 44100, channels = 2, output = None, cache_bytes = 67108864, cache_directory = None):
+        # Only required when the mixing engine is used.
+        import miniaudio
+        import numpy
+        self._miniaudio = miniaudio
+        self._np = numpy
+        self.sample_rate = sample_rate
+        self.channels = channels
+        self.output = output
+        if output:
+            os.makedirs(output, exist_ok=True)
+        self.cache = PCMCache(self.decode, channels, f'{sample_rate}:{channels}',
+                              max_bytes=cache_bytes, directory=cache_directory)
+        # Shapes of the fade out envelopes, see services.audio.FADE_CURVES.
+        np = numpy
+        self._envelopes = {'linear': lambda progress: 1 - progress,
+                           'exponential': lambda progress: (1 - progress) ** 3,
+                           'equal_power': lambda progress: np.cos(progress * np.pi / 2)}
+
+    def decode(self, path):
+        ''' Decode an audio file to PCM.
+
+        Returns:
+            samples (numpy.ndarray): int16 samples with a column per channel.
+        '''
+        decoded = self._miniaudio.decode_file(path, output_format=self._miniaudio.SampleFormat.SIGNED16,
+                                              nchannels=self.channels, sample_rate=self.sample_rate)
+        return self._np.frombuffer(decoded.samples, dtype=self._np.int16).reshape(-1, self.channels)
+
+    def _samples(self, path):
+        ''' Get the decoded samples of a track, from the cache, as float32 samples between -1 and 1 '''
+        return self.cache.get(path).astype(self._np.float32) / 32768
+
+    def mix(self, primary, background = None, delay = 2.5, volume = 25, background_volume_shift = 20,
+            fade_delay = 2.5, fade_duration = 1.0, fade_curve = 'linear'):
+        ''' Mix the primary track over the looped background track.
+
+        Arguments:
+            primary (str): path to the audio file to use as the primary track.
+            background (str): path to the audio file to loop under the primary track.
+            delay (float): seconds of background track before the primary track starts.
+            volume (int): volume of the primary track, from 0 to 100.
+            background_volume_shift (int): amount the background track's volume is decreased by.
+            fade_delay (float): seconds the background track continues after the primary track ends.
+            fade_duration (float): length of the background track's fade out, in seconds.
+            fade_curve (str): shape of the fade out, one of FADE_CURVES.
+
+        Returns:
+            (mixed, primary_end): int16 samples of the mix and the frame the primary track ends at.
+        '''
+        np = self._np
+        speech = self._samples(primary)
+        if not background:
+            return self._to_pcm(speech * (volume / 100)), len(speech)
+        start = int(delay * self.sample_rate)
+        primary_end = start + len(speech)
+        fade_start = primary_end + int(fade_delay * self.sample_rate)
+        fade_length = max(1, int(fade_duration * self.sample_rate))
+        # Loop the background track for the length of the mix.
+        mixed = np.resize(self._samples(background), (fade_start + fade_length, self.channels))
+        envelope = np.full(len(mixed), max(0, volume - background_volume_shift) / 100, dtype=np.float32)
+        envelope[fade_start:] *= self._envelopes[fade_curve](np.linspace(0, 1, fade_length, dtype=np.float32))
+        mixed *= envelope[:, np.newaxis]
+        mixed[start:primary_end] += speech * (volume / 100)
+        return self._to_pcm(mixed), primary_end
+
+    def _to_pcm(self, samples):
+        np = self._np
+        return (np.clip(samples, -1, 1) * 32767).astype(np.int16)
+
+    def start(self, condition, primary, mixed, primary_end):
+        ''' Start playing a mix.
+
+        Arguments:
+            condition (threading.Condition): condition notified once the primary track has been played.
+            primary (str): path to the primary track of the mix.
+            mixed (numpy.ndarray): int16 samples of the mix, from mix.
+            primary_end (int): frame the primary track ends at, from mix.
+
+        Returns:
+            playback (Playback): playback of the mix, which finishes once the primary track has been
+                played. The background track's fade out continues in the background, so the next
+                request can start.
+        '''
+        if self.output:
+            self._write(primary, mixed)
+            playback = Playback(condition)
+            playback._finish()
+            return playback
+        return MixedPlayback(condition, self, mixed, primary_end)
+
+    def _write(self, primary, mixed):
+        ''' Write the mix to a WAV file named after the primary track '''
+        output = os.path.join(self.output, os.path.splitext(os.path.basename(primary))[0] + '.wav')
+        with wave.open(output, 'wb') as wav:
+            wav.setnchannels(self.channels)
+            wav.setsampwidth(2)
+            wav.setframerate(self.sample_rate)
+            wav.writeframes(mixed.tobytes())
+        logger.debug(f'Wrote mixed audio to {output}')
+        return output
+
+
+class MixedPlayback(Playback):
+    ''' Playback of a mix on the default output device. While paused, silence is played in place of the mix.
+
+    Arguments:
+        condition (threading.Condition): condition notified once the primary track has been played.
+        mixer (Mixer): mixer that produced the mix.
+        mixed (numpy.ndarray): int16 samples of the mix.
+        primary_end (int): frame the primary track ends at.
+    '''
+    def __init__(self, condition, mixer, mixed, primary_end):
+        super().__init__(condition)
+        self._sample_rate = mixer.sample_rate
+        self._primary_end = primary_end
+        self._frames = 0
+        self._paused = threading.Event()
+        self._stopped = threading.Event()
+        self._ended = threading.Event()
+        miniaudio = mixer._miniaudio
+        self._device = miniaudio.PlaybackDevice(output_format=miniaudio.SampleFormat.SIGNED16,
+                                                nchannels=mixer.channels, sample_rate=mixer.sample_rate)
+        stream = self._stream(mixed, primary_end, mixer.channels)
+        next(stream)
+        self._device.start(stream)
+        threading.Thread(target=self._close, name='MixedPlayback', daemon=True).start()
+
+    def _stream(self, mixed, primary_end, channels):
+        ''' Generator feeding the mixed samples to the playback device '''
+        position = 0
+        required_frames = yield b''
+        while position < len(mixed) and not self._stopped.is_set():
+            if self._paused.is_set():
+                required_frames = yield array.array('h', bytes(required_frames * channels * 2))
+                continue
+            frames = mixed[position:position + required_frames]
+            position += len(frames)
+            self._frames = position
+            if position >= primary_end and not self.finished:
+                self._finish()
+            required_frames = yield array.array('h', frames.tobytes())
+        self._ended.set()
+
+    def _close(self):
+        ''' Close the playback device once the whole mix has been played, or playback is stopped '''
+        self._ended.wait()
+        self._device.close()
+        if not self.finished:
+            self._finish()
+
+    def position(self):
+        return self._frames / self._sample_rate
+
+    def duration(self):
+        return self._primary_end / self._sample_rate
+
+    def _pause(self):
+        self._paused.set()
+
+    def _resume(self):
+        self._paused.clear()
+
+    def _stop(self):
+        self._stopped.set()
+        self._ended.set()
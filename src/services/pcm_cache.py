@@ -0,0 +1,157 @@
+'''
+Created on Oct 18, 2026
+
+@author: x2012x
+'''
+import hashlib
+import logging
+import os
+import tempfile
+import threading
+from collections import OrderedDict
+
+logger = logging.getLogger(__name__)
+
+
+class PCMCache(object):
+    ''' Size bounded cache of decoded audio, so frequently played tracks aren't decoded every time.
+
+    Tracks are keyed by path, modification time and size, so a changed file is decoded again. Once the
+    decoded tracks exceed max_bytes, the least recently used tracks are dropped. If a directory is
+    supplied, decoded tracks are also written there as raw PCM files, which are memory-mapped rather
+    than decoded when the track is next used, including after a restart. The directory is kept within
+    max_disk_bytes by removing the oldest files.
+
+    Requires the optional numpy library.
+
+    Arguments:
+        decoder (callable): decodes the audio file at a path to int16 samples with a column per channel.
+        channels (int): number of channels in the decoded samples.
+        fmt (str): description of the decoded format (e.g. sample rate and channels), part of each file's key.
+        max_bytes (int): max total size of the decoded tracks held by the cache.
+        directory (str): directory to write raw PCM files to, None to only cache tracks in memory.
+        max_disk_bytes (int): max total size of the raw PCM files.
+    '''
+    def __init__(self, decoder, channels, fmt = '', max_bytes = 67108864, directory = None, max_disk_bytes = 268435456):
+        # Only required when the cache is used.
+        import numpy
+        self._np = numpy
+        self._decoder = decoder
+        self._channels = channels
+        self._format = fmt
+        self.max_bytes = max_bytes
+        self.directory = directory
+        self.max_disk_bytes = max_disk_bytes
+        # Map of key to samples, ordered from least to most recently used.
+        self._tracks = OrderedDict()
+        self._lock = threading.Lock()
+        self._memory_bytes = 0
+        self._mapped_bytes = 0
+        self._disk_bytes = 0
+        self.hits = 0
+        self.mapped = 0
+        self.misses = 0
+        self.evictions = 0
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+            with os.scandir(directory) as scan:
+                for item in scan:
+                    if item.name.endswith('.tmp'):
+                        os.remove(item.path)
+                    elif item.name.endswith('.pcm'):
+                        self._disk_bytes += item.stat().st_size
+
+    def get(self, path):
+        ''' Get the decoded samples of an audio file.
+
+        Arguments:
+            path (str): path to the audio file.
+
+        Returns:
+            samples (numpy.ndarray): int16 samples with a column per channel. Shared by every user of
+                the track, so they must not be modified.
+        '''
+        stat = os.stat(path)
+        key = (path, stat.st_mtime_ns, stat.st_size)
+        with self._lock:
+            samples = self._tracks.get(key)
+            if samples is not None:
+                self.hits += 1
+                self._tracks.move_to_end(key)
+                return samples
+        pcm_file = self._pcm_file(key) if self.directory else None
+        if pcm_file and os.path.exists(pcm_file):
+            samples = self._np.memmap(pcm_file, dtype=self._np.int16, mode='r').reshape(-1, self._channels)
+            with self._lock:
+                self.mapped += 1
+        else:
+            samples = self._decoder(path)
+            samples.flags.writeable = False
+            with self._lock:
+                self.misses += 1
+            if pcm_file:
+                self._write(pcm_file, samples)
+        self._add(key, samples)
+        return samples
+
+    def _pcm_file(self, key):
+        name = hashlib.sha256(f'{key[0]}\n{key[1]}\n{key[2]}\n{self._format}'.encode('utf_8')).hexdigest()
+        return os.path.join(self.directory, f'{name}.pcm')
+
+    def _write(self, pcm_file, samples):
+        ''' Write decoded samples to a raw PCM file, removing the oldest files once over the disk budget '''
+        fd, temp_path = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as out:
+                out.write(samples.tobytes())
+            os.replace(temp_path, pcm_file)
+        except BaseException:
+            os.remove(temp_path)
+            raise
+        with self._lock:
+            self._disk_bytes += samples.nbytes
+            if not self.max_disk_bytes or self._disk_bytes <= self.max_disk_bytes:
+                return
+            files = sorted((item.stat().st_mtime, item.path, item.stat().st_size)
+                           for item in os.scandir(self.directory) if item.name.endswith('.pcm'))
+            for _, path, size in files:
+                if self._disk_bytes <= self.max_disk_bytes * 0.9:
+                    break
+                # Mapped files remain readable once removed, until they're unmapped.
+                os.remove(path)
+                self._disk_bytes -= size
+
+    def _add(self, key, samples):
+        mapped = isinstance(samples, self._np.memmap)
+        with self._lock:
+            if key in self._tracks:
+                return
+            self._tracks[key] = samples
+            if mapped:
+                self._mapped_bytes += samples.nbytes
+            else:
+                self._memory_bytes += samples.nbytes
+            while self._memory_bytes + self._mapped_bytes > self.max_bytes and len(self._tracks) > 1:
+                _, evicted = self._tracks.popitem(last=False)
+                if isinstance(evicted, self._np.memmap):
+                    self._mapped_bytes -= evicted.nbytes
+                else:
+                    self._memory_bytes -= evicted.nbytes
+                self.evictions += 1
+
+    def stats(self):
+        ''' Get the cache counters.
+
+        Returns:
+            stats (dict): number of tracks, hits, tracks mapped from PCM files, misses and evictions, and the
+                bytes of decoded tracks held in memory, mapped from PCM files and written to disk.
+        '''
+        with self._lock:
+            return {'tracks': len(self._tracks),
+                    'hits': self.hits,
+                    'mapped': self.mapped,
+                    'misses': self.misses,
+                    'evictions': self.evictions,
+                    'memory_bytes': self._memory_bytes,
+                    'mapped_bytes': self._mapped_bytes,
+                    'disk_bytes': self._disk_bytes}
@@ -0,0 +1,131 @@
+'''
+Created on Oct 18, 2026
+
+@author: x2012x
+'''
+import time
+from collections import deque
+
+# Play request priorities, from most to least important.
+ALERT = 0
+REPLY = 1
+MEDIA = 2
+PRIORITY_NAMES = ('alert', 'reply', 'media')
+
+# Overflow policies
+DROP_NEW = 'drop_new'
+DROP_OLDEST = 'drop_oldest'
+
+
+class PlayQueue(object):
+    ''' Bounded priority queue of PlayRequests.
+
+    Requests are played in priority order, alerts before replies before media, and in the order they were
+    queued within a priority. Once max_size requests are queued, the overflow policy decides which request
+    is dropped: 'drop_new' drops the new request, 'drop_oldest' drops the oldest request of the least
+    important priority that isn't more important than the new request. If coalesce is enabled, a request
+    for the same tracks and zones as the last request queued at its priority is merged into that request.
+
+    The queue isn't thread safe, it is guarded by the AudioService's condition.
+
+    Arguments:
+        max_size (int): max number of queued requests, 0 for no limit.
+        overflow (str): overflow policy, 'drop_new' or 'drop_oldest'.
+        coalesce (bool): True to merge duplicate consecutive requests.
+    '''
+    def __init__(self, max_size = 32, overflow = DROP_OLDEST, coalesce = True):
+        self.max_size = max_size
+        self.overflow = overflow
+        self.coalesce = coalesce
+        self._queues = tuple(deque() for _ in PRIORITY_NAMES)
+        self._size = 0
+        self.max_depth = 0
+        self._counters = tuple({'queued': 0, 'played': 0, 'dropped': 0, 'coalesced': 0, 'preempted': 0}
+                               for _ in PRIORITY_NAMES)
+        # Recent waits, in seconds, from queuing a request to the start of its playback.
+        self._waits = tuple(deque(maxlen=100) for _ in PRIORITY_NAMES)
+
+    def __len__(self):
+        return self._size
+
+    def push(self, request):
+        ''' Queue a request.
+
+        Returns:
+            queued (bool): False if the request was dropped or merged into a queued request.
+        '''
+        queue = self._queues[request.priority]
+        if self.coalesce and queue and self._duplicate(queue[-1], request):
+            self._counters[request.priority]['coalesced'] += 1
+            return False
+        if self.max_size and self._size >= self.max_size and not self._make_room(request.priority):
+            self._counters[request.priority]['dropped'] += 1
+            return False
+        request.queued_at = time.monotonic()
+        queue.append(request)
+        self._size += 1
+        self.max_depth = max(self.max_depth, self._size)
+        self._counters[request.priority]['queued'] += 1
+        return True
+
+    def _duplicate(self, queued, request):
+        return (queued.primary == request.primary and queued.background == request.background
+                and queued.zones == request.zones)
+
+    def _make_room(self, priority):
+        ''' Drop a queued request to make room for a request of the supplied priority, if the policy allows '''
+        if self.overflow != DROP_OLDEST:
+            return False
+        for dropped in range(len(PRIORITY_NAMES) - 1, priority - 1, -1):
+            if self._queues[dropped]:
+                self._queues[dropped].popleft()
+                self._size -= 1
+                self._counters[dropped]['dropped'] += 1
+                return True
+        return False
+
+    def pop(self):
+        ''' Remove the next request to play, the most important request queued first '''
+        for priority, queue in enumerate(self._queues):
+            if queue:
+                request = queue.popleft()
+                self._size -= 1
+                self._counters[priority]['played'] += 1
+                self._waits[priority].append(time.monotonic() - request.queued_at)
+                return request
+        raise IndexError('pop from an empty PlayQueue')
+
+    def preempts(self, priority):
+        ''' Determine if a request more important than the supplied priority is queued '''
+        return any(self._queues[p] for p in range(priority))
+
+    def preempted(self, priority):
+        ''' Record that the playback of a request of the supplied priority was preempted '''
+        self._counters[priority]['preempted'] += 1
+
+    def clear(self):
+        ''' Remove all queued requests '''
+        for queue in self._queues:
+            queue.clear()
+        self._size = 0
+
+    def requests(self):
+        ''' Get the queued requests, in the order they will be played '''
+        return [request for queue in self._queues for request in queue]
+
+    def stats(self):
+        ''' Get the queue metrics.
+
+        Returns:
+            stats (dict): current and max queue depth and, for each priority, the number of queued, played,
+                dropped, coalesced and preempted requests, and the mean and max recent wait, in milliseconds,
+                from queuing a request to the start of its playback.
+        '''
+        priorities = {}
+        for priority, name in enumerate(PRIORITY_NAMES):
+            waits = self._waits[priority]
+            priorities[name] = dict(self._counters[priority],
+                                    depth=len(self._queues[priority]),
+                                    wait_ms={'mean': round(sum(waits) / len(waits) * 1e3, 1) if waits else None,
+                                             'max': round(max(waits) * 1e3, 1) if waits else None})
+        return {'depth': self._size, 'max_depth': self.max_depth, 'priorities': priorities}
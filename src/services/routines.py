@@ -10,6 +10,9 @@ from errors.reasons import get_general_failure
 
 # TODO: Refactor this such that phrases are stored outside of code (e.g. in a DB) and build a service for accessing them.
 
+# Greeting used by the good morning routine.
+GOOD_MORNING_GREETING = 'Good morning.'
+
 # Collection of good morning phrases.
 GOOD_MORNING = ['I hope you slept well.',
                 'I hope you\'re rested.']
@@ -61,13 +64,18 @@ class RoutinesService(BaseService):
             routine (Routine): routine to register.
         '''
         self._routines[routine.name] = routine
+
+    def phrases(self):
+        ''' Every phrase that can be spoken by the built-in routines '''
+        return ([GOOD_MORNING_GREETING] + GOOD_MORNING + [f'Have {day_type} day.' for day_type in DAY_TYPES] + 
+                [f'{good_night} {tip}' for good_night in GOOD_NIGHT for tip in NIGHT_TIPS])
         
     def _good_morning(self):
         ''' Target for good morning routine.
         
         Builds a collection of responses which wishes the user good morning and tells the current time.
         '''
-        return [Response('Good morning.'), Response(random.choice(GOOD_MORNING)), self.conductor.calendar.current(), Response('Have '+random.choice(DAY_TYPES)+' day.')]
+        return [Response(GOOD_MORNING_GREETING), Response(random.choice(GOOD_MORNING)), self.conductor.calendar.current(), Response('Have '+random.choice(DAY_TYPES)+' day.')]
     
     def _good_night(self):
         ''' Target for good night routine.
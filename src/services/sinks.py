@@ -0,0 +1,67 @@
+'''
+Created on Oct 18, 2026
+
+@author: x2012x
+'''
+import logging
+import os
+import shutil
+import tempfile
+from services.audio import Playback, Sink
+
+logger = logging.getLogger(__name__)
+
+
+class FileSink(Sink):
+    ''' Writes the primary track of each request to a directory instead of playing it, for zones that
+    are recorded, or for testing without an audio device. Playback finishes once the track is written.
+
+    Arguments:
+        name (str): name of the zone.
+        directory (str): directory to write the tracks to.
+    '''
+    def __init__(self, name, directory):
+        super().__init__(name)
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+
+    def start(self, condition, request, prepared):
+        output = os.path.join(self.directory, os.path.basename(request.primary))
+        fd, temp_path = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+        os.close(fd)
+        try:
+            shutil.copyfile(request.primary, temp_path)
+            os.replace(temp_path, output)
+        except BaseException:
+            os.remove(temp_path)
+            raise
+        logger.debug(f'Wrote {request.primary} to zone {self.name}: {output}')
+        playback = Playback(condition)
+        playback._finish()
+        return playback
+
+
+class NetworkSink(Sink):
+    ''' Stub for zones played by a remote node, so a zone can be configured ahead of the node. Streaming
+    isn't implemented yet, requests are only logged and their playback finishes immediately.
+
+    Arguments:
+        name (str): name of the zone.
+        host (str): host name of the remote node.
+        port (int): port the remote node accepts audio on.
+    '''
+    def __init__(self, name, host, port = 4713):
+        super().__init__(name)
+        self.host = host
+        self.port = port
+
+    def start(self, condition, request, prepared):
+        logger.info(f'Zone {self.name} would stream {request.primary} to {self.host}:{self.port}, '
+                    'streaming is not implemented')
+        playback = Playback(condition)
+        playback._finish()
+        return playback
+
+
+# Sinks available to zones, by the name used in the Audio zones settings.
+SINKS = {'file': FileSink, 'network': NetworkSink}
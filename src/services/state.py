@@ -6,6 +6,9 @@ Created on Apr 14, 2021
 from errors.exceptions import StateFailure
 from services.base import BaseService
 
+# Phrase spoken when there is nothing to say again.
+NOTHING_SAID = 'I haven\'t said anything.'
+
 class StateService(BaseService):
     ''' Provides access to state service operations.
     
@@ -15,8 +18,12 @@ class StateService(BaseService):
     def __init__(self, conductor):
         super().__init__(conductor, 'state')
 
+    def phrases(self):
+        ''' Phrases spoken by the state service '''
+        return [NOTHING_SAID]
+
     def say_again(self):
         ''' Return the last collection of responses '''
         if not self.conductor.last_response:
-            raise StateFailure('I haven\'t said anything.')
+            raise StateFailure(NOTHING_SAID)
         return self.conductor.last_response
\ No newline at end of file
@@ -4,43 +4,234 @@ Created on Apr 3, 2021
 @author: x2012x
 '''
 import logging
-from google.cloud import texttospeech
 import hashlib
-import os
-from errors.exceptions import TTSFailure
-from services.base import BaseService
-from errors.reasons import get_general_failure
+import queue
+import re
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from errors.exceptions import TTSFailure, SpeakableException
+from services.base import BaseService, Response
 from services.audio import PlayRequest
-from pathlib import Path
+from services.tts_backends import BACKENDS
+from services.tts_cache import TTSCache, LRU
+from services.tts_compose import ComposedRecordings, join_recordings
+from services.tts_packed import PackedTTSCache
+from services.tts_prewarm import Prewarmer
+from utils.circuit import CircuitBreaker, CLOSED
+from utils.singleflight import SingleFlight
+from utils.configuration import setting
+from utils.metrics import metrics, STAGE_SECONDS
 
 logger = logging.getLogger(__name__)
 
+
+# Whitespace following the end of a sentence.
+_SENTENCE_END = re.compile(r'(?<=[.!?])\s+')
+
+
+def split_sentences(text, chunk_size, limit):
+    ''' Split text into chunks at sentence boundaries.
+    
+    Consecutive sentences are packed into a chunk until it would exceed chunk_size. Sentences longer 
+    than limit are split at whitespace, or at limit if they have no whitespace.
+    
+    Arguments:
+        text (str): text to split.
+        chunk_size (int): preferred max number of characters per chunk.
+        limit (int): max number of characters per chunk.
+        
+    Returns:
+        chunks ([str]): chunks of text, in order.
+    '''
+    chunks = []
+    chunk = ''
+    for sentence in _SENTENCE_END.split(text.strip()):
+        while len(sentence) > limit:
+            if chunk:
+                chunks.append(chunk)
+                chunk = ''
+            split = sentence.rfind(' ', 0, limit)
+            split = split if split > 0 else limit
+            chunks.append(sentence[:split])
+            sentence = sentence[split:].lstrip()
+        if chunk and len(chunk) + 1 + len(sentence) > chunk_size:
+            chunks.append(chunk)
+            chunk = sentence
+        else:
+            chunk = f'{chunk} {sentence}' if chunk else sentence
+    if chunk:
+        chunks.append(chunk)
+    return chunks
+
+
+class SpeechPipeline(threading.Thread):
+    ''' Background thread which speaks responses deferred by the TTS service, in the order received.
+    
+    Failures can't be reported in the HTTP response of a deferred request, so they are recorded 
+    for the TTS service's status report instead.
+    
+    Arguments:
+        service (TextToSpeechService): reference to the TTS service used to speak responses.
+    '''
+    def __init__(self, service):
+        super().__init__(name='SpeechPipeline', daemon=True)
+        self._service = service
+        self._queue = queue.Queue()
+        self.spoken = 0
+        self.failures = deque(maxlen=20)
+        
+    def submit(self, responses):
+        ''' Queue a collection of responses to be spoken '''
+        self._queue.put(responses)
+        
+    def pending(self):
+        ''' Number of response collections waiting to be spoken '''
+        return self._queue.qsize()
+        
+    def stop(self):
+        ''' Stop the pipeline once the responses queued ahead of this request are spoken '''
+        self._queue.put(None)
+        
+    def run(self):
+        while True:
+            responses = self._queue.get()
+            if responses is None:
+                break
+            failures = self._service.speak_responses(responses)
+            self.spoken += len(responses) - len(failures)
+            for e in failures:
+                logger.error(f'Failed to speak deferred response: {e.phrase}')
+                self.failures.append({'text': e.phrase, 
+                                      'error': type(e).__name__, 
+                                      'time': time.strftime('%Y-%m-%dT%H:%M:%S')})
+        logger.debug('Speech pipeline stopped')
+
+
 class TextToSpeechService(BaseService):
     ''' Provides access to TTS service operations.
     
-    Service depends on Google's Text-To-Speech API. Your Google TTS JSON 
-    config must be staged to 'resources/config/google-tts.json'
+    Speech is synthesized by the backend selected by the TTS 'backend' setting, Google's Text-To-Speech 
+    API by default. Your Google TTS JSON config must be staged to 'resources/config/google-tts.json'. 
+    Synthesis calls are limited by the TTS 'timeout' setting and protected by a circuit breaker, which 
+    fails requests fast once the backend has failed repeatedly.
     
     Arguments:
         conductor (Conductor): reference to the running Conductor instance.
     ''' 
     def __init__(self, conductor):
         super().__init__(conductor, 'tts')
-        # Google TTS client
-        self._client = texttospeech.TextToSpeechClient.from_service_account_file('resources/config/google-tts.json')
-        # Google TTS voice configuration
-        self._voice = texttospeech.VoiceSelectionParams(language_code="en-GB", 
-                                                        name="en-GB-Standard-F", 
-                                                        ssml_gender=texttospeech.SsmlVoiceGender.FEMALE)
-        # Google Audio file configuration
-        self._audio_config = texttospeech.AudioConfig(audio_encoding=texttospeech.AudioEncoding.MP3)
-        # Google has a max character limit, service will fail any request that exceeds this limit, before sending to Google.
+        # Backend used to synthesize speech
+        self._backend = BACKENDS[setting('TTS', 'backend', default='google')]()
+        self._timeout = setting('TTS', 'timeout', default=5.0)
+        self._breaker = CircuitBreaker('tts', 
+                                       failure_threshold=setting('TTS', 'circuit_breaker', 'failures', default=3),
+                                       reset_timeout=setting('TTS', 'circuit_breaker', 'reset', default=30))
+        # Google has a max character limit per request. Longer text is split into chunks at sentence boundaries, 
+        # text longer than chunk_size is chunked so the first chunk can play while the rest are synthesized.
         self._character_limit = 5000
-        # TODO: Need to setup a scheduler to periodically cleanup the cache.
+        self._chunk_size = min(setting('TTS', 'chunk_size', default=400), self._character_limit)
         # TTS audio is cached in this directory for reuse. If the same phrase is being 
         # requested, the service will play from the cache instead of sending a request to Google.
-        self._cache = 'resources/cache/tts_cache'
-        Path(self._cache).mkdir(parents=True, exist_ok=True)
+        # The cache is indexed in memory and bounded by the configured budgets. Recordings that are queued or 
+        # being played aren't deleted when they're evicted.
+        budgets = {'max_bytes': setting('TTS', 'cache', 'max_bytes', default=0),
+                   'max_entries': setting('TTS', 'cache', 'max_entries', default=0),
+                   'policy': setting('TTS', 'cache', 'policy', default=LRU),
+                   'in_use': self._playing}
+        if setting('TTS', 'cache', 'format', default='files') == 'packed':
+            self._cache = PackedTTSCache('resources/cache/tts_packed',
+                                         segment_size=setting('TTS', 'cache', 'segment_size', default=16777216),
+                                         **budgets)
+        else:
+            self._cache = TTSCache('resources/cache/tts_cache', **budgets)
+        self._cache.load()
+        # Speak responses that are composed of fragments by joining the recordings of each fragment.
+        self._compose_fragments = setting('TTS', 'compose_fragments', default=True)
+        # Composed recordings are played from temporary files, until they're reused.
+        self._composed = ComposedRecordings('resources/cache/tts_composed', in_use=self._playing)
+        # Shares a single synthesis request between concurrent requests for the same text.
+        self._flights = SingleFlight()
+        # Synthesis calls are counted by concurrent synthesizer threads.
+        self._synthesis_lock = threading.Lock()
+        self._synthesis_calls = 0
+        # Speaks responses in the background for requests that don't wait on speech.
+        self._pipeline = SpeechPipeline(self)
+        self._pipeline.start()
+        # Bounded pool used to synthesize the responses of a request concurrently.
+        self._synthesizer = ThreadPoolExecutor(max_workers=setting('TTS', 'synthesis_workers', default=3), 
+                                               thread_name_prefix='Synthesizer')
+        # Synthesizes known phrases into the cache after startup.
+        # Pre-warming has its own circuit breaker, so its failures don't fail requests.
+        self._prewarmer = Prewarmer(self, 
+                                    workers=setting('TTS', 'prewarm', 'workers', default=2),
+                                    rate=setting('TTS', 'prewarm', 'rate', default=2.0),
+                                    breaker=CircuitBreaker('tts prewarm', 
+                                                           failure_threshold=self._breaker.failure_threshold,
+                                                           reset_timeout=self._breaker.reset_timeout))
+        
+    def _shutdown(self):
+        ''' Stop the background speech pipeline and pre-warming '''
+        self._pipeline.stop()
+        self._prewarmer.stop()
+        self._synthesizer.shutdown(wait=False)
+        
+    def prewarm(self, phrases):
+        ''' Synthesize any of the supplied phrases that aren't cached, in the background.
+        
+        Arguments:
+            phrases ([str]): phrases that are known to be spoken.
+        '''
+        if setting('TTS', 'prewarm', 'enabled', default=True):
+            self._prewarmer.start(phrases, setting('TTS', 'prewarm', 'delay', default=5))
+        
+    def prewarm_status(self):
+        ''' Get the progress of pre-warming the cache '''
+        return self._prewarmer.progress()
+        
+    def synthesis_available(self):
+        ''' Determine if the circuit breaker allows synthesis calls, False while it's open or trying a call '''
+        return self._breaker.state == CLOSED
+        
+    def is_cached(self, text_content):
+        ''' Determine if the recording of text_content is in the cache '''
+        return self._cache.contains(self._hash(text_content))
+        
+    def _hash(self, text_content):
+        ''' Get the hash of the text_content, which identifies its recording in the cache '''
+        return hashlib.sha256(text_content.encode('utf-8')).hexdigest()
+        
+    def _playing(self):
+        ''' Get the paths of the audio files queued or being played by the audio service '''
+        audio = getattr(self.conductor, 'audio', None)
+        return audio.files() if audio else set()
+        
+    def status(self):
+        ''' Get the status of deferred speech, the TTS cache and synthesis.
+        
+        Returns:
+            status (dict): number of pending and spoken deferred responses, the most recent failures, 
+                the cache counters, the number of temporary composed recordings, the number of synthesis calls 
+                made and avoided by deduplication and the state of the synthesis circuit breaker.
+        '''
+        return {'pending': self._pipeline.pending(),
+                'spoken': self._pipeline.spoken,
+                'failures': list(self._pipeline.failures),
+                'cache': self._cache.stats(),
+                'composed': self._composed.stats(),
+                'synthesis': {'calls': self._synthesis_calls,
+                              'deduplicated': self._flights.deduplicated,
+                              'circuit': self._breaker.stats()}}
+        
+    def speak_later(self, responses):
+        ''' Speak the supplied response objects in the background, without waiting on synthesis.
+        
+        Arguments:
+            responses ([Response]): Response objects to speak, in order.
+        '''
+        self._pipeline.submit(responses)
 
     def speak_response(self, response):
         ''' Speak the supplied response object.
@@ -48,44 +239,207 @@ class TextToSpeechService(BaseService):
         Arguments:
             response (Response): Response object to speak.
         '''
-        self.speak(response.speech.text, response.background_audio, response.background_volume_shift)
+        failures = self.speak_responses([response])
+        if failures:
+            raise failures[0]
+        
+    def speak_responses(self, responses):
+        ''' Speak the supplied response objects, in order.
+        
+        Each response is planned as one or more recordings, long text without a background track is 
+        split into a recording per chunk. When there are several recordings, they are all synthesized 
+        concurrently and each one is sent to the audio service as soon as it and all of the recordings 
+        before it are ready. Playback of the first recording therefore overlaps synthesis of the rest.
+        
+        Arguments:
+            responses ([Response]): Response objects to speak.
+            
+        Returns:
+            failures ([SpeakableException]): exceptions of the responses that couldn't be spoken, in order.
+        '''
+        plans = [(r, self._plan(r)) for r in responses if r.speech.text]
+        concurrent = sum(len(recordings) for _, recordings in plans) > 1
+        # Each recording's audio file is obtained by a callable, which waits on its synthesis if concurrent.
+        plans = [(r, [(text, self._synthesizer.submit(task, *args).result if concurrent else partial(task, *args)) 
+                      for text, task, args in recordings]) 
+                 for r, recordings in plans]
+        failures = []
+        for response, recordings in plans:
+            for i, (text, recording) in enumerate(recordings):
+                try:
+                    # Background tracks are only planned with responses that are a single recording.
+                    self._play(text, recording(), response.background_audio, response.background_volume_shift)
+                except SpeakableException as e:
+                    # Report the part of the response that wasn't spoken.
+                    if len(recordings) > 1:
+                        e = TTSFailure(' '.join(text for text, _ in recordings[i:]))
+                    failures.append(e)
+                    break
+        return failures
         
     def speak(self, text_content, background_audio = None, background_volume_shift = 20):
         ''' Speak the supplied text_content while playing the optional background_audio track.
         
-        text_content will be sent to the Google TTS service. Once the TTS audio file is 
-        received from Google, an AudioService PlayRequest is constructed to process the returned audio
+        text_content will be sent to the TTS backend. Once the TTS audio file is 
+        received from the backend, an AudioService PlayRequest is constructed to process the returned audio
         file and the optional background track.
         
         Arguments:
-            text_content (str): text to send to Google TTS.
+            text_content (str): text to send to the TTS backend.
             background_audio (str): path to audio file to play as background audio track
             background_volume_shift (int): amount of volume decrease that should be used for the 
                 background track              
         '''        
-        # Check for Google TTS max characters before transmitting request
+        self.speak_response(Response(text_content, background_audio, background_volume_shift))
+        
+    def _plan(self, response):
+        ''' Plan the recordings used to speak a response.
+        
+        Returns:
+            recordings ([(str, callable, tuple)]): text of each recording, with the task and arguments 
+                that produce its audio file, in the order they're played.
+        '''
+        text = response.speech.text
+        if response.speech.fragments and self._compose_fragments:
+            return [(text, self.compose, (text, response.speech.fragments))]
+        chunks = split_sentences(text, self._chunk_size, self._character_limit) if len(text) > self._chunk_size else [text]
+        if len(chunks) == 1:
+            return [(text, self.synthesize, (text,))]
+        # A background track has to loop under the whole response, so join the chunks into one recording.
+        if response.background_audio:
+            return [(text, self.compose, (text, chunks))]
+        return [(chunk, self.synthesize, (chunk,)) for chunk in chunks]
+        
+    def compose(self, text_content, fragments, breaker = None):
+        ''' Get the audio file of text_content by joining the recordings of the fragments it's composed of.
+        
+        Each fragment is synthesized, and cached, on its own. The joined recording is played from a temporary 
+        file, as most compositions (e.g. the current time) are only spoken once. It's cached once the text is 
+        spoken again, so the fragments of a reused composition are only joined twice.
+        
+        Arguments:
+            text_content (str): text being spoken.
+            fragments ([str]): fragments of text_content, in the order spoken.
+            breaker (CircuitBreaker): circuit breaker synthesis calls are made through, the service's by default.
+            
+        Returns:
+            audio_file (str): path to the cached or temporary audio file.
+        '''
+        try:
+            # Composed recordings are cached separately from a recording of the text as a whole.
+            composed_hash = self._hash('\n'.join(['composed'] + fragments))
+            audio_file = self._lookup(composed_hash)
+            if not audio_file:
+                audio_file = self._flights.do(composed_hash, self._compose, composed_hash, text_content, fragments, breaker)
+            return audio_file
+        except Exception:
+            raise TTSFailure(text_content)
+            
+    def _compose(self, composed_hash, text_content, fragments, breaker = None):
+        ''' Join the recordings of each fragment, storing the result in the cache if the composition is reused. '''
+        if not self._cache.contains(composed_hash):
+            audio_content = join_recordings(self._audio(fragment, breaker) for fragment in fragments)
+            if not self._composed.reused(composed_hash):
+                return self._composed.write(composed_hash, audio_content)
+            self._cache.store(composed_hash, text_content, audio_content)
+        return self._playable(composed_hash)
+        
+    def synthesize(self, text_content, breaker = None):
+        ''' Get the audio file of the supplied text_content, sending it to the TTS backend if it isn't cached.
+        
+        Arguments:
+            text_content (str): text to send to the TTS backend.
+            breaker (CircuitBreaker): circuit breaker the synthesis call is made through, the service's by default.
+            
+        Returns:
+            audio_file (str): path to the cached audio file.
+        '''
+        # Check for the max characters per request before transmitting request
         if len(text_content) > self._character_limit:
-            logger.error('Text to speak exceeds TTS character limit')
-            raise TTSFailure(get_general_failure())
+            return self.compose(text_content, split_sentences(text_content, self._chunk_size, self._character_limit), breaker)
         try:
-            # Get hash of the text_content being spoken.
-            text_hash = hashlib.sha256(text_content.encode('utf-8')).hexdigest()
-            # Use that hash to construct filenames for the text and audio file that will be stored in cache
-            audio_file = os.path.join(self._cache, f'{text_hash}.mp3')
-            text_file = os.path.join(self._cache, f'{text_hash}.txt')
-            # If the current text doesn't exist in cache, send request to Google.
-            if not os.path.exists(audio_file):
-                synthesis_input = texttospeech.SynthesisInput(text=text_content)
-                response = self._client.synthesize_speech(input=synthesis_input, voice=self._voice, audio_config=self._audio_config)
-                with open(audio_file, "wb") as out:
-                    out.write(response.audio_content)
-                    logger.debug(f'Created new recording at {audio_file}')
-                with open(text_file, "w") as out:
-                    out.write(text_content)
-                    logger.debug(f'Created transcription at {text_file}')
+            text_hash = self._hash(text_content)
+            audio_file = self._lookup(text_hash)
+            # If the current text doesn't exist in cache, send request to the backend. Concurrent 
+            # requests for the same text share a single request.
+            if not audio_file:
+                self._flights.do(text_hash, self._synthesize, text_hash, text_content, breaker)
+                audio_file = self._playable(text_hash)
             else:
                 logger.info(f'Playing audio from cache {audio_file}')
-            # Send a PlayRequest to the audio service to play the TTS audio and optional background track.
+            return audio_file
+        except Exception:
+            raise TTSFailure(text_content)
+            
+    def record(self, text_content, breaker = None):
+        ''' Store the recording of the supplied text_content in the cache, sending it to the TTS backend if it 
+        isn't cached, without preparing it for playback.
+        
+        Arguments:
+            text_content (str): text to send to the TTS backend.
+            breaker (CircuitBreaker): circuit breaker the synthesis call is made through, the service's by default.
+        '''
+        # Text over the character limit is recorded as the chunks it's spoken as.
+        if len(text_content) > self._character_limit:
+            for chunk in split_sentences(text_content, self._chunk_size, self._character_limit):
+                self.record(chunk, breaker)
+            return
+        try:
+            text_hash = self._hash(text_content)
+            if not self._cache.contains(text_hash):
+                self._flights.do(text_hash, self._synthesize, text_hash, text_content, breaker)
+        except Exception:
+            raise TTSFailure(text_content)
+            
+    def _audio(self, text_content, breaker = None):
+        ''' Get the recorded audio of text_content, sending it to the TTS backend if it isn't cached '''
+        text_hash = self._hash(text_content)
+        audio_content = self._cache.read(text_hash)
+        if audio_content is None:
+            audio_content = self._flights.do(text_hash, self._synthesize, text_hash, text_content, breaker)
+        return audio_content
+            
+    def _playable(self, text_hash):
+        ''' Get the audio file of a recording that was just stored '''
+        audio_file = self._cache.peek(text_hash)
+        if not audio_file:
+            raise LookupError(f'Recording was evicted before it was played: {text_hash}')
+        return audio_file
+            
+    def _lookup(self, text_hash):
+        ''' Look up a recording in the cache, recording the latency of the lookup '''
+        start = time.perf_counter()
+        audio_file = self._cache.lookup(text_hash)
+        metrics.observe(STAGE_SECONDS, (('stage', 'cache_lookup'),), time.perf_counter() - start)
+        return audio_file
+            
+    def _synthesize(self, text_hash, text_content, breaker = None):
+        ''' Send text_content to the TTS backend and store the recording in the cache, unless it was stored 
+        by a request that completed since the cache was checked.
+        
+        Returns:
+            audio_content (bytes): the recorded audio.
+        '''
+        if self._cache.contains(text_hash):
+            audio_content = self._cache.read(text_hash)
+            if audio_content is not None:
+                return audio_content
+        with self._synthesis_lock:
+            self._synthesis_calls += 1
+        start = time.perf_counter()
+        try:
+            audio_content = (breaker or self._breaker).call(self._backend.synthesize, text_content, self._timeout)
+        finally:
+            metrics.observe(STAGE_SECONDS, (('stage', 'synthesis'),), time.perf_counter() - start)
+        self._cache.store(text_hash, text_content, audio_content)
+        return audio_content
+            
+    def _play(self, text_content, audio_file, background_audio = None, background_volume_shift = 20):
+        ''' Send a PlayRequest to the audio service to play the TTS audio and optional background track. '''
+        start = time.perf_counter()
+        try:
             self.conductor.audio.play(PlayRequest(audio_file, background_audio, background_volume_shift = background_volume_shift))
         except Exception:
             raise TTSFailure(text_content)
+        finally:
+            metrics.observe(STAGE_SECONDS, (('stage', 'audio_enqueue'),), time.perf_counter() - start)
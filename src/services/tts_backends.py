@@ -0,0 +1,81 @@
+'''
+Created on Oct 18, 2026
+
+@author: x2012x
+'''
+import time
+from abc import ABC, abstractmethod
+
+# A single frame of silent MP3 audio: MPEG-1 Layer III, 32 kbps, 44.1 kHz, mono. A frame with zeroed
+# side information and main data decodes to 1152 samples of silence.
+SILENT_FRAME = bytes([0xFF, 0xFB, 0x10, 0xC0]) + bytes(100)
+SILENT_FRAME_SECONDS = 1152 / 44100
+
+
+class TTSBackend(ABC):
+    ''' Base class of the engines used by the TTS service to synthesize speech. '''
+
+    @abstractmethod
+    def synthesize(self, text_content, timeout):
+        ''' Synthesize the supplied text.
+
+        Arguments:
+            text_content (str): text to synthesize.
+            timeout (float): max number of seconds to wait on the synthesized audio.
+
+        Returns:
+            audio_content (bytes): MP3 audio of the spoken text.
+        '''
+        pass
+
+
+class GoogleBackend(TTSBackend):
+    ''' Synthesizes speech with Google's Text-To-Speech API.
+
+    Your Google TTS JSON config must be staged to 'resources/config/google-tts.json'
+    '''
+    def __init__(self):
+        # Only required when this backend is used.
+        from google.cloud import texttospeech
+        self._texttospeech = texttospeech
+        # Google TTS client
+        self._client = texttospeech.TextToSpeechClient.from_service_account_file('resources/config/google-tts.json')
+        # Google TTS voice configuration
+        self._voice = texttospeech.VoiceSelectionParams(language_code="en-GB",
+                                                        name="en-GB-Standard-F",
+                                                        ssml_gender=texttospeech.SsmlVoiceGender.FEMALE)
+        # Google Audio file configuration
+        self._audio_config = texttospeech.AudioConfig(audio_encoding=texttospeech.AudioEncoding.MP3)
+
+    def synthesize(self, text_content, timeout):
+        synthesis_input = self._texttospeech.SynthesisInput(text=text_content)
+        response = self._client.synthesize_speech(input=synthesis_input, voice=self._voice,
+                                                  audio_config=self._audio_config, timeout=timeout)
+        return response.audio_content
+
+
+class SilenceBackend(TTSBackend):
+    ''' Offline backend which "synthesizes" silence, for tests and benchmarks.
+
+    The audio is deterministic, its duration is proportional to the length of the text.
+
+    Arguments:
+        seconds_per_character (float): duration of audio generated per character of text.
+        latency (float): seconds to wait before returning, to simulate a remote API.
+    '''
+    def __init__(self, seconds_per_character = 0.06, latency = 0):
+        self._seconds_per_character = seconds_per_character
+        self._latency = latency
+
+    def synthesize(self, text_content, timeout):
+        if self._latency:
+            time.sleep(min(self._latency, timeout) if timeout else self._latency)
+            if timeout and self._latency > timeout:
+                raise TimeoutError(f'Synthesis exceeded {timeout} seconds')
+        frames = max(1, round(len(text_content) * self._seconds_per_character / SILENT_FRAME_SECONDS))
+        return SILENT_FRAME * frames
+
+
+# Available backends by name
+BACKENDS = {'google': GoogleBackend,
+            'silence': SilenceBackend}
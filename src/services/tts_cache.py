@@ -0,0 +1,276 @@
+'''
+Created on Oct 18, 2026
+
+@author: x2012x
+'''
+import logging
+import os
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+
+logger = logging.getLogger(__name__)
+
+# Eviction policies
+LRU = 'lru'
+LFU = 'lfu'
+
+
+class CacheEntry(object):
+    ''' Index details of a cached TTS recording.
+
+    Arguments:
+        size (int): size of the recording, in bytes.
+        last_used (float): time the recording was last used.
+        hits (int): number of times the recording has been used from the cache.
+    '''
+    __slots__ = ('size', 'last_used', 'hits')
+
+    def __init__(self, size, last_used, hits = 0):
+        self.size = size
+        self.last_used = last_used
+        self.hits = hits
+
+
+class TTSCache(object):
+    ''' In-memory index of the TTS recordings cached on disk.
+
+    Each recording is stored as '<hash>.mp3', with its transcription in '<hash>.txt', where hash is the
+    SHA256 of the spoken text. The index is loaded from the cache directory in the background, after
+    which lookups no longer touch the filesystem. When the cache exceeds its byte or entry budget, the
+    least recently used (lru) or least frequently used (lfu) recordings are evicted. The files of an evicted
+    recording that may still be played, because its path was handed out within the last hold seconds or
+    it's in use, are only deleted once it is no longer used.
+
+    Arguments:
+        directory (str): path to the cache directory.
+        max_bytes (int): max total size of the cached recordings, 0 for no limit.
+        max_entries (int): max number of cached recordings, 0 for no limit.
+        policy (str): eviction policy, 'lru' or 'lfu'.
+        in_use (callable): returns the paths of the recordings that are queued or being played.
+        hold (float): seconds after its path is handed out that a recording's files aren't deleted.
+    '''
+    def __init__(self, directory, max_bytes = 0, max_entries = 0, policy = LRU, in_use = None, hold = 60):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.max_entries = max_entries
+        self.policy = policy
+        self.in_use = in_use
+        self.hold = hold
+        Path(directory).mkdir(parents=True, exist_ok=True)
+        # Map of hash to CacheEntry, ordered from least to most recently used.
+        self._entries = OrderedDict()
+        self._bytes = 0
+        # Map of hash to the time its path was last handed out, ordered from least to most recent.
+        self._handed_out = OrderedDict()
+        # Hashes of evicted recordings whose files are deleted once they are no longer used.
+        self._deferred = set()
+        self._lock = threading.Lock()
+        self._loaded = threading.Event()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def load(self):
+        ''' Load the index from the cache directory on a background thread '''
+        threading.Thread(target=self._load, name='TTSCacheLoader', daemon=True).start()
+
+    def _load(self):
+        entries = []
+        start = time.time()
+        with os.scandir(self.directory) as scan:
+            for item in scan:
+                # Remove any partial recordings left behind by an interrupted write, but not one being stored.
+                if item.name.endswith('.tmp'):
+                    try:
+                        if item.stat().st_mtime < start:
+                            os.remove(item.path)
+                    except FileNotFoundError:
+                        pass
+                elif item.name.endswith('.mp3'):
+                    stat = item.stat()
+                    entries.append((stat.st_mtime, item.name[:-4], stat.st_size))
+        # Without usage history, treat the most recently created recordings as the most recently used.
+        entries.sort()
+        with self._lock:
+            indexed = self._entries
+            self._entries = OrderedDict()
+            self._bytes = 0
+            for mtime, text_hash, size in entries:
+                self._entries[text_hash] = CacheEntry(size, mtime)
+                self._bytes += size
+            # Keep any recordings added while the directory was being scanned.
+            for text_hash, entry in indexed.items():
+                if text_hash not in self._entries:
+                    self._bytes += entry.size
+                self._entries[text_hash] = entry
+            self._loaded.set()
+            self._evict()
+        logger.info(f'Loaded TTS cache index: {len(entries)} recordings, {self._bytes} bytes')
+
+    def audio_file(self, text_hash):
+        ''' Path to the audio file of the recording identified by text_hash '''
+        return os.path.join(self.directory, f'{text_hash}.mp3')
+
+    def text_file(self, text_hash):
+        ''' Path to the transcription of the recording identified by text_hash '''
+        return os.path.join(self.directory, f'{text_hash}.txt')
+
+    def lookup(self, text_hash):
+        ''' Look up a cached recording.
+
+        Arguments:
+            text_hash (str): SHA256 of the recording's text.
+
+        Returns:
+            audio_file (str): path to the cached audio file, None if it isn't cached.
+        '''
+        with self._lock:
+            entry = self._entries.get(text_hash)
+            if entry is None and not self._loaded.is_set():
+                # The index is still loading, check the directory instead.
+                audio_file = self.audio_file(text_hash)
+                if os.path.exists(audio_file):
+                    entry = self._entries[text_hash] = CacheEntry(os.path.getsize(audio_file), time.time())
+                    self._bytes += entry.size
+            if entry is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            entry.hits += 1
+            entry.last_used = time.time()
+            self._entries.move_to_end(text_hash)
+            return self._hand_out(text_hash)
+
+    def read(self, text_hash):
+        ''' Read a cached recording.
+
+        Arguments:
+            text_hash (str): SHA256 of the recording's text.
+
+        Returns:
+            audio_content (bytes): the recorded audio, None if it isn't cached.
+        '''
+        audio_file = self.lookup(text_hash)
+        if audio_file is None:
+            return None
+        with open(audio_file, 'rb') as recording:
+            return recording.read()
+
+    def contains(self, text_hash):
+        ''' Determine if a recording is cached, without recording the use of it '''
+        with self._lock:
+            return text_hash in self._entries
+
+    def peek(self, text_hash):
+        ''' Look up a cached recording without recording the use of it.
+        
+        Arguments:
+            text_hash (str): SHA256 of the recording's text.
+
+        Returns:
+            audio_file (str): path to the cached audio file, None if it isn't indexed.
+        '''
+        with self._lock:
+            return self._hand_out(text_hash) if text_hash in self._entries else None
+
+    def _hand_out(self, text_hash):
+        ''' Get the path of a recording that is handed out, must be called with the lock held '''
+        now = time.time()
+        self._handed_out[text_hash] = now
+        self._handed_out.move_to_end(text_hash)
+        while next(iter(self._handed_out.values())) < now - self.hold:
+            self._handed_out.popitem(last=False)
+        return self.audio_file(text_hash)
+
+    def _write(self, path, content, mode):
+        ''' Write content to a temporary file and rename it into place, so a partial file is never visible at path '''
+        fd, temp_path = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+        try:
+            with os.fdopen(fd, mode) as out:
+                out.write(content)
+            os.replace(temp_path, path)
+        except BaseException:
+            os.remove(temp_path)
+            raise
+
+    def store(self, text_hash, text_content, audio_content):
+        ''' Store a new recording in the cache.
+
+        Arguments:
+            text_hash (str): SHA256 of the recording's text.
+            text_content (str): text of the recording.
+            audio_content (bytes): recorded audio.
+
+        Returns:
+            audio_file (str): path to the cached audio file.
+        '''
+        with self._lock:
+            # Keep an earlier eviction of the recording from deleting the new files.
+            audio_file = self._hand_out(text_hash)
+            self._deferred.discard(text_hash)
+        # Write the transcription first, the recording is only visible once it's complete.
+        self._write(self.text_file(text_hash), text_content, "w")
+        self._write(audio_file, audio_content, "wb")
+        logger.debug(f'Created new recording at {audio_file}')
+        with self._lock:
+            previous = self._entries.pop(text_hash, None)
+            if previous:
+                self._bytes -= previous.size
+            self._entries[text_hash] = CacheEntry(len(audio_content), time.time())
+            self._bytes += len(audio_content)
+            self._evict()
+        return audio_file
+
+    def _over_budget(self):
+        return ((self.max_bytes and self._bytes > self.max_bytes) or
+                (self.max_entries and len(self._entries) > self.max_entries))
+
+    def _evict(self):
+        ''' Evict recordings until the cache is within budget, must be called with the lock held '''
+        evicted = []
+        while self._over_budget() and len(self._entries) > 1:
+            if self.policy == LFU:
+                text_hash = min(self._entries, key=lambda h: (self._entries[h].hits, self._entries[h].last_used))
+            else:
+                text_hash = next(iter(self._entries))
+            entry = self._entries.pop(text_hash)
+            self._bytes -= entry.size
+            self.evictions += 1
+            evicted.append(text_hash)
+            logger.debug(f'Evicted recording from TTS cache: {text_hash}')
+        self._deferred.update(evicted)
+        if self._deferred:
+            self._delete_unused()
+
+    def _delete_unused(self):
+        ''' Delete the files of evicted recordings that are no longer used, must be called with the lock held '''
+        in_use = self.in_use() if self.in_use else ()
+        recent = time.time() - self.hold
+        for text_hash in list(self._deferred):
+            if self._handed_out.get(text_hash, 0) >= recent or self.audio_file(text_hash) in in_use:
+                continue
+            self._deferred.discard(text_hash)
+            for path in (self.audio_file(text_hash), self.text_file(text_hash)):
+                try:
+                    os.remove(path)
+                except FileNotFoundError:
+                    pass
+
+    def stats(self):
+        ''' Get the cache counters.
+
+        Returns:
+            stats (dict): number of entries, bytes, hits, misses and evictions, evicted recordings whose
+                files are kept until they're no longer used, and if the index is loaded.
+        '''
+        with self._lock:
+            return {'loaded': self._loaded.is_set(),
+                    'entries': len(self._entries),
+                    'bytes': self._bytes,
+                    'hits': self.hits,
+                    'misses': self.misses,
+                    'evictions': self.evictions,
+                    'deferred': len(self._deferred)}
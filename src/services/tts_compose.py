@@ -0,0 +1,174 @@
+'''
+Created on Oct 18, 2026
+
+@author: x2012x
+'''
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+
+logger = logging.getLogger(__name__)
+
+# Layer III bitrates, in kbps, of MPEG-1 and of MPEG-2/2.5 frames, by bitrate index.
+_BITRATES = {True: (0, 32, 40, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320),
+             False: (0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160)}
+# Sample rates by MPEG version (3: MPEG-1, 2: MPEG-2, 0: MPEG-2.5) and sample rate index.
+_SAMPLE_RATES = {3: (44100, 48000, 32000), 2: (22050, 24000, 16000), 0: (11025, 12000, 8000)}
+
+
+def _frame(audio_content, offset):
+    ''' Parse the header of the MPEG Layer III frame at offset.
+
+    Returns:
+        (length, tag_offset): length of the frame and the offset of a Xing/Info header within it,
+            or None if there isn't a Layer III frame at offset.
+    '''
+    header = audio_content[offset:offset + 4]
+    if len(header) < 4 or header[0] != 0xFF or header[1] & 0xE0 != 0xE0:
+        return None
+    version, layer = (header[1] >> 3) & 3, (header[1] >> 1) & 3
+    bitrate_index, rate_index = header[2] >> 4, (header[2] >> 2) & 3
+    if version == 1 or layer != 1 or bitrate_index in (0, 15) or rate_index == 3:
+        return None
+    mpeg1 = version == 3
+    bitrate = _BITRATES[mpeg1][bitrate_index] * 1000
+    length = (144 if mpeg1 else 72) * bitrate // _SAMPLE_RATES[version][rate_index] + ((header[2] >> 1) & 1)
+    mono = header[3] >> 6 == 3
+    side_info = (17 if mono else 32) if mpeg1 else (9 if mono else 17)
+    # A CRC follows the header of protected frames.
+    crc = 0 if header[1] & 1 else 2
+    return length, 4 + crc + side_info
+
+
+def strip_mp3(audio_content):
+    ''' Strip the metadata of an MP3 recording, leaving only its audio frames.
+
+    Encoders commonly start a recording with an ID3v2 tag and a Xing/Info (or VBRI) frame, which describes
+    the stream and decodes as silence, and end it with an ID3v1 tag. Once recordings are joined, these are
+    in the middle of the stream, where players either skip over them or play a gap.
+
+    Arguments:
+        audio_content (bytes): MP3 recording.
+
+    Returns:
+        audio_content (bytes): audio frames of the recording.
+    '''
+    start, end = 0, len(audio_content)
+    if audio_content[:3] == b'ID3' and end >= 10:
+        # The tag size is a 28 bit syncsafe integer, which excludes the header and optional footer.
+        size = 0
+        for byte in audio_content[6:10]:
+            size = (size << 7) | (byte & 0x7F)
+        start = 10 + size + (10 if audio_content[5] & 0x10 else 0)
+    if end - start >= 128 and audio_content[end - 128:end - 125] == b'TAG':
+        end -= 128
+    frame = _frame(audio_content, start)
+    if frame:
+        length, tag_offset = frame
+        if (audio_content[start + tag_offset:start + tag_offset + 4] in (b'Xing', b'Info')
+                or audio_content[start + 36:start + 40] == b'VBRI'):
+            start += length
+    return audio_content[start:end]
+
+
+def join_recordings(recordings):
+    ''' Join MP3 recordings into a single recording. MP3 audio is a sequence of independent frames, so the
+    frames of each recording are simply concatenated, once their metadata is stripped.
+
+    Arguments:
+        recordings ([bytes]): MP3 recordings, in the order played.
+
+    Returns:
+        audio_content (bytes): joined recording.
+    '''
+    return b''.join(strip_mp3(audio_content) for audio_content in recordings)
+
+
+class ComposedRecordings(object):
+    ''' Temporary files of recordings composed by the TTS service.
+
+    Most composed phrases, such as the current time, are only spoken once, so they are played from a
+    temporary file instead of being cached. The hashes of the most recent compositions are remembered, so
+    the service can cache compositions that are spoken again. Like the files of the TTS cache, a temporary
+    file isn't removed while it may still be played, because it was written within the last hold seconds
+    or it's in use.
+
+    Arguments:
+        directory (str): path to the directory the temporary files are written to.
+        in_use (callable): returns the paths of the recordings that are queued or being played.
+        hold (float): seconds after it's written that a temporary file isn't removed.
+        remembered (int): number of recent compositions remembered to detect reuse.
+    '''
+    def __init__(self, directory, in_use = None, hold = 60, remembered = 256):
+        self.directory = directory
+        self.in_use = in_use
+        self.hold = hold
+        self.remembered = remembered
+        self._lock = threading.Lock()
+        # Hashes of the recent compositions, oldest first.
+        self._recent = OrderedDict()
+        # Paths of the temporary files and the time they were written, oldest first.
+        self._files = OrderedDict()
+        Path(directory).mkdir(parents=True, exist_ok=True)
+        # Files left by a previous run are no longer played.
+        for item in os.scandir(directory):
+            if item.is_file():
+                self._remove(item.path)
+
+    def reused(self, composed_hash):
+        ''' Remember a composition, determining if it was recently composed before.
+
+        Returns:
+            reused (bool): True if the composition is one of the recent compositions.
+        '''
+        with self._lock:
+            reused = composed_hash in self._recent
+            self._recent[composed_hash] = True
+            self._recent.move_to_end(composed_hash)
+            while len(self._recent) > self.remembered:
+                self._recent.popitem(last=False)
+            return reused
+
+    def write(self, composed_hash, audio_content):
+        ''' Write a composed recording to a temporary file, removing the earlier files that are no longer used.
+
+        Returns:
+            audio_file (str): path to the temporary file.
+        '''
+        audio_file = os.path.join(self.directory, f'{composed_hash}.mp3')
+        temp_path = f'{audio_file}.{threading.get_ident()}.tmp'
+        with open(temp_path, 'wb') as out:
+            out.write(audio_content)
+        os.replace(temp_path, audio_file)
+        with self._lock:
+            self._remove_unused()
+            self._files[audio_file] = time.time()
+            self._files.move_to_end(audio_file)
+        return audio_file
+
+    def _remove_unused(self):
+        ''' Remove the temporary files written more than hold seconds ago, unless they're in use '''
+        recent = time.time() - self.hold
+        in_use = None
+        for audio_file, written in list(self._files.items()):
+            if written >= recent:
+                break
+            if in_use is None:
+                in_use = self.in_use() if self.in_use else ()
+            if audio_file not in in_use:
+                del self._files[audio_file]
+                self._remove(audio_file)
+
+    def _remove(self, path):
+        try:
+            os.remove(path)
+        except OSError as e:
+            logger.warning(f'Failed to remove composed recording {path}: {e}')
+
+    def stats(self):
+        ''' Get the number of temporary files and remembered compositions '''
+        with self._lock:
+            return {'files': len(self._files), 'remembered': len(self._recent)}
@@ -0,0 +1,629 @@
+'''
+Created on Oct 18, 2026
+
+@author: x2012x
+'''
+import logging
+import mmap
+import os
+import struct
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from services.tts_cache import LRU, LFU
+
+logger = logging.getLogger(__name__)
+
+# Index header: magic, slot capacity, live entries, deleted slots, live bytes, dead bytes, active segment and
+# the end of the data written to the active segment.
+INDEX_MAGIC = b'TTSIDX01'
+_HEADER = struct.Struct('<8sQQQQQQQ')
+# Index slot: SHA256 digest, state, segment, record offset, audio length, text length, hits and last used time.
+_SLOT = struct.Struct('<32sB3xIIIIId')
+# Record header: magic, SHA256 digest, audio length and text length. The audio and text follow the header.
+RECORD_MAGIC = b'TTSR'
+_RECORD = struct.Struct('<4s32sII')
+
+# Slot states
+EMPTY = 0
+LIVE = 1
+DELETED = 2
+
+# Number of slots in a new index, the index is doubled once it is 70% full.
+INITIAL_CAPACITY = 1024
+
+
+class PackedTTSCache(object):
+    ''' TTS recordings cache packed into append-only segment files with a memory-mapped hash index.
+
+    Each recording is appended to the active segment file as a single record, holding the audio and its
+    transcription. 'index' is an open addressing hash table, keyed by the SHA256 of the spoken text, which
+    locates each record. It is memory-mapped, so lookups read it in place rather than loading it at startup.
+    Evicted or replaced records are left in their segment as dead space, which is reclaimed by compaction
+    once it outweighs the live records.
+
+    Recordings are played from files, so recordings are extracted into a 'playback' directory when looked up,
+    which holds the most recently used recordings, up to playback_files. Like the files of TTSCache, a
+    playback file isn't removed while it may still be played, because its path was handed out within the
+    last hold seconds or it's in use.
+
+    Arguments:
+        directory (str): path to the cache directory.
+        max_bytes (int): max total size of the cached records, 0 for no limit.
+        max_entries (int): max number of cached recordings, 0 for no limit.
+        policy (str): eviction policy, 'lru' or 'lfu'.
+        segment_size (int): size, in bytes, at which a new segment file is started.
+        playback_files (int): max number of recordings extracted for playback, excluding those still used.
+        in_use (callable): returns the paths of the recordings that are queued or being played.
+        hold (float): seconds after its path is handed out that a playback file isn't removed.
+    '''
+    def __init__(self, directory, max_bytes = 0, max_entries = 0, policy = LRU,
+                 segment_size = 16777216, playback_files = 64, in_use = None, hold = 60):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.max_entries = max_entries
+        self.policy = policy
+        self.segment_size = segment_size
+        self.playback_files = playback_files
+        self.in_use = in_use
+        self.hold = hold
+        self._playback_directory = os.path.join(directory, 'playback')
+        Path(self._playback_directory).mkdir(parents=True, exist_ok=True)
+        self._index_path = os.path.join(directory, 'index')
+        self._lock = threading.RLock()
+        self._loaded = threading.Event()
+        self._compacting = False
+        # Open file descriptors of the segment files, by segment number.
+        self._segments = {}
+        # Recordings extracted for playback, ordered from least to most recently used.
+        self._playback = OrderedDict()
+        # Map of hash to the time its playback file was last handed out, ordered from least to most recent.
+        self._handed_out = OrderedDict()
+        # Hashes of playback files of deleted or replaced records, removed once they are no longer used.
+        self._deferred = set()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.compactions = 0
+        self._rebuild = not self._open_index()
+
+    def load(self, wait = False):
+        ''' Recover the cache on a background thread, rebuilding the index from the segments if it's missing.
+
+        Arguments:
+            wait (bool): True to recover the cache on the calling thread instead.
+        '''
+        if wait:
+            self._load()
+        else:
+            threading.Thread(target=self._load, name='TTSCacheLoader', daemon=True).start()
+
+    def _load(self):
+        with self._lock:
+            # Playback files are only kept for the life of the process, keep any extracted since it started.
+            extracted = set(self._playback.values())
+            for item in os.scandir(self._playback_directory):
+                if item.path not in extracted:
+                    os.remove(item.path)
+            if self._rebuild:
+                self._rebuild_index()
+            else:
+                # Discard any record appended after the index was last updated.
+                segment, tail = self._header[6], self._header[7]
+                path = self._segment_path(segment)
+                if os.path.exists(path) and os.path.getsize(path) > tail:
+                    logger.warning(f'Truncating incomplete record from TTS cache segment {path}')
+                    os.truncate(path, tail)
+            self._loaded.set()
+            self._evict()
+        logger.info(f'Loaded TTS cache index: {self._header[2]} recordings, {self._header[4]} bytes')
+        self._compact_if_needed()
+
+    # Index
+
+    def _open_index(self):
+        ''' Map the index file, creating an empty index if it doesn't exist.
+
+        Returns:
+            valid (bool): False if the index had to be created.
+        '''
+        valid = False
+        if os.path.exists(self._index_path):
+            with open(self._index_path, 'rb') as index:
+                header = index.read(_HEADER.size)
+            valid = len(header) == _HEADER.size and header[:8] == INDEX_MAGIC
+            if not valid:
+                logger.error(f'Invalid TTS cache index, it will be rebuilt: {self._index_path}')
+        if not valid:
+            self._write_index(INITIAL_CAPACITY, [], (0, 0, 0, 1, 0))
+        self._map_index()
+        return valid
+
+    def _write_index(self, capacity, slots, totals):
+        ''' Write a new index file and rename it into place.
+
+        Arguments:
+            capacity (int): number of slots in the index.
+            slots ([tuple]): live slots to insert in the index.
+            totals ((int, int, int, int, int)): live bytes, dead bytes, deleted slots, active segment and tail.
+        '''
+        table = bytearray(_HEADER.size + capacity * _SLOT.size)
+        mask = capacity - 1
+        for slot in slots:
+            position = int.from_bytes(slot[0][:8], 'little') & mask
+            while table[_HEADER.size + position * _SLOT.size + 32] != EMPTY:
+                position = (position + 1) & mask
+            _SLOT.pack_into(table, _HEADER.size + position * _SLOT.size, *slot)
+        live_bytes, dead_bytes, deleted, segment, tail = totals
+        _HEADER.pack_into(table, 0, INDEX_MAGIC, capacity, len(slots), deleted, live_bytes, dead_bytes, segment, tail)
+        fd, temp_path = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as out:
+                out.write(table)
+            os.replace(temp_path, self._index_path)
+        except BaseException:
+            os.remove(temp_path)
+            raise
+
+    def _map_index(self):
+        with open(self._index_path, 'r+b') as index:
+            self._index = mmap.mmap(index.fileno(), 0)
+        self._header = list(_HEADER.unpack_from(self._index, 0))
+        self._capacity = self._header[1]
+
+    def _save_header(self):
+        _HEADER.pack_into(self._index, 0, *self._header)
+
+    def _find(self, digest):
+        ''' Probe the index for digest.
+
+        Returns:
+            (found, free): offset of the digest's slot, None if it isn't indexed, and the offset of
+                the first slot it could be inserted at.
+        '''
+        index = self._index
+        mask = self._capacity - 1
+        position = int.from_bytes(digest[:8], 'little') & mask
+        free = None
+        while True:
+            offset = _HEADER.size + position * _SLOT.size
+            state = index[offset + 32]
+            if state == EMPTY:
+                return None, offset if free is None else free
+            if state == LIVE and index[offset:offset + 32] == digest:
+                return offset, offset
+            if state == DELETED and free is None:
+                free = offset
+            position = (position + 1) & mask
+
+    def _live_slots(self):
+        ''' Get the (offset, slot) of every live slot in the index '''
+        slots = []
+        for position in range(self._capacity):
+            offset = _HEADER.size + position * _SLOT.size
+            if self._index[offset + 32] == LIVE:
+                slots.append((offset, _SLOT.unpack_from(self._index, offset)))
+        return slots
+
+    def _rehash(self, capacity):
+        ''' Rewrite the index with the supplied capacity, dropping deleted slots '''
+        slots = [slot for _, slot in self._live_slots()]
+        header = self._header
+        self._index.close()
+        self._write_index(capacity, slots, (header[4], header[5], 0, header[6], header[7]))
+        self._map_index()
+
+    def _rebuild_index(self):
+        ''' Rebuild the index by reading the records of every segment, in the order they were written '''
+        logger.info(f'Rebuilding TTS cache index from segments in {self.directory}')
+        numbers = sorted(int(name[:-4]) for name in os.listdir(self.directory) if name.endswith('.seg'))
+        records = {}
+        dead_bytes = 0
+        tail = 0
+        for number in numbers:
+            tail = 0
+            with open(self._segment_path(number), 'rb') as segment:
+                while True:
+                    header = segment.read(_RECORD.size)
+                    if len(header) < _RECORD.size:
+                        break
+                    magic, digest, audio_length, text_length = _RECORD.unpack(header)
+                    length = _RECORD.size + audio_length + text_length
+                    if magic != RECORD_MAGIC or len(segment.read(audio_length + text_length)) < audio_length + text_length:
+                        break
+                    if digest in records:
+                        dead_bytes += _RECORD.size + records[digest][4] + records[digest][5]
+                    records[digest] = (digest, LIVE, number, tail, audio_length, text_length, 0, time.time())
+                    tail += length
+            # Discard any incomplete record at the end of the segment.
+            os.truncate(self._segment_path(number), tail)
+        live_bytes = sum(_RECORD.size + r[4] + r[5] for r in records.values())
+        capacity = INITIAL_CAPACITY
+        while len(records) * 10 >= capacity * 7:
+            capacity *= 2
+        self._index.close()
+        self._write_index(capacity, list(records.values()),
+                          (live_bytes, dead_bytes, 0, numbers[-1] if numbers else 1, tail))
+        self._map_index()
+
+    # Segments
+
+    def _segment_path(self, number):
+        return os.path.join(self.directory, f'{number:06d}.seg')
+
+    def _segment(self, number):
+        ''' Get the file descriptor of a segment, opening it if required '''
+        fd = self._segments.get(number)
+        if fd is None:
+            fd = self._segments[number] = os.open(self._segment_path(number), os.O_RDWR | os.O_CREAT, 0o644)
+        return fd
+
+    def _append(self, digest, audio_content, text):
+        ''' Append a record to the active segment, starting a new segment if it is full.
+
+        Returns:
+            (segment, offset): location of the record.
+        '''
+        record = _RECORD.pack(RECORD_MAGIC, digest, len(audio_content), len(text)) + audio_content + text
+        segment, tail = self._header[6], self._header[7]
+        if tail and tail + len(record) > self.segment_size:
+            segment, tail = segment + 1, 0
+        os.pwrite(self._segment(segment), record, tail)
+        self._header[6], self._header[7] = segment, tail + len(record)
+        return segment, tail
+
+    def _read(self, offset):
+        ''' Read the record of the indexed slot at offset.
+
+        Returns:
+            (audio_content, text): the recorded audio and its transcription, None if the record
+                is damaged, in which case it is removed from the index.
+        '''
+        slot = _SLOT.unpack_from(self._index, offset)
+        digest, _, segment, position, audio_length, text_length, _, _ = slot
+        record = os.pread(self._segment(segment), _RECORD.size + audio_length + text_length, position)
+        if record[:_RECORD.size] != _RECORD.pack(RECORD_MAGIC, digest, audio_length, text_length):
+            logger.error(f'Damaged record in TTS cache, removing it: {digest.hex()}')
+            self._delete(offset, slot)
+            self._save_header()
+            return None
+        return record[_RECORD.size:_RECORD.size + audio_length], record[_RECORD.size + audio_length:]
+
+    def _delete(self, offset, slot):
+        ''' Mark the slot at offset deleted, leaving its record as dead space '''
+        header = self._header
+        length = _RECORD.size + slot[4] + slot[5]
+        self._index[offset + 32] = DELETED
+        header[2] -= 1
+        header[3] += 1
+        header[4] -= length
+        header[5] += length
+        self._remove_playback(slot[0].hex())
+
+    # Playback files
+
+    def _playback_file(self, text_hash, offset):
+        ''' Get the path of the playback file of a recording, extracting it from its segment if required '''
+        if text_hash in self._playback:
+            self._playback.move_to_end(text_hash)
+            return self._hand_out(text_hash)
+        record = self._read(offset)
+        return self._write_playback(text_hash, record[0]) if record else None
+
+    def _playback_path(self, text_hash):
+        return os.path.join(self._playback_directory, f'{text_hash}.mp3')
+
+    def _hand_out(self, text_hash):
+        ''' Get the path of a playback file that is handed out '''
+        now = time.time()
+        self._handed_out[text_hash] = now
+        self._handed_out.move_to_end(text_hash)
+        while next(iter(self._handed_out.values())) < now - self.hold:
+            self._handed_out.popitem(last=False)
+        return self._playback_path(text_hash)
+
+    def _write_playback(self, text_hash, audio_content):
+        ''' Write a playback file, removing the least recently used playback files beyond the limit '''
+        # Playback files are only written with the lock held, so the temporary file can't be in use.
+        temp_path = self._playback_path(text_hash) + '.tmp'
+        with open(temp_path, 'wb') as out:
+            out.write(audio_content)
+        os.replace(temp_path, self._playback_path(text_hash))
+        self._deferred.discard(text_hash)
+        self._playback[text_hash] = self._playback_path(text_hash)
+        audio_file = self._hand_out(text_hash)
+        self._trim_playback()
+        return audio_file
+
+    def _remove_playback(self, text_hash):
+        if self._playback.pop(text_hash, None):
+            self._deferred.add(text_hash)
+            self._trim_playback()
+
+    def _trim_playback(self):
+        ''' Remove the playback files beyond the limit that are no longer used, those of deleted records
+        first, then the least recently used. Only as many files as are over the limit are examined, apart
+        from those in use. '''
+        excess = len(self._playback) + len(self._deferred) - self.playback_files
+        if excess <= 0:
+            return
+        in_use = self.in_use() if self.in_use else ()
+        recent = time.time() - self.hold
+        used = lambda h: self._handed_out.get(h, 0) >= recent or self._playback_path(h) in in_use
+        expired = [h for h in self._deferred if not used(h)][:excess]
+        for text_hash in expired:
+            self._deferred.discard(text_hash)
+            self._remove(self._playback_path(text_hash))
+        excess -= len(expired)
+        # Playback files are ordered by when they were handed out, so once a file handed out within hold
+        # seconds is reached, so are all of the files after it.
+        expired = []
+        for text_hash in self._playback:
+            if len(expired) >= excess or self._handed_out.get(text_hash, 0) >= recent:
+                break
+            if self._playback_path(text_hash) not in in_use:
+                expired.append(text_hash)
+        for text_hash in expired:
+            self._remove(self._playback.pop(text_hash))
+
+    def _remove(self, path):
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+
+    # Cache operations
+
+    def contains(self, text_hash):
+        ''' Determine if a recording is cached, without recording the use of it '''
+        with self._lock:
+            return self._find(bytes.fromhex(text_hash))[0] is not None
+
+    def lookup(self, text_hash):
+        ''' Look up a cached recording.
+
+        Arguments:
+            text_hash (str): SHA256 of the recording's text.
+
+        Returns:
+            audio_file (str): path to the playback file of the recording, None if it isn't cached.
+        '''
+        with self._lock:
+            offset, _ = self._find(bytes.fromhex(text_hash))
+            audio_file = self._playback_file(text_hash, offset) if offset is not None else None
+            self._use(offset if audio_file else None)
+            return audio_file
+
+    def read(self, text_hash):
+        ''' Read a cached recording, without extracting it for playback.
+
+        Arguments:
+            text_hash (str): SHA256 of the recording's text.
+
+        Returns:
+            audio_content (bytes): the recorded audio, None if it isn't cached.
+        '''
+        with self._lock:
+            offset, _ = self._find(bytes.fromhex(text_hash))
+            record = self._read(offset) if offset is not None else None
+            self._use(offset if record else None)
+            return record[0] if record else None
+
+    def _use(self, offset):
+        ''' Record the use of the recording in the slot at offset, or a miss if offset is None '''
+        if offset is None:
+            self.misses += 1
+            return
+        self.hits += 1
+        slot = _SLOT.unpack_from(self._index, offset)
+        _SLOT.pack_into(self._index, offset, *slot[:6], slot[6] + 1, time.time())
+
+    def peek(self, text_hash):
+        ''' Look up a cached recording without recording the use of it.
+
+        Arguments:
+            text_hash (str): SHA256 of the recording's text.
+
+        Returns:
+            audio_file (str): path to the playback file of the recording, None if it isn't indexed.
+        '''
+        with self._lock:
+            offset, _ = self._find(bytes.fromhex(text_hash))
+            return self._playback_file(text_hash, offset) if offset is not None else None
+
+    def transcription(self, text_hash):
+        ''' Get the text of a cached recording, None if it isn't cached '''
+        with self._lock:
+            offset, _ = self._find(bytes.fromhex(text_hash))
+            record = self._read(offset) if offset is not None else None
+            return record[1].decode('utf_8') if record else None
+
+    def put(self, text_hash, text_content, audio_content, last_used = None):
+        ''' Store a recording without extracting it for playback.
+
+        Arguments:
+            text_hash (str): SHA256 of the recording's text.
+            text_content (str): text of the recording.
+            audio_content (bytes): recorded audio.
+            last_used (float): time the recording was last used, defaults to now.
+        '''
+        digest = bytes.fromhex(text_hash)
+        text = text_content.encode('utf_8')
+        with self._lock:
+            header = self._header
+            # Grow the index before it gets crowded, so probes stay short.
+            if (header[2] + header[3] + 1) * 10 >= self._capacity * 7:
+                self._rehash(self._capacity * 2 if header[2] * 10 >= self._capacity * 5 else self._capacity)
+                header = self._header
+            segment, offset = self._append(digest, audio_content, text)
+            found, free = self._find(digest)
+            if found is not None:
+                previous = _SLOT.unpack_from(self._index, found)
+                header[4] -= _RECORD.size + previous[4] + previous[5]
+                header[5] += _RECORD.size + previous[4] + previous[5]
+                header[2] -= 1
+                self._remove_playback(text_hash)
+            elif self._index[free + 32] == DELETED:
+                header[3] -= 1
+            _SLOT.pack_into(self._index, free, digest, LIVE, segment, offset, len(audio_content), len(text),
+                            0, time.time() if last_used is None else last_used)
+            header[2] += 1
+            header[4] += _RECORD.size + len(audio_content) + len(text)
+            self._save_header()
+            self._evict()
+        self._compact_if_needed()
+
+    def store(self, text_hash, text_content, audio_content):
+        ''' Store a new recording in the cache. It's extracted for playback once it's looked up.
+
+        Arguments:
+            text_hash (str): SHA256 of the recording's text.
+            text_content (str): text of the recording.
+            audio_content (bytes): recorded audio.
+        '''
+        self.put(text_hash, text_content, audio_content)
+        logger.debug(f'Stored new recording in TTS cache: {text_hash}')
+
+    def _over_budget(self, slack = 1.0):
+        return ((self.max_bytes and self._header[4] > self.max_bytes * slack) or
+                (self.max_entries and self._header[2] > self.max_entries * slack))
+
+    def _evict(self):
+        ''' Evict recordings until the cache is within budget, must be called with the lock held.
+
+        Finding the recordings to evict requires a scan of the index, so the cache is reduced to 90%
+        of its budgets to make room for a batch of new recordings.
+        '''
+        if not self._loaded.is_set() or not self._over_budget():
+            return
+        slots = self._live_slots()
+        if self.policy == LFU:
+            slots.sort(key=lambda s: (s[1][6], s[1][7]))
+        else:
+            slots.sort(key=lambda s: s[1][7])
+        for offset, slot in slots[:-1]:
+            if not self._over_budget(0.9):
+                break
+            self._delete(offset, slot)
+            self.evictions += 1
+        self._save_header()
+        logger.debug(f'Evicted recordings from TTS cache, {self._header[2]} recordings remain')
+
+    # Compaction
+
+    def _compact_if_needed(self):
+        ''' Compact the segments in the background once dead records outweigh the live records '''
+        with self._lock:
+            if (self._compacting or self._header[5] < self.segment_size or
+                    self._header[5] < self._header[4]):
+                return
+            self._compacting = True
+        threading.Thread(target=self.compact, name='TTSCacheCompactor', daemon=True).start()
+
+    def compact(self):
+        ''' Copy the live records into new segments and remove the old segments, reclaiming dead space.
+
+        The records are copied without holding the lock, so lookups and stores aren't blocked. New records
+        are appended to a segment following the new segments while copying, and records evicted or replaced
+        while copying are left out of the new index.
+        '''
+        try:
+            start = time.perf_counter()
+            with self._lock:
+                header = self._header
+                reclaimed = header[5]
+                active = header[6]
+                old_segments = sorted(number for number in set(self._segments) |
+                                      {int(name[:-4]) for name in os.listdir(self.directory) if name.endswith('.seg')}
+                                      if number <= active)
+                # Lay out the live records in new segments following the active segment.
+                segment, tail = active + 1, 0
+                copies = []
+                for _, slot in sorted(self._live_slots(), key=lambda s: (s[1][2], s[1][3])):
+                    length = _RECORD.size + slot[4] + slot[5]
+                    if tail and tail + length > self.segment_size:
+                        segment, tail = segment + 1, 0
+                    copies.append((slot, segment, tail))
+                    tail += length
+                # Append new records to a segment following the new segments.
+                appended = segment + 1
+                header[6], header[7] = appended, 0
+                self._save_header()
+            copied = self._copy(copies)
+            with self._lock:
+                # Move the records that are still live at the location they were copied from.
+                moved = {slot[0]: (slot[2], slot[3], segment, offset) for slot, segment, offset in copies}
+                slots = []
+                for _, slot in self._live_slots():
+                    location = moved.get(slot[0])
+                    if location and location[:2] == slot[2:4]:
+                        slot = (slot[0], LIVE) + location[2:] + slot[4:]
+                    slots.append(slot)
+                header = self._header
+                # Records evicted or replaced while copying are dead space in the new segments.
+                written = copied + header[7] + sum(os.path.getsize(self._segment_path(number))
+                                                   for number in range(appended, header[6]))
+                capacity = self._capacity
+                while len(slots) * 10 >= capacity * 5:
+                    capacity *= 2
+                self._index.close()
+                self._write_index(capacity, slots, (header[4], written - header[4], 0, header[6], header[7]))
+                self._map_index()
+                for number in old_segments:
+                    fd = self._segments.pop(number, None)
+                    if fd is not None:
+                        os.close(fd)
+                    self._remove(self._segment_path(number))
+                self.compactions += 1
+            logger.info(f'Compacted TTS cache, reclaimed {reclaimed} bytes in {time.perf_counter() - start:.2f}s')
+        finally:
+            self._compacting = False
+
+    def _copy(self, copies):
+        ''' Copy records to the new segments laid out by compact.
+
+        Arguments:
+            copies ([(tuple, int, int)]): slot of each record, with the segment and offset to copy it to.
+
+        Returns:
+            copied (int): number of bytes copied.
+        '''
+        sources = {}
+        targets = {}
+        copied = 0
+        try:
+            for slot, segment, offset in copies:
+                if slot[2] not in sources:
+                    sources[slot[2]] = os.open(self._segment_path(slot[2]), os.O_RDONLY)
+                if segment not in targets:
+                    targets[segment] = os.open(self._segment_path(segment), os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+                length = _RECORD.size + slot[4] + slot[5]
+                os.pwrite(targets[segment], os.pread(sources[slot[2]], length, slot[3]), offset)
+                copied += length
+            for fd in targets.values():
+                os.fsync(fd)
+        finally:
+            for fd in list(sources.values()) + list(targets.values()):
+                os.close(fd)
+        return copied
+
+    def stats(self):
+        ''' Get the cache counters.
+
+        Returns:
+            stats (dict): number of entries, bytes, hits, misses and evictions, if the index is loaded,
+                and the number of segments, dead bytes and compactions.
+        '''
+        with self._lock:
+            header = self._header
+            return {'loaded': self._loaded.is_set(),
+                    'entries': header[2],
+                    'bytes': header[4],
+                    'hits': self.hits,
+                    'misses': self.misses,
+                    'evictions': self.evictions,
+                    'segments': sum(1 for name in os.listdir(self.directory) if name.endswith('.seg')),
+                    'dead_bytes': header[5],
+                    'compactions': self.compactions}
@@ -0,0 +1,117 @@
+'''
+Created on Oct 18, 2026
+
+@author: x2012x
+'''
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from errors.exceptions import SpeakableException
+
+logger = logging.getLogger(__name__)
+
+
+class Prewarmer(object):
+    ''' Synthesizes phrases that are known ahead of time into the TTS cache, in the background.
+    
+    Phrases that are already cached are skipped. Synthesis calls are spread across a small pool of 
+    workers and rate limited, so pre-warming doesn't flood the TTS API or starve requests. Synthesis 
+    calls are made through the pre-warmer's own circuit breaker, so its failures don't open the circuit 
+    used by requests, and phrases are skipped while the requests' circuit is open.
+    
+    Arguments:
+        service (TextToSpeechService): reference to the TTS service used to synthesize phrases.
+        workers (int): number of phrases synthesized concurrently.
+        rate (float): max number of synthesis calls per second, across all workers.
+        breaker (CircuitBreaker): circuit breaker pre-warming synthesis calls are made through.
+    '''
+    def __init__(self, service, workers = 2, rate = 2.0, breaker = None):
+        self._service = service
+        self._breaker = breaker
+        self._workers = workers
+        self._interval = 1.0 / rate if rate else 0
+        self._lock = threading.Lock()
+        self._next_call = 0
+        self._stopped = False
+        self.running = False
+        self.total = 0
+        self.cached = 0
+        self.synthesized = 0
+        self.failed = 0
+        self.skipped = 0
+        
+    def start(self, phrases, delay = 0):
+        ''' Start pre-warming the supplied phrases.
+        
+        Arguments:
+            phrases ([str]): phrases to synthesize, duplicates and empty phrases are ignored.
+            delay (float): seconds to wait before starting, so startup isn't slowed down.
+        '''
+        if self.running:
+            logger.warning('Pre-warming is already running')
+            return
+        phrases = list(dict.fromkeys(p for p in phrases if p))
+        self.total = len(phrases)
+        self.running = True
+        timer = threading.Timer(delay, self._run, args=(phrases,))
+        timer.daemon = True
+        timer.start()
+        
+    def stop(self):
+        ''' Stop pre-warming, phrases already being synthesized will be finished '''
+        self._stopped = True
+        
+    def _run(self, phrases):
+        logger.info(f'Pre-warming TTS cache with {len(phrases)} phrases')
+        with ThreadPoolExecutor(max_workers=self._workers, thread_name_prefix='Prewarmer') as pool:
+            pool.map(self._warm, phrases)
+        self.running = False
+        logger.info(f'Pre-warming finished: {self.progress()}')
+        
+    def _warm(self, phrase):
+        if self._stopped:
+            return
+        if self._service.is_cached(phrase):
+            with self._lock:
+                self.cached += 1
+            return
+        self._throttle()
+        if not self._service.synthesis_available():
+            logger.debug(f'Skipping pre-warm of phrase while the TTS circuit is open: {phrase}')
+            with self._lock:
+                self.skipped += 1
+            return
+        try:
+            self._service.record(phrase, self._breaker)
+            with self._lock:
+                self.synthesized += 1
+        except SpeakableException:
+            logger.error(f'Failed to pre-warm phrase: {phrase}')
+            with self._lock:
+                self.failed += 1
+                
+    def _throttle(self):
+        ''' Wait until the next synthesis call is allowed by the rate limit '''
+        with self._lock:
+            now = time.monotonic()
+            wait = self._next_call - now
+            self._next_call = max(now, self._next_call) + self._interval
+        if wait > 0:
+            time.sleep(wait)
+            
+    def progress(self):
+        ''' Get the pre-warming progress.
+        
+        Returns:
+            progress (dict): total number of phrases, how many were already cached, synthesized, failed 
+                or skipped while the circuit was open and if pre-warming is still running.
+        '''
+        with self._lock:
+            return {'running': self.running,
+                    'total': self.total,
+                    'cached': self.cached,
+                    'synthesized': self.synthesized,
+                    'failed': self.failed,
+                    'skipped': self.skipped,
+                    'remaining': self.total - self.cached - self.synthesized - self.failed - self.skipped}
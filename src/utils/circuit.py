@@ -0,0 +1,79 @@
+'''
+Created on Oct 18, 2026
+
+@author: x2012x
+'''
+import logging
+import threading
+import time
+from errors.exceptions import CircuitOpen
+
+logger = logging.getLogger(__name__)
+
+# Circuit states
+CLOSED = 'closed'
+OPEN = 'open'
+HALF_OPEN = 'half_open'
+
+
+class CircuitBreaker(object):
+    ''' Fails calls to a dependency fast once it has failed repeatedly.
+    
+    The circuit opens after failure_threshold consecutive failed calls, after which calls are rejected 
+    with CircuitOpen without being attempted. Once reset_timeout has passed, a single trial call is 
+    allowed through: if it succeeds the circuit closes, otherwise it opens again.
+    
+    Arguments:
+        name (str): name of the protected dependency, used for logging.
+        failure_threshold (int): number of consecutive failures that open the circuit.
+        reset_timeout (float): seconds the circuit stays open before a trial call is allowed.
+    '''
+    def __init__(self, name, failure_threshold = 3, reset_timeout = 30):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = CLOSED
+        self._lock = threading.Lock()
+        self._failures = 0
+        self._opened_at = 0
+        self.rejected = 0
+        
+    def call(self, fn, *args, **kwargs):
+        ''' Call fn(*args, **kwargs), unless the circuit is open.
+        
+        Returns:
+            result: the result of the call.
+        '''
+        with self._lock:
+            if self.state == OPEN and time.monotonic() - self._opened_at >= self.reset_timeout:
+                self.state = HALF_OPEN
+                trial = True
+            elif self.state == CLOSED:
+                trial = False
+            else:
+                self.rejected += 1
+                raise CircuitOpen(f'Circuit open: {self.name}')
+        try:
+            result = fn(*args, **kwargs)
+        except Exception:
+            self._record_failure(trial)
+            raise
+        with self._lock:
+            self._failures = 0
+            if trial:
+                logger.info(f'Circuit closed: {self.name}')
+                self.state = CLOSED
+        return result
+    
+    def _record_failure(self, trial):
+        with self._lock:
+            self._failures += 1
+            if trial or self._failures >= self.failure_threshold:
+                if self.state != OPEN:
+                    logger.error(f'Circuit opened after {self._failures} failures: {self.name}')
+                self.state = OPEN
+                self._opened_at = time.monotonic()
+                
+    def stats(self):
+        ''' Get the state of the circuit and the number of calls it has rejected '''
+        return {'state': self.state, 'rejected': self.rejected}
@@ -12,3 +12,18 @@ __protected_config = 'resources/config/protected.yaml'
 
 if os.path.exists(__protected_config):
     config.update(yaml.safe_load(open(__protected_config)))
+
+
+def setting(*keys, default=None):
+    ''' Get an application setting by key path, falling back on default if it isn't configured.
+
+    Arguments:
+        keys (str): path of keys beneath the 'application' section (e.g. 'Server', 'engine').
+        default: value to return if any key along the path is missing.
+    '''
+    value = config.get('application')
+    for key in keys:
+        if not isinstance(value, dict) or key not in value:
+            return default
+        value = value[key]
+    return value
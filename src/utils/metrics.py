@@ -0,0 +1,108 @@
+'''
+Created on Oct 18, 2026
+
+@author: x2012x
+'''
+import threading
+from bisect import bisect_left
+
+# Requests dispatched to handlers, labeled by handler, action (or intent) and outcome.
+REQUESTS = 'conductor_requests_total'
+# Seconds to dispatch a request ('dispatch', including response processing and speech) and run the
+# handler's logic ('handler'), labeled by handler, action (or intent) and stage.
+REQUEST_SECONDS = 'conductor_request_seconds'
+# Seconds spent in the stages of speaking a response: 'cache_lookup', 'synthesis' and 'audio_enqueue'.
+STAGE_SECONDS = 'conductor_stage_seconds'
+
+HELP = {REQUESTS: ('counter', 'Requests dispatched to handlers.'),
+        REQUEST_SECONDS: ('histogram', 'Seconds to dispatch requests and run handler logic.'),
+        STAGE_SECONDS: ('histogram', 'Seconds spent looking up, synthesizing and enqueuing speech.')}
+
+# Upper bounds, in seconds, of the latency histogram buckets.
+BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class Histogram(object):
+    ''' Latency histogram with fixed buckets, guarded by the Metrics lock '''
+    __slots__ = ('counts', 'sum')
+
+    def __init__(self):
+        # Observations per bucket, the last bucket holds those above the largest bound.
+        self.counts = [0] * (len(BUCKETS) + 1)
+        self.sum = 0.0
+
+
+class Metrics(object):
+    ''' Counters and latency histograms, rendered in the Prometheus text format.
+
+    Series are identified by a metric name and a tuple of (label, value) pairs. Recording a value
+    only takes a lock and a bucket search, so requests can be instrumented on the hot path.
+    '''
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counters = {}
+        self._histograms = {}
+
+    def count(self, name, labels, amount = 1):
+        ''' Increase a counter.
+
+        Arguments:
+            name (str): metric name.
+            labels (tuple): (label, value) pairs identifying the series.
+            amount (int): amount to increase the counter by.
+        '''
+        key = (name, labels)
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + amount
+
+    def observe(self, name, labels, seconds):
+        ''' Record a latency in a histogram.
+
+        Arguments:
+            name (str): metric name.
+            labels (tuple): (label, value) pairs identifying the series.
+            seconds (float): latency to record.
+        '''
+        key = (name, labels)
+        bucket = bisect_left(BUCKETS, seconds)
+        with self._lock:
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                histogram = self._histograms[key] = Histogram()
+            histogram.counts[bucket] += 1
+            histogram.sum += seconds
+
+    def render(self):
+        ''' Render every series in the Prometheus text exposition format '''
+        with self._lock:
+            counters = dict(self._counters)
+            histograms = {key: (list(h.counts), h.sum) for key, h in self._histograms.items()}
+        series = {}
+        for (name, labels), value in counters.items():
+            series.setdefault(name, []).append(f'{name}{_labels(labels)} {value}')
+        for (name, labels), (counts, total) in histograms.items():
+            lines = series.setdefault(name, [])
+            cumulative = 0
+            for bound, count in zip(BUCKETS + ('+Inf',), counts):
+                cumulative += count
+                lines.append(f'{name}_bucket{_labels(labels + (("le", str(bound)),))} {cumulative}')
+            lines.append(f'{name}_sum{_labels(labels)} {total}')
+            lines.append(f'{name}_count{_labels(labels)} {cumulative}')
+        output = []
+        for name in sorted(series):
+            kind, description = HELP.get(name, ('untyped', name))
+            output.append(f'# HELP {name} {description}')
+            output.append(f'# TYPE {name} {kind}')
+            output.extend(series[name])
+        return '\n'.join(output) + '\n'
+
+
+def _labels(labels):
+    if not labels:
+        return ''
+    escaped = (str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n') for _, value in labels)
+    return '{' + ','.join(f'{label}="{value}"' for (label, _), value in zip(labels, escaped)) + '}'
+
+
+# Metrics of the running Conductor.
+metrics = Metrics()
@@ -0,0 +1,101 @@
+'''
+Created on Oct 18, 2026
+
+@author: x2012x
+'''
+import asyncio
+import threading
+import time
+from concurrent.futures import Future
+
+
+class SingleFlight(object):
+    ''' Shares the result of a call with all concurrent callers that request the same key.
+
+    The first caller for a key executes the call. Callers arriving while it is in flight wait
+    for, and receive, its result (or exception) instead of executing the call again. With a
+    window, a successful result is also shared with callers arriving within window seconds of
+    the call completing.
+
+    Arguments:
+        window (float): seconds a successful result is shared after the call completes.
+    '''
+    def __init__(self, window = 0):
+        self.window = window
+        self._lock = threading.Lock()
+        self._calls = {}
+        # Map of key to the completed call and the time it stops being shared.
+        self._recent = {}
+        # Number of calls that shared the result of an in-flight, or recent, call.
+        self.deduplicated = 0
+
+    def do(self, key, fn, *args):
+        ''' Execute fn(*args), unless a call for key is already in flight.
+
+        Arguments:
+            key: identifies calls that produce the same result.
+            fn (callable): the call to execute.
+
+        Returns:
+            result: the result of the call.
+        '''
+        call, leader = self._join(key)
+        if not leader:
+            return call.result()
+        try:
+            call.set_result(fn(*args))
+        except BaseException as e:
+            call.set_exception(e)
+        finally:
+            self._complete(key, call)
+        return call.result()
+
+    async def do_async(self, key, fn, *args):
+        ''' Await fn(*args), unless a call for key is already in flight, see do.
+
+        Calls made with do and do_async share results when their keys are the same.
+
+        Arguments:
+            key: identifies calls that produce the same result.
+            fn (callable): coroutine function to await.
+
+        Returns:
+            result: the result of the call.
+        '''
+        call, leader = self._join(key)
+        if not leader:
+            return await asyncio.wrap_future(call)
+        try:
+            call.set_result(await fn(*args))
+        except BaseException as e:
+            call.set_exception(e)
+        finally:
+            self._complete(key, call)
+        return call.result()
+
+    def _join(self, key):
+        ''' Get the in-flight, or recent, call for key, or register a new call if there is none.
+
+        Returns:
+            (call, leader): the call's Future and whether the caller must execute it.
+        '''
+        with self._lock:
+            call = self._calls.get(key)
+            if not call and key in self._recent:
+                recent, expires = self._recent[key]
+                if expires > time.monotonic():
+                    call = recent
+            if call:
+                self.deduplicated += 1
+                return call, False
+            call = self._calls[key] = Future()
+            return call, True
+
+    def _complete(self, key, call):
+        with self._lock:
+            del self._calls[key]
+            if self.window:
+                now = time.monotonic()
+                self._recent = {k: v for k, v in self._recent.items() if v[1] > now}
+                if not call.exception():
+                    self._recent[key] = (call, now + self.window)
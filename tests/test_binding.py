@@ -0,0 +1,124 @@
+'''
+Created on Oct 18, 2026
+
+@author: x2012x
+'''
+import os
+import sys
+import unittest
+from inspect import Parameter
+from typing import Optional
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, 'src'))
+
+from errors.exceptions import InvalidParameter
+from handlers.binding import ActionPlan, ParameterPlan, converter_for, infer, to_bool
+
+
+class Actions(object):
+
+    def typed(self, name: str, count: int, enabled: bool = False, limit: Optional[int] = None):
+        pass
+
+    def untyped(self, value, other = 'default'):
+        pass
+
+    def keywords(self, level: int, **kwargs):
+        pass
+
+    async def coroutine(self):
+        pass
+
+
+class ConverterTest(unittest.TestCase):
+
+    def test_converter_for(self):
+        self.assertIsNone(converter_for(str))
+        self.assertIs(converter_for(int), int)
+        self.assertIs(converter_for(float), float)
+        self.assertIs(converter_for(bool), to_bool)
+        self.assertIs(converter_for(Optional[int]), int)
+        self.assertIs(converter_for(Parameter.empty), infer)
+
+    def test_infer(self):
+        self.assertEqual(infer('42'), 42)
+        self.assertEqual(infer('-1.5'), -1.5)
+        self.assertEqual(infer('1e3'), 1000.0)
+        self.assertIs(infer('True'), True)
+        self.assertIs(infer('false'), False)
+        self.assertEqual(infer('kitchen'), 'kitchen')
+
+    def test_to_bool(self):
+        for value in ('true', 'On', 'YES', '1'):
+            self.assertIs(to_bool(value), True)
+        for value in ('false', 'off', 'no', '0'):
+            self.assertIs(to_bool(value), False)
+
+
+class ParameterPlanTest(unittest.TestCase):
+
+    def test_convert(self):
+        self.assertEqual(ParameterPlan('count', Parameter.empty, int).convert('7'), 7)
+        self.assertEqual(ParameterPlan('name', Parameter.empty, None).convert('7'), '7')
+
+    def test_invalid(self):
+        for converter, value in ((int, 'seven'), (float, 'x'), (to_bool, 'maybe')):
+            with self.assertRaisesRegex(InvalidParameter, 'Invalid value for parameter p'):
+                ParameterPlan('p', Parameter.empty, converter).convert(value)
+
+
+class ActionPlanTest(unittest.TestCase):
+
+    def setUp(self):
+        self.actions = Actions()
+
+    def test_typed(self):
+        plan = ActionPlan('typed', self.actions.typed, infer)
+        self.assertEqual(plan.bind('name=42&count=3&enabled=on&limit=5'), (['42', 3, True, 5], {}))
+
+    def test_defaults(self):
+        plan = ActionPlan('typed', self.actions.typed, infer)
+        self.assertEqual(plan.bind('count=3&name=x'), (['x', 3, False, None], {}))
+
+    def test_untyped(self):
+        plan = ActionPlan('untyped', self.actions.untyped, infer)
+        self.assertEqual(plan.bind('value=2.5&other=true'), ([2.5, True], {}))
+        self.assertEqual(plan.bind('value=word'), (['word', 'default'], {}))
+
+    def test_untyped_converter(self):
+        # The handler's converter is used for unannotated arguments
+        plan = ActionPlan('untyped', self.actions.untyped, str.upper)
+        self.assertEqual(plan.bind('value=word'), (['WORD', 'default'], {}))
+
+    def test_kwargs(self):
+        plan = ActionPlan('keywords', self.actions.keywords, infer)
+        self.assertTrue(plan.takes_kwargs)
+        self.assertEqual(plan.bind('level=2&volume=10&room=kitchen'), ([2], {'volume': 10, 'room': 'kitchen'}))
+
+    def test_extra_parameters_ignored(self):
+        plan = ActionPlan('untyped', self.actions.untyped, infer)
+        self.assertEqual(plan.bind('value=1&unknown=2'), ([1, 'default'], {}))
+
+    def test_missing_required(self):
+        plan = ActionPlan('typed', self.actions.typed, infer)
+        with self.assertRaisesRegex(InvalidParameter, 'Missing required parameter: count'):
+            plan.bind('name=x')
+        with self.assertRaises(InvalidParameter):
+            plan.bind('')
+
+    def test_invalid_value(self):
+        plan = ActionPlan('typed', self.actions.typed, infer)
+        with self.assertRaisesRegex(InvalidParameter, 'count'):
+            plan.bind('name=x&count=three')
+        with self.assertRaisesRegex(InvalidParameter, 'enabled'):
+            plan.bind('name=x&count=3&enabled=maybe')
+        with self.assertRaisesRegex(InvalidParameter, 'limit'):
+            plan.bind('name=x&count=3&limit=none')
+
+    def test_coroutine(self):
+        self.assertTrue(ActionPlan('coroutine', self.actions.coroutine, infer).is_coroutine)
+        self.assertFalse(ActionPlan('untyped', self.actions.untyped, infer).is_coroutine)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,67 @@
+'''
+Created on Oct 18, 2026
+
+@author: x2012x
+'''
+import os
+import sys
+import unittest
+from urllib.parse import urlparse
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, 'src'))
+
+from errors.exceptions import SpeakableException
+from handlers.base import BaseHandler
+from services.base import Response
+
+
+class Conductor(object):
+    ''' Conductor stand-in that returns responses without speaking them '''
+
+    def process_response(self, response, deferred = None):
+        return response
+
+
+class CoroutineHandler(BaseHandler):
+
+    def __init__(self, conductor):
+        super().__init__(conductor, 'coroutine', {'Fail', 'Succeed'})
+
+    async def fail(self):
+        raise SpeakableException('Action failed')
+
+    async def succeed(self):
+        return Response('Action succeeded')
+
+    async def _handle_intent(self, intent):
+        if intent['intent']['name'] == 'Fail':
+            raise SpeakableException('Intent failed')
+        return Response('Intent succeeded')
+
+
+class CoroutineHandlerTest(unittest.TestCase):
+    ''' Coroutine actions and intents run on a thread, as they are by the threaded engine and batches '''
+
+    def setUp(self):
+        self.handler = CoroutineHandler(Conductor())
+        self.handler.compile_actions()
+
+    def test_action(self):
+        response = self.handler.handle_action('succeed', urlparse('/coroutine/succeed'))
+        self.assertEqual(response.speech.text, 'Action succeeded')
+
+    def test_action_speakable_exception(self):
+        response = self.handler.handle_action('fail', urlparse('/coroutine/fail'))
+        self.assertEqual(response.speech.text, 'Action failed')
+
+    def test_intent(self):
+        response = self.handler.handle_intent({'intent': {'name': 'Succeed'}})
+        self.assertEqual(response.speech.text, 'Intent succeeded')
+
+    def test_intent_speakable_exception(self):
+        response = self.handler.handle_intent({'intent': {'name': 'Fail'}})
+        self.assertEqual(response.speech.text, 'Intent failed')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,167 @@
+'''
+Created on Oct 18, 2026
+
+@author: x2012x
+'''
+import asyncio
+import os
+import sys
+import threading
+import time
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, 'src'))
+
+from utils.singleflight import SingleFlight
+
+
+class Call(object):
+    ''' Counts its calls and, once started, blocks until released '''
+
+    def __init__(self, result = 'result', error = None):
+        self.result = result
+        self.error = error
+        self.calls = 0
+        self.started = threading.Event()
+        self.release = threading.Event()
+
+    def __call__(self, *args):
+        self.calls += 1
+        self.started.set()
+        self.release.wait(5)
+        if self.error:
+            raise self.error
+        return (self.result,) + args
+
+    async def coroutine(self, *args):
+        await asyncio.get_running_loop().run_in_executor(None, self.release.wait, 5)
+        return self(*args)
+
+
+def wait_for(condition):
+    deadline = time.monotonic() + 5
+    while not condition() and time.monotonic() < deadline:
+        time.sleep(0.001)
+
+
+class SingleFlightTest(unittest.TestCase):
+
+    def start(self, flights, key, fn, results, count = 1):
+        threads = [threading.Thread(target=lambda: results.append(flights.do(key, fn, 'arg'))) for _ in range(count)]
+        for thread in threads:
+            thread.start()
+        return threads
+
+    def test_followers_share_result(self):
+        flights = SingleFlight()
+        call = Call()
+        results = []
+        threads = self.start(flights, 'key', call, results, count=5)
+        wait_for(lambda: flights.deduplicated == 4)
+        call.release.set()
+        for thread in threads:
+            thread.join(5)
+        self.assertEqual(results, [('result', 'arg')] * 5)
+        self.assertEqual(call.calls, 1)
+        self.assertEqual(flights.deduplicated, 4)
+
+    def test_keys_independent(self):
+        flights = SingleFlight()
+        call = Call()
+        call.release.set()
+        self.assertEqual(flights.do('a', call, 1), ('result', 1))
+        self.assertEqual(flights.do('b', call, 2), ('result', 2))
+        self.assertEqual(call.calls, 2)
+        self.assertEqual(flights.deduplicated, 0)
+
+    def test_followers_share_failure(self):
+        flights = SingleFlight()
+        call = Call(error=ValueError('failed'))
+        errors = []
+
+        def follow():
+            try:
+                flights.do('key', call)
+            except ValueError as e:
+                errors.append(e)
+        threads = [threading.Thread(target=follow) for _ in range(3)]
+        for thread in threads:
+            thread.start()
+        wait_for(lambda: flights.deduplicated == 2)
+        call.release.set()
+        for thread in threads:
+            thread.join(5)
+        self.assertEqual(len(errors), 3)
+        self.assertEqual(call.calls, 1)
+
+    def test_window(self):
+        flights = SingleFlight(window=0.1)
+        call = Call()
+        call.release.set()
+        flights.do('key', call)
+        self.assertEqual(flights.do('key', call), ('result',))
+        self.assertEqual(call.calls, 1)
+        self.assertEqual(flights.deduplicated, 1)
+        time.sleep(0.15)
+        flights.do('key', call)
+        self.assertEqual(call.calls, 2)
+
+    def test_no_window(self):
+        flights = SingleFlight()
+        call = Call()
+        call.release.set()
+        flights.do('key', call)
+        flights.do('key', call)
+        self.assertEqual(call.calls, 2)
+
+    def test_failure_not_cached(self):
+        flights = SingleFlight(window=60)
+        call = Call(error=ValueError('failed'))
+        call.release.set()
+        with self.assertRaises(ValueError):
+            flights.do('key', call)
+        call.error = None
+        self.assertEqual(flights.do('key', call), ('result',))
+        self.assertEqual(call.calls, 2)
+        self.assertEqual(flights.deduplicated, 0)
+
+    def test_async_follows_thread(self):
+        flights = SingleFlight()
+        call = Call()
+        results = []
+        threads = self.start(flights, 'key', call, results)
+        self.assertTrue(call.started.wait(5))
+
+        async def follow():
+            waiting = asyncio.ensure_future(flights.do_async('key', call.coroutine, 'arg'))
+            await asyncio.sleep(0.01)
+            call.release.set()
+            return await waiting
+        self.assertEqual(asyncio.run(follow()), ('result', 'arg'))
+        threads[0].join(5)
+        self.assertEqual(results, [('result', 'arg')])
+        self.assertEqual(call.calls, 1)
+        self.assertEqual(flights.deduplicated, 1)
+
+    def test_thread_follows_async(self):
+        flights = SingleFlight()
+        call = Call()
+        results = []
+
+        async def lead():
+            leading = asyncio.ensure_future(flights.do_async('key', call.coroutine, 'arg'))
+            await asyncio.sleep(0.01)
+            # The thread waits on the in-flight coroutine without blocking the event loop.
+            threads = self.start(flights, 'key', call, results)
+            await asyncio.get_running_loop().run_in_executor(None, wait_for, lambda: flights.deduplicated == 1)
+            call.release.set()
+            result = await leading
+            threads[0].join(5)
+            return result
+        self.assertEqual(asyncio.run(lead()), ('result', 'arg'))
+        self.assertEqual(results, [('result', 'arg')])
+        self.assertEqual(call.calls, 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
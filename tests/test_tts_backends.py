@@ -0,0 +1,34 @@
+'''
+Created on Oct 18, 2026
+
+@author: x2012x
+
+Run from the repository root: python -m unittest discover tests
+'''
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, 'src'))
+
+from services.tts_backends import SILENT_FRAME, SILENT_FRAME_SECONDS, SilenceBackend
+
+try:
+    import miniaudio
+except ImportError:
+    miniaudio = None
+
+
+@unittest.skipIf(miniaudio is None, 'miniaudio is required to decode MP3 audio')
+class SilenceBackendTest(unittest.TestCase):
+
+    def test_decoded_duration(self):
+        audio = SilenceBackend().synthesize('x' * 100, 5)
+        frames = len(audio) // len(SILENT_FRAME)
+        decoded = miniaudio.decode(audio, output_format=miniaudio.SampleFormat.SIGNED16)
+        self.assertEqual(decoded.sample_rate, 44100)
+        self.assertAlmostEqual(decoded.duration, frames * SILENT_FRAME_SECONDS, places=3)
+
+
+if __name__ == '__main__':
+    unittest.main()
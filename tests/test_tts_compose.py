@@ -0,0 +1,124 @@
+'''
+Created on Oct 18, 2026
+
+@author: x2012x
+'''
+import array
+import math
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, 'src'))
+
+from services.tts_backends import SILENT_FRAME
+from services.tts_compose import ComposedRecordings, join_recordings, strip_mp3, _frame
+
+try:
+    import lameenc
+    import miniaudio
+except ImportError:
+    lameenc = miniaudio = None
+
+
+def encode(seconds, frequency):
+    ''' Encode a tone with LAME: MPEG-2 Layer III, 22.05 kHz, mono '''
+    encoder = lameenc.Encoder()
+    encoder.set_bit_rate(32)
+    encoder.set_in_sample_rate(22050)
+    encoder.set_channels(1)
+    encoder.set_quality(2)
+    samples = array.array('h', (int(8000 * math.sin(2 * math.pi * frequency * i / 22050))
+                                for i in range(int(22050 * seconds))))
+    return encoder.encode(samples.tobytes()) + encoder.flush()
+
+
+def frames(audio_content):
+    ''' Count the frames of an MP3 stream which holds nothing but frames '''
+    count = offset = 0
+    while offset < len(audio_content):
+        length, _ = _frame(audio_content, offset)
+        offset += length
+        count += 1
+    return count
+
+
+def tagged(audio_content):
+    ''' Wrap audio frames with an ID3v2 tag, an Info frame and an ID3v1 tag, as encoders write them '''
+    frame = _frame(audio_content, 0)
+    info = bytearray(audio_content[:4] + bytes(frame[0] - 4))
+    info[frame[1]:frame[1] + 4] = b'Info'
+    body = b'TIT2' + (6).to_bytes(4, 'big') + b'\x00\x00\x00tone\x00' + bytes(128)
+    # Syncsafe tag size
+    size = bytes((len(body) >> shift) & 0x7F for shift in (21, 14, 7, 0))
+    id3v2 = b'ID3\x04\x00\x00' + size + body
+    id3v1 = b'TAG' + b'tone'.ljust(125, b'\x00')
+    return id3v2 + bytes(info) + audio_content + id3v1
+
+
+class StripTest(unittest.TestCase):
+
+    def test_frames_unchanged(self):
+        self.assertEqual(strip_mp3(SILENT_FRAME * 3), SILENT_FRAME * 3)
+
+    def test_strip_tags(self):
+        self.assertEqual(strip_mp3(tagged(SILENT_FRAME * 3)), SILENT_FRAME * 3)
+
+    def test_id3v2_footer(self):
+        audio_content = b'ID3\x04\x00\x10\x00\x00\x00\x04' + b'tags' + b'3DI\x04\x00\x10\x00\x00\x00\x04' + SILENT_FRAME
+        self.assertEqual(strip_mp3(audio_content), SILENT_FRAME)
+
+    @unittest.skipIf(lameenc is None, 'lameenc and miniaudio are required to encode and decode MP3 audio')
+    def test_join_encoded(self):
+        recordings = [encode(0.5, 440), encode(0.25, 660)]
+        self.assertEqual([strip_mp3(tagged(r)) for r in recordings], recordings)
+        joined = join_recordings(tagged(r) for r in recordings)
+        self.assertEqual(joined, b''.join(recordings))
+        # MPEG-2 Layer III frames hold 576 samples each.
+        decoded = miniaudio.decode(joined, nchannels=1, sample_rate=22050)
+        self.assertEqual(decoded.num_frames, sum(frames(r) for r in recordings) * 576)
+
+
+class ComposedRecordingsTest(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.playing = set()
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_reused(self):
+        composed = ComposedRecordings(self.directory, remembered=2)
+        self.assertFalse(composed.reused('a'))
+        self.assertTrue(composed.reused('a'))
+        composed.reused('b')
+        composed.reused('c')
+        self.assertFalse(composed.reused('a'))
+
+    def test_remove_unused(self):
+        composed = ComposedRecordings(self.directory, in_use=lambda: self.playing, hold=0)
+        first = composed.write('a', SILENT_FRAME)
+        self.playing.add(first)
+        second = composed.write('b', SILENT_FRAME)
+        with open(second, 'rb') as recording:
+            self.assertEqual(recording.read(), SILENT_FRAME)
+        self.assertTrue(os.path.exists(first))
+        self.playing.clear()
+        composed.write('c', SILENT_FRAME)
+        self.assertEqual(sorted(os.listdir(self.directory)), ['c.mp3'])
+
+    def test_hold(self):
+        composed = ComposedRecordings(self.directory, hold=60)
+        composed.write('a', SILENT_FRAME)
+        composed.write('b', SILENT_FRAME)
+        self.assertEqual(sorted(os.listdir(self.directory)), ['a.mp3', 'b.mp3'])
+        # Files of a previous run are removed.
+        ComposedRecordings(self.directory)
+        self.assertEqual(os.listdir(self.directory), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,208 @@
+'''
+Created on Oct 18, 2026
+
+@author: x2012x
+'''
+import hashlib
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import time
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, 'src'))
+
+from migrate_cache import migrate
+from services.tts_cache import TTSCache
+from services.tts_packed import PackedTTSCache
+
+
+def text_hash(text):
+    return hashlib.sha256(text.encode('utf_8')).hexdigest()
+
+
+def audio(text):
+    ''' Distinct audio content for each text '''
+    return hashlib.sha256(text.encode('utf_8')).digest() * 8
+
+
+class PackedTTSCacheTest(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, 'packed')
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def open(self, **options):
+        cache = PackedTTSCache(self.path, **options)
+        cache.load(wait=True)
+        return cache
+
+    def store(self, cache, texts):
+        for text in texts:
+            cache.store(text_hash(text), text, audio(text))
+
+    def assertCached(self, cache, texts):
+        for text in texts:
+            self.assertEqual(cache.read(text_hash(text)), audio(text), text)
+            self.assertEqual(cache.transcription(text_hash(text)), text)
+
+    def test_store_and_lookup(self):
+        cache = self.open()
+        self.store(cache, ['hello', 'goodbye'])
+        self.assertEqual(os.listdir(os.path.join(self.path, 'playback')), [])
+        audio_file = cache.lookup(text_hash('hello'))
+        with open(audio_file, 'rb') as recording:
+            self.assertEqual(recording.read(), audio('hello'))
+        self.assertIsNone(cache.lookup(text_hash('missing')))
+        self.assertTrue(cache.contains(text_hash('goodbye')))
+        self.assertEqual(cache.stats()['hits'], 1)
+        self.assertEqual(cache.stats()['misses'], 1)
+
+    def test_replace(self):
+        cache = self.open()
+        cache.store(text_hash('hello'), 'hello', b'first')
+        cache.store(text_hash('hello'), 'hello', b'second')
+        self.assertEqual(cache.read(text_hash('hello')), b'second')
+        self.assertEqual(cache.stats()['entries'], 1)
+        self.assertGreater(cache.stats()['dead_bytes'], 0)
+
+    def test_evict_least_recently_used(self):
+        cache = self.open(max_entries=10)
+        texts = [f'phrase {i}' for i in range(10)]
+        self.store(cache, texts)
+        cache.lookup(text_hash(texts[0]))
+        self.store(cache, ['phrase 10'])
+        self.assertLessEqual(cache.stats()['entries'], 10)
+        self.assertTrue(cache.contains(text_hash(texts[0])))
+        self.assertFalse(cache.contains(text_hash(texts[1])))
+        self.assertTrue(cache.contains(text_hash('phrase 10')))
+
+    def test_rehash(self):
+        cache = self.open()
+        texts = [f'phrase {i}' for i in range(2000)]
+        self.store(cache, texts)
+        self.assertGreater(cache._capacity, 1024)
+        self.assertCached(cache, texts)
+
+    def test_playback_limit(self):
+        cache = self.open(playback_files=4, hold=0)
+        texts = [f'phrase {i}' for i in range(10)]
+        self.store(cache, texts)
+        for text in texts:
+            cache.lookup(text_hash(text))
+        self.assertEqual(len(os.listdir(os.path.join(self.path, 'playback'))), 4)
+
+    def test_playback_in_use_kept(self):
+        playing = set()
+        cache = self.open(playback_files=2, hold=0, in_use=lambda: playing)
+        texts = [f'phrase {i}' for i in range(5)]
+        self.store(cache, texts)
+        playing.add(cache.lookup(text_hash(texts[0])))
+        for text in texts[1:]:
+            cache.lookup(text_hash(text))
+        self.assertTrue(all(os.path.exists(path) for path in playing))
+        playing.clear()
+        cache.lookup(text_hash(texts[1]))
+        self.assertEqual(len(os.listdir(os.path.join(self.path, 'playback'))), 2)
+
+    def test_compact_while_storing(self):
+        cache = self.open(segment_size=4096, max_entries=50)
+        self.store(cache, [f'old {i}' for i in range(200)])
+        # Wait for any compaction started by the stores.
+        while cache._compacting:
+            time.sleep(0.01)
+        copy = cache._copy
+        copying = threading.Event()
+        resume = threading.Event()
+
+        def paused_copy(copies):
+            copying.set()
+            resume.wait(5)
+            return copy(copies)
+        cache._copy = paused_copy
+        cache._compacting = True
+        compaction = threading.Thread(target=cache.compact)
+        compaction.start()
+        self.assertTrue(copying.wait(5))
+        # Stores continue while the records are copied, replacing and evicting copied records.
+        new = [f'new {i}' for i in range(30)]
+        self.store(cache, new)
+        cache.store(text_hash('old 199'), 'old 199', b'replaced')
+        resume.set()
+        compaction.join(5)
+        self.assertFalse(compaction.is_alive())
+        self.assertCached(cache, new)
+        self.assertEqual(cache.read(text_hash('old 199')), b'replaced')
+        segments = sum(os.path.getsize(os.path.join(self.path, name))
+                       for name in os.listdir(self.path) if name.endswith('.seg'))
+        self.assertEqual(segments - cache.stats()['bytes'], cache.stats()['dead_bytes'])
+        self.assertCached(self.open(), new)
+
+    def test_reopen(self):
+        cache = self.open()
+        texts = [f'phrase {i}' for i in range(100)]
+        self.store(cache, texts)
+        reopened = self.open()
+        self.assertEqual(reopened.stats()['entries'], 100)
+        self.assertCached(reopened, texts)
+
+    def test_rebuild_after_index_deleted(self):
+        cache = self.open()
+        texts = [f'phrase {i}' for i in range(100)]
+        self.store(cache, texts)
+        cache.store(text_hash('phrase 0'), 'phrase 0', b'replaced')
+        os.remove(os.path.join(self.path, 'index'))
+        rebuilt = self.open()
+        self.assertEqual(rebuilt.stats()['entries'], 100)
+        self.assertCached(rebuilt, texts[1:])
+        self.assertEqual(rebuilt.read(text_hash('phrase 0')), b'replaced')
+
+    def test_truncate_torn_tail(self):
+        cache = self.open()
+        self.store(cache, ['complete'])
+        segment = os.path.join(self.path, '000001.seg')
+        size = os.path.getsize(segment)
+        with open(segment, 'ab') as out:
+            out.write(b'TTSR' + bytes(20))
+        reopened = self.open()
+        self.assertEqual(os.path.getsize(segment), size)
+        self.assertCached(reopened, ['complete'])
+        self.store(reopened, ['appended'])
+        self.assertCached(self.open(), ['complete', 'appended'])
+
+
+class MigrateTest(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_migrate(self):
+        source = os.path.join(self.directory, 'files')
+        target = os.path.join(self.directory, 'packed')
+        files = TTSCache(source)
+        texts = [f'phrase {i}' for i in range(20)]
+        for text in texts:
+            files.store(text_hash(text), text, audio(text))
+        # A recording without a transcription isn't migrated.
+        with open(files.audio_file(text_hash('untranscribed')), 'wb') as out:
+            out.write(audio('untranscribed'))
+        self.assertEqual(migrate(source, target, remove=True), (20, 1))
+        self.assertEqual(sorted(os.listdir(source)), [f'{text_hash("untranscribed")}.mp3'])
+        cache = PackedTTSCache(target)
+        cache.load(wait=True)
+        self.assertEqual(cache.stats()['entries'], 20)
+        for text in texts:
+            self.assertEqual(cache.read(text_hash(text)), audio(text))
+            self.assertEqual(cache.transcription(text_hash(text)), text)
+
+
+if __name__ == '__main__':
+    unittest.main()